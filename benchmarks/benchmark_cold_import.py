@@ -0,0 +1,58 @@
+from typing import Dict, List
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module name => Folder to run the import from (the modules use flat imports)
+MODULES_TO_BENCHMARK = {
+    'pipeline': os.path.join(ROOT_FOLDER, 'match_facts'),
+    'match_facts_stats': os.path.join(ROOT_FOLDER, 'match_facts'),
+    'scoreline_stats': os.path.join(ROOT_FOLDER, 'match_facts'),
+    'ingestion': os.path.join(ROOT_FOLDER, 'match_facts'),
+    'plotter': os.path.join(ROOT_FOLDER, 'match_facts'),
+    'image2text': os.path.join(ROOT_FOLDER, 'image2text'),
+}
+
+
+def get_cold_import_times(module: str, folder: str, num_runs: int) -> List[float]:
+    """Returns wall-clock times (in seconds) of importing `module` in a fresh Python interpreter, once per run"""
+    import_times = []
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', f"import {module}"],
+            cwd=folder,
+            check=True,
+        )
+        end = time.perf_counter()
+        import_times.append(end - start)
+    return import_times
+
+
+def get_interpreter_startup_time(num_runs: int) -> float:
+    """Returns median wall-clock time (in seconds) of starting a bare Python interpreter"""
+    startup_times = get_cold_import_times(module='sys', folder=ROOT_FOLDER, num_runs=num_runs)
+    return float(np.median(startup_times))
+
+
+def benchmark_cold_imports(num_runs: int) -> Dict[str, float]:
+    """
+    Returns dictionary having keys = module name, and values = median cold import time (in seconds) of said module,
+    excluding the startup time of the interpreter itself
+    """
+    interpreter_startup_time = get_interpreter_startup_time(num_runs=num_runs)
+    dict_import_times = {}
+    for module, folder in MODULES_TO_BENCHMARK.items():
+        import_times = get_cold_import_times(module=module, folder=folder, num_runs=num_runs)
+        dict_import_times[module] = round(float(np.median(import_times)) - interpreter_startup_time, 3)
+    return dict_import_times
+
+
+if __name__ == "__main__":
+    dict_import_times = benchmark_cold_imports(num_runs=5)
+    for module, import_time in dict_import_times.items():
+        print(f"{module:<20} {import_time:.3f} s")
@@ -0,0 +1,81 @@
+from typing import Any, Dict, Optional
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_FOLDER, 'image2text')) # The modules use flat imports
+
+from image2text import get_filepaths_to_images, get_raw_text_and_stat_dictionary_from_image
+from preprocessing import get_preprocessing_settings
+
+
+def get_parse_accuracy(dict_stat: Dict[str, Any], dict_expected: Dict[str, Any]) -> float:
+    """Returns fraction of the expected stats that were parsed with the expected value"""
+    num_correct = sum(
+        1 for stat, expected_value in dict_expected.items() if dict_stat.get(stat) == expected_value
+    )
+    return num_correct / len(dict_expected)
+
+
+def benchmark_image(
+        filepath_to_image: str,
+        dict_expected: Dict[str, Any],
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, float]:
+    """Returns dictionary having the OCR time (in seconds) and parse accuracy of one screenshot"""
+    start = time.perf_counter()
+    try:
+        _, dict_stat = get_raw_text_and_stat_dictionary_from_image(
+            filepath_to_image=filepath_to_image,
+            preprocessing_settings=preprocessing_settings,
+        )
+    except ValueError: # OCR'd text could not be parsed
+        dict_stat = {}
+    end = time.perf_counter()
+    return {'seconds': end - start, 'accuracy': get_parse_accuracy(dict_stat=dict_stat, dict_expected=dict_expected)}
+
+
+def benchmark_preprocessing(directory_or_glob: str, filepath_to_expected_stats: str, layout: str) -> pd.DataFrame:
+    """
+    OCRs every screenshot as-is, and preprocessed for the given layout. Returns DataFrame having the median OCR time
+    per image (in seconds) and mean parse accuracy of both.
+    Expects CSV having the verified stats of the screenshots, with a 'Filename' column (eg: "20210529_214354.png")
+    and one column per stat (eg: 'HomePossession').
+    """
+    df_expected = pd.read_csv(filepath_to_expected_stats).set_index('Filename')
+    settings_by_name = {
+        'none': None,
+        f"layout={layout}": get_preprocessing_settings(layout=layout),
+    }
+    results = []
+    for filepath in get_filepaths_to_images(directory_or_glob=directory_or_glob):
+        filename = os.path.basename(filepath)
+        if filename not in df_expected.index:
+            continue
+        dict_expected = df_expected.loc[filename].dropna().to_dict()
+        for name, settings in settings_by_name.items():
+            result = benchmark_image(filepath_to_image=filepath, dict_expected=dict_expected, preprocessing_settings=settings)
+            results.append({'Preprocessing': name, **result})
+    if not results:
+        raise FileNotFoundError(f"No screenshots at '{directory_or_glob}' are listed in '{filepath_to_expected_stats}'")
+    df_results = pd.DataFrame(data=results).groupby(by='Preprocessing', sort=False).agg(
+        NumImages=('seconds', 'size'),
+        MedianSeconds=('seconds', lambda seconds: float(np.median(seconds))),
+        MeanAccuracy=('accuracy', 'mean'),
+    )
+    return df_results.reset_index()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python benchmark_ocr_preprocessing.py <directory-or-glob> <expected stats CSV> <layout>")
+        sys.exit(1)
+    df_results = benchmark_preprocessing(
+        directory_or_glob=sys.argv[1],
+        filepath_to_expected_stats=sys.argv[2],
+        layout=sys.argv[3],
+    )
+    print(df_results.to_string(index=False))
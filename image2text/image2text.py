@@ -1,30 +1,58 @@
-from typing import Dict, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import glob
+import os
 import re
+import sys
 
 import pandas as pd
 from PIL import Image
-import pyocr
-from pyocr import builders
-
-
-# Constants
-TOOLS = pyocr.get_available_tools()
-if len(TOOLS) == 0:
-    raise Exception("Error with PyOCR - No tools available")
-TOOL = TOOLS[0]
-
-LANGUAGES = TOOL.get_available_languages()
-if 'eng' not in LANGUAGES:
-    raise Exception("Error with PyOCR - Cannot handle the English language")
 
+from ocr_cache import OcrCache
+from preprocessing import preprocess_image
 
 
-def get_raw_text_from_image(filepath_to_image: str) -> str:
-    raw_text = TOOL.image_to_string(
-        image=Image.open(filepath_to_image),
-        lang='eng',
-        builder=builders.TextBuilder(),
-    )
+# Constants
+OCR_LANGUAGE = 'eng'
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+
+
+@functools.lru_cache(maxsize=None)
+def get_ocr_tool():
+    """
+    Returns the first available PyOCR tool that can handle the English language.
+    The tool is discovered lazily on first use, and then cached for the lifetime of the process.
+    PyOCR itself is imported here (and not at module level), so that importing this module stays fast.
+    """
+    import pyocr
+    tools = pyocr.get_available_tools()
+    if len(tools) == 0:
+        raise Exception("Error with PyOCR - No tools available")
+    tool = tools[0]
+    languages = tool.get_available_languages()
+    if OCR_LANGUAGE not in languages:
+        raise Exception("Error with PyOCR - Cannot handle the English language")
+    return tool
+
+
+def get_raw_text_from_image(
+        filepath_to_image: str,
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+    ) -> str:
+    """
+    OCRs the image. It is preprocessed first (see `preprocessing.preprocess_image`) only if `preprocessing_settings`
+    are given (see `preprocessing.get_preprocessing_settings`).
+    """
+    from pyocr import builders
+    tool = get_ocr_tool()
+    with Image.open(filepath_to_image) as image:
+        image_preprocessed = preprocess_image(image=image, settings=preprocessing_settings)
+        raw_text = tool.image_to_string(
+            image=image_preprocessed,
+            lang=OCR_LANGUAGE,
+            builder=builders.TextBuilder(),
+        )
     return raw_text
 
 
@@ -59,13 +87,126 @@ def get_stat_dictionary_from_raw_text(raw_text: str) -> Dict[str, Union[int, flo
     return dict_stat
 
 
-if __name__ == "__main__":
-    filepath_to_image = "20210529_214354 (small).png"
-    filename_without_ext = filepath_to_image.split('.')[0]
+def get_stat_dictionary_from_image(
+        filepath_to_image: str,
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Union[int, float]]:
+    _, dict_stat = get_raw_text_and_stat_dictionary_from_image(
+        filepath_to_image=filepath_to_image,
+        preprocessing_settings=preprocessing_settings,
+    )
+    return dict_stat
+
 
-    raw_text = get_raw_text_from_image(filepath_to_image=filepath_to_image)
+def get_raw_text_and_stat_dictionary_from_image(
+        filepath_to_image: str,
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, Dict[str, Union[int, float]]]:
+    raw_text = get_raw_text_from_image(
+        filepath_to_image=filepath_to_image,
+        preprocessing_settings=preprocessing_settings,
+    )
     dict_stat = get_stat_dictionary_from_raw_text(raw_text=raw_text)
-    df_stat = pd.DataFrame(data=dict_stat, index=[0])
-    df_stat = df_stat.T.reset_index().rename({'index': 'stat', 0: 'value'}, axis=1)
-    df_stat.to_csv(f"{filename_without_ext}.csv", index=False)
-    print("Saved to CSV")
\ No newline at end of file
+    return raw_text, dict_stat
+
+
+def get_filepaths_to_images(directory_or_glob: str) -> List[str]:
+    """
+    Returns sorted list of filepaths to images. Takes in either a directory (all images directly inside it are picked)
+    or a glob pattern (eg: "screenshots/2021*.png")
+    """
+    if os.path.isdir(directory_or_glob):
+        filepaths = [
+            os.path.join(directory_or_glob, filename) for filename in os.listdir(directory_or_glob)
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS
+        ]
+    else:
+        filepaths = glob.glob(directory_or_glob)
+    return sorted(filepaths)
+
+
+def get_stats_dataframe_from_filepaths(
+        filepaths: List[str],
+        max_workers: Optional[int] = None,
+        cache_folder: Optional[str] = None,
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+    """
+    OCRs the given screenshots in parallel across a process pool, and returns one DataFrame having one row of stats per
+    image (in the same order as `filepaths`). The 'Filepath' column refers to the image.
+    The OCR tool is discovered once per worker process (by its first task, as `get_ocr_tool` is cached).
+    If `cache_folder` is given, results are cached on disk (see `OcrCache`) and unchanged images are not OCR'd again.
+    Images are preprocessed only if `preprocessing_settings` are given (see `preprocessing.get_preprocessing_settings`).
+    """
+    cache = OcrCache(folder=cache_folder) if cache_folder else None
+    dict_stats_by_filepath = {}
+    dict_key_by_filepath = {}
+    if cache:
+        for filepath in filepaths:
+            key = cache.get_key(
+                filepath_to_image=filepath,
+                language=OCR_LANGUAGE,
+                settings=preprocessing_settings,
+            )
+            entry = cache.get(key=key)
+            if entry is None:
+                dict_key_by_filepath[filepath] = key
+            else:
+                dict_stats_by_filepath[filepath] = entry['stat_dictionary']
+    filepaths_to_ocr = [filepath for filepath in filepaths if filepath not in dict_stats_by_filepath]
+    if filepaths_to_ocr:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            ocr_func = functools.partial(
+                get_raw_text_and_stat_dictionary_from_image,
+                preprocessing_settings=preprocessing_settings,
+            )
+            results = executor.map(ocr_func, filepaths_to_ocr, chunksize=4)
+            for filepath, (raw_text, dict_stat) in zip(filepaths_to_ocr, results):
+                dict_stats_by_filepath[filepath] = dict_stat
+                if cache:
+                    cache.put(key=dict_key_by_filepath[filepath], raw_text=raw_text, stat_dictionary=dict_stat)
+    df_stats = pd.DataFrame(data=[dict_stats_by_filepath[filepath] for filepath in filepaths])
+    df_stats.insert(loc=0, column='Filepath', value=filepaths)
+    return df_stats
+
+
+def get_stats_dataframe_from_images(
+        directory_or_glob: str,
+        max_workers: Optional[int] = None,
+        cache_folder: Optional[str] = None,
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+    """
+    OCRs all screenshots in the given directory/glob (see `get_stats_dataframe_from_filepaths`), and returns one
+    DataFrame having one row of stats per image (in ascending order of filepath)
+    """
+    filepaths = get_filepaths_to_images(directory_or_glob=directory_or_glob)
+    if not filepaths:
+        raise FileNotFoundError(f"No images found at '{directory_or_glob}'")
+    df_stats = get_stats_dataframe_from_filepaths(
+        filepaths=filepaths,
+        max_workers=max_workers,
+        cache_folder=cache_folder,
+        preprocessing_settings=preprocessing_settings,
+    )
+    return df_stats
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Batch mode. Usage: python image2text.py <directory-or-glob> [<filepath-to-csv>]
+        directory_or_glob = sys.argv[1]
+        filepath_to_csv = sys.argv[2] if len(sys.argv) > 2 else "Stats from images.csv"
+        df_stats = get_stats_dataframe_from_images(directory_or_glob=directory_or_glob, cache_folder=".ocr-cache")
+        df_stats.to_csv(filepath_to_csv, index=False)
+        print(f"Saved stats of {len(df_stats)} images to CSV")
+    else:
+        filepath_to_image = "20210529_214354 (small).png"
+        filename_without_ext = filepath_to_image.split('.')[0]
+
+        raw_text = get_raw_text_from_image(filepath_to_image=filepath_to_image)
+        dict_stat = get_stat_dictionary_from_raw_text(raw_text=raw_text)
+        df_stat = pd.DataFrame(data=dict_stat, index=[0])
+        df_stat = df_stat.T.reset_index().rename({'index': 'stat', 0: 'value'}, axis=1)
+        df_stat.to_csv(f"{filename_without_ext}.csv", index=False)
+        print("Saved to CSV")
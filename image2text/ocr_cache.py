@@ -0,0 +1,128 @@
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import tempfile
+
+
+class OcrCache:
+
+    def __init__(
+            self,
+            folder: str,
+            max_size_in_bytes: Optional[int] = 50 * 1024 * 1024,
+        ) -> None:
+        """
+        On-disk cache of OCR results. Each entry is a JSON file (named after its key) having the raw text and the
+        parsed stat dictionary of an image.
+        Entries are keyed by a hash of the image bytes plus the OCR language and preprocessing settings, so editing an
+        image or changing the settings results in a cache miss.
+        When the total size of the entries exceeds `max_size_in_bytes`, the least recently used entries are evicted. If
+        `max_size_in_bytes` is None, the cache is unbounded (nothing is evicted).
+        The total size is scanned once, and then kept up to date by `put`, so the folder is only scanned again when
+        entries have to be evicted.
+
+        Parameters:
+            - folder (str): Folder in which the cache entries are stored (created if it does not exist)
+            - max_size_in_bytes (int): Upper bound on the total size of all cache entries (None for no bound)
+        """
+        if max_size_in_bytes is not None and max_size_in_bytes <= 0:
+            raise ValueError(f"Expected `max_size_in_bytes` to be a positive integer, but got {max_size_in_bytes}")
+        self.folder = folder
+        self.max_size_in_bytes = max_size_in_bytes
+        os.makedirs(self.folder, exist_ok=True)
+        self.total_size_in_bytes: Optional[int] = None # Scanned on first `put`
+        return None
+
+    def get_key(
+            self,
+            filepath_to_image: str,
+            language: str,
+            settings: Optional[Dict[str, Any]] = None,
+        ) -> str:
+        """Returns cache key for an image (SHA-256 hex digest of the image bytes, OCR language and settings)"""
+        hasher = hashlib.sha256()
+        with open(filepath_to_image, 'rb') as file_obj:
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        settings_string = json.dumps({'language': language, 'settings': settings or {}}, sort_keys=True)
+        hasher.update(settings_string.encode('utf-8'))
+        return hasher.hexdigest()
+
+    def __get_filepath(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached entry (dictionary having keys ['raw_text', 'stat_dictionary']) if available, else None.
+        Marks the entry as recently used.
+        """
+        filepath = self.__get_filepath(key=key)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as file_obj:
+                entry = json.load(file_obj)
+            os.utime(filepath)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry
+
+    def put(
+            self,
+            key: str,
+            raw_text: str,
+            stat_dictionary: Dict[str, Any],
+        ) -> None:
+        """Stores an entry in the cache (atomically), and then evicts least recently used entries if needed"""
+        if self.max_size_in_bytes is not None and self.total_size_in_bytes is None:
+            self.total_size_in_bytes = self.__get_entries_and_total_size()[1]
+        entry = {'raw_text': raw_text, 'stat_dictionary': stat_dictionary}
+        filepath = self.__get_filepath(key=key)
+        file_descriptor, temp_filepath = tempfile.mkstemp(dir=self.folder, prefix='.tmp-', suffix='.json')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file_obj:
+            json.dump(entry, file_obj)
+        size_in_bytes = os.path.getsize(temp_filepath)
+        try:
+            size_in_bytes -= os.path.getsize(filepath) # Entry being replaced
+        except FileNotFoundError:
+            pass
+        os.replace(temp_filepath, filepath)
+        if self.max_size_in_bytes is None:
+            return None
+        self.total_size_in_bytes += size_in_bytes
+        if self.total_size_in_bytes > self.max_size_in_bytes:
+            self.evict()
+        return None
+
+    def __get_entries_and_total_size(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        """Returns list of (last used time, size, filepath) of all entries, and their total size"""
+        entries = []
+        total_size_in_bytes = 0
+        for dir_entry in os.scandir(self.folder):
+            if not dir_entry.name.endswith('.json') or dir_entry.name.startswith('.tmp-'):
+                continue
+            try:
+                stat_result = dir_entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat_result.st_mtime, stat_result.st_size, dir_entry.path))
+            total_size_in_bytes += stat_result.st_size
+        return entries, total_size_in_bytes
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the total size of the cache is within `max_size_in_bytes`"""
+        if self.max_size_in_bytes is None:
+            return None
+        entries, total_size_in_bytes = self.__get_entries_and_total_size()
+        self.total_size_in_bytes = total_size_in_bytes
+        if total_size_in_bytes <= self.max_size_in_bytes:
+            return None
+        for _, size_in_bytes, filepath in sorted(entries):
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+            total_size_in_bytes -= size_in_bytes
+            if total_size_in_bytes <= self.max_size_in_bytes:
+                break
+        self.total_size_in_bytes = total_size_in_bytes
+        return None
@@ -0,0 +1,88 @@
+from typing import Any, Dict, Optional, Tuple
+from PIL import Image
+
+
+# Crop regions are (left, top, right, bottom) as fractions of the width/height of the screenshot, so that they work
+# regardless of the resolution the screenshot was taken at. Add an entry here for every new screenshot layout, once its
+# timing and parse accuracy have been compared against unpreprocessed screenshots with
+# `benchmarks/benchmark_ocr_preprocessing.py`. Preprocessing is opt-in until then.
+CROP_REGIONS_BY_LAYOUT: Dict[str, Tuple[float, float, float, float]] = {
+    'full': (0.0, 0.0, 1.0, 1.0),
+}
+
+DEFAULT_PREPROCESSING_SETTINGS: Dict[str, Any] = {
+    'crop_region': CROP_REGIONS_BY_LAYOUT['full'],
+    'grayscale': True,
+    'binarization_threshold': None, # Integer in range [0, 255], or None to skip binarization
+    'max_height': 1080, # Cropped images taller than this are downscaled (keeping aspect ratio), or None to skip
+}
+
+
+def get_preprocessing_settings(
+        layout: Optional[str] = 'full',
+        **overrides: Any,
+    ) -> Dict[str, Any]:
+    """
+    Returns preprocessing settings having the crop region of the given screenshot layout.
+    Any other setting from `DEFAULT_PREPROCESSING_SETTINGS` can be overridden via keyword arguments.
+    """
+    if layout not in CROP_REGIONS_BY_LAYOUT:
+        raise ValueError(f"Expected `layout` to be in {list(CROP_REGIONS_BY_LAYOUT.keys())}, but got '{layout}'")
+    invalid_settings = list(set(overrides.keys()).difference(set(DEFAULT_PREPROCESSING_SETTINGS.keys())))
+    if invalid_settings:
+        raise ValueError(f"Got invalid preprocessing settings: {invalid_settings}")
+    settings = dict(DEFAULT_PREPROCESSING_SETTINGS)
+    settings['crop_region'] = CROP_REGIONS_BY_LAYOUT[layout]
+    settings.update(overrides)
+    return settings
+
+
+def crop_to_region(
+        image: Image.Image,
+        crop_region: Tuple[float, float, float, float],
+    ) -> Image.Image:
+    """Crops image to the given region, wherein the region is (left, top, right, bottom) as fractions of width/height"""
+    left, top, right, bottom = crop_region
+    if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+        raise ValueError(f"Invalid `crop_region`: {crop_region}")
+    width, height = image.size
+    box = (round(left * width), round(top * height), round(right * width), round(bottom * height))
+    if box == (0, 0, width, height):
+        return image
+    return image.crop(box)
+
+
+def downscale_to_max_height(image: Image.Image, max_height: int) -> Image.Image:
+    """Downscales image (keeping aspect ratio) if it is taller than `max_height`"""
+    width, height = image.size
+    if height <= max_height:
+        return image
+    new_width = max(1, round(width * max_height / height))
+    return image.resize((new_width, max_height), resample=Image.LANCZOS)
+
+
+def binarize(image: Image.Image, threshold: int) -> Image.Image:
+    """Converts image to black and white, wherein pixels brighter than `threshold` become white"""
+    image_grayscale = image.convert('L') if image.mode != 'L' else image
+    return image_grayscale.point(lambda pixel: 255 if pixel > threshold else 0)
+
+
+def preprocess_image(
+        image: Image.Image,
+        settings: Optional[Dict[str, Any]] = None,
+    ) -> Image.Image:
+    """
+    Prepares screenshot for OCR, so that fewer pixels are passed to the OCR tool.
+    Steps (in order): crop to the stats panel, grayscale, downscale, binarize.
+    Returns the image unchanged if no `settings` are given (see `get_preprocessing_settings`).
+    """
+    if not settings:
+        return image
+    image = crop_to_region(image=image, crop_region=tuple(settings['crop_region']))
+    if settings['grayscale']:
+        image = image.convert('L')
+    if settings['max_height']:
+        image = downscale_to_max_height(image=image, max_height=settings['max_height'])
+    if settings['binarization_threshold'] is not None:
+        image = binarize(image=image, threshold=settings['binarization_threshold'])
+    return image
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from ocr_cache import OcrCache
+
+
+def get_entry_filenames(folder: str) -> list:
+    return sorted(filename for filename in os.listdir(folder) if filename.endswith('.json'))
+
+
+def get_size_on_disk(folder: str) -> int:
+    return sum(os.path.getsize(os.path.join(folder, filename)) for filename in get_entry_filenames(folder=folder))
+
+
+def test_evicts_least_recently_used_entries() -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        cache = OcrCache(folder=folder, max_size_in_bytes=10**9)
+        cache.put(key='probe', raw_text='x' * 100, stat_dictionary={'HomeGoals': 0})
+        entry_size = get_size_on_disk(folder=folder)
+        os.remove(os.path.join(folder, 'probe.json'))
+
+        cache = OcrCache(folder=folder, max_size_in_bytes=int(4.5 * entry_size)) # Room for 4 entries
+        for number in range(6):
+            cache.put(key=f"key-{number}", raw_text='x' * 100, stat_dictionary={'HomeGoals': number})
+            os.utime(os.path.join(folder, f"key-{number}.json"), times=(number, number)) # Last used in order of number
+        # Baseline: the 4 most recently used entries are kept
+        assert get_entry_filenames(folder=folder) == [f"key-{number}.json" for number in range(2, 6)]
+        assert cache.total_size_in_bytes == get_size_on_disk(folder=folder)
+
+        assert cache.get(key='key-2')['stat_dictionary'] == {'HomeGoals': 2} # Now the most recently used
+        cache.put(key='key-6', raw_text='x' * 100, stat_dictionary={'HomeGoals': 6})
+        assert get_entry_filenames(folder=folder) == ['key-2.json', 'key-4.json', 'key-5.json', 'key-6.json']
+        assert cache.get(key='key-3') is None
+        assert cache.total_size_in_bytes == get_size_on_disk(folder=folder) <= cache.max_size_in_bytes
+
+        cache.put(key='key-6', raw_text='', stat_dictionary={}) # Replaced entry is not counted twice
+        assert cache.total_size_in_bytes == get_size_on_disk(folder=folder)
+    return None
+
+
+def test_unbounded_cache_never_evicts() -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        cache = OcrCache(folder=folder, max_size_in_bytes=None)
+        for number in range(50):
+            cache.put(key=f"key-{number}", raw_text='x' * 1000, stat_dictionary={'HomeGoals': number})
+        cache.evict()
+        assert len(get_entry_filenames(folder=folder)) == 50
+    return None
+
+
+if __name__ == "__main__":
+    test_evicts_least_recently_used_entries()
+    test_unbounded_cache_never_evicts()
+    print("All tests passed")
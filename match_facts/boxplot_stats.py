@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+BOXPLOT_STATS_COLUMNS = [
+    'Team', 'Count', 'Mean', 'Min', 'Q1', 'Median', 'Q3', 'Max', 'WhiskerLow', 'WhiskerHigh', 'NumOutliers', 'Outliers',
+]
+
+
+def __get_sorted_quantile(
+        sorted_values: np.ndarray,
+        starts: np.ndarray,
+        counts: np.ndarray,
+        quantile: float,
+    ) -> np.ndarray:
+    """
+    Returns quantile of every group of `sorted_values` (each group is sorted, starts at `starts` and has `counts` values),
+    using linear interpolation (same as the default of `np.percentile`)
+    """
+    positions = (counts - 1) * quantile
+    lower_offsets = np.floor(positions).astype(np.int64)
+    upper_offsets = np.minimum(lower_offsets + 1, counts - 1)
+    fractions = positions - lower_offsets
+    lower_values = sorted_values[starts + lower_offsets]
+    upper_values = sorted_values[starts + upper_offsets]
+    return lower_values + fractions * (upper_values - lower_values)
+
+
+def get_boxplot_stats(
+        values_by_participant: Dict[str, List[Union[int, float]]],
+        whisker_multiplier: Optional[float] = 1.5,
+    ) -> pd.DataFrame:
+    """
+    Takes in dictionary having keys = participant, and values = list of stat values of said participant (eg: one item
+    of `StatValueFetcher.as_dicts()`). Returns DataFrame having box-plot stats of every participant (one row each), with
+    the columns ['Team', 'Count', 'Mean', 'Min', 'Q1', 'Median', 'Q3', 'Max', 'WhiskerLow', 'WhiskerHigh',
+    'NumOutliers', 'Outliers'].
+    Whiskers reach the most extreme values within `whisker_multiplier` * IQR of the quartiles, and the values beyond the
+    whiskers are the outliers (same rules as `matplotlib`/`seaborn` box-plots).
+    All participants are handled together with NumPy (values of all participants are sorted once), without padding the
+    values of participants into a dense matrix. NaNs are ignored, and participants without values are left out.
+    """
+    participants = list(values_by_participant.keys())
+    lengths = np.array([len(values) for values in values_by_participant.values()], dtype=np.int64)
+    codes = np.repeat(np.arange(len(participants)), lengths)
+    values = np.concatenate([np.asarray(values, dtype=float) for values in values_by_participant.values()] or [np.array([])])
+    is_not_nan = ~np.isnan(values)
+    codes, values = codes[is_not_nan], values[is_not_nan]
+    order = np.lexsort((values, codes))
+    codes, sorted_values = codes[order], values[order]
+    counts_by_code = np.bincount(codes, minlength=len(participants))
+    has_values = (counts_by_code > 0)
+    counts = counts_by_code[has_values]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+    q1 = __get_sorted_quantile(sorted_values=sorted_values, starts=starts, counts=counts, quantile=0.25)
+    median = __get_sorted_quantile(sorted_values=sorted_values, starts=starts, counts=counts, quantile=0.5)
+    q3 = __get_sorted_quantile(sorted_values=sorted_values, starts=starts, counts=counts, quantile=0.75)
+    iqr = q3 - q1
+    group_indices = np.repeat(np.arange(len(counts)), counts)
+    lower_fences = (q1 - whisker_multiplier * iqr)[group_indices]
+    upper_fences = (q3 + whisker_multiplier * iqr)[group_indices]
+    is_within_fences = (sorted_values >= lower_fences) & (sorted_values <= upper_fences)
+    whisker_low = np.minimum.reduceat(np.where(is_within_fences, sorted_values, np.inf), starts)
+    whisker_high = np.maximum.reduceat(np.where(is_within_fences, sorted_values, -np.inf), starts)
+    num_outliers = np.bincount(group_indices[~is_within_fences], minlength=len(counts))
+    outlier_values = sorted_values[~is_within_fences]
+    outlier_starts = np.concatenate(([0], np.cumsum(num_outliers)))
+
+    df_boxplot_stats = pd.DataFrame(data={
+        'Team': np.array(participants, dtype=object)[has_values],
+        'Count': counts,
+        'Mean': np.add.reduceat(sorted_values, starts) / counts,
+        'Min': sorted_values[starts],
+        'Q1': q1,
+        'Median': median,
+        'Q3': q3,
+        'Max': sorted_values[starts + counts - 1],
+        'WhiskerLow': whisker_low,
+        'WhiskerHigh': whisker_high,
+        'NumOutliers': num_outliers,
+        'Outliers': [
+            outlier_values[outlier_starts[idx] : outlier_starts[idx + 1]].tolist() for idx in range(len(counts))
+        ],
+    })
+    return df_boxplot_stats
+
+
+def get_boxplot_stats_by_stat(
+        dict_stat_values: Dict[str, Dict[str, List[Union[int, float]]]],
+        whisker_multiplier: Optional[float] = 1.5,
+    ) -> Dict[str, pd.DataFrame]:
+    """
+    Takes in output of `StatValueFetcher.as_dicts()`. Returns dictionary having keys = stat name, and values =
+    DataFrame of box-plot stats by participant (see `get_boxplot_stats`)
+    """
+    boxplot_stats_by_stat = {
+        stat: get_boxplot_stats(values_by_participant=values_by_participant, whisker_multiplier=whisker_multiplier)
+        for stat, values_by_participant in dict_stat_values.items()
+    }
+    return boxplot_stats_by_stat
+
+
+def to_bxp_stats(df_boxplot_stats: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Converts DataFrame of box-plot stats to the list of dictionaries expected by `matplotlib.axes.Axes.bxp`"""
+    bxp_stats = [
+        {
+            'label': row.Team,
+            'mean': row.Mean,
+            'med': row.Median,
+            'q1': row.Q1,
+            'q3': row.Q3,
+            'whislo': row.WhiskerLow,
+            'whishi': row.WhiskerHigh,
+            'fliers': row.Outliers,
+        } for row in df_boxplot_stats.itertuples(index=False)
+    ]
+    return bxp_stats
+
+
+def get_boxplot_stats_table(boxplot_stats_by_stat: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Takes in output of `get_boxplot_stats_by_stat`. Returns one DataFrame (for export) having a 'Stat' column in front,
+    with the outliers of each participant joined into a string
+    """
+    dataframes = []
+    for stat, df_boxplot_stats in boxplot_stats_by_stat.items():
+        df_temp = df_boxplot_stats.copy(deep=True)
+        df_temp['Outliers'] = df_temp['Outliers'].apply(lambda outliers: ", ".join(str(outlier) for outlier in outliers))
+        df_temp.insert(loc=0, column='Stat', value=stat)
+        dataframes.append(df_temp)
+    if not dataframes:
+        return pd.DataFrame(columns=['Stat'] + BOXPLOT_STATS_COLUMNS)
+    df_table = pd.concat(objs=dataframes, ignore_index=True)
+    df_table = df_table.round(2)
+    return df_table
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import pandas as pd
+import output_sinks
+
+MANIFEST_FILENAME = '.chart-manifest.json'
+
+
+def get_fingerprint(data: Any, settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Returns SHA-256 fingerprint of the data slice of a chart plus its render settings.
+    `data` can be a DataFrame/Series (hashed with its index and column names), or any JSON-serializable object.
+    """
+    hasher = hashlib.sha256()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        hasher.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+        names = data.columns.tolist() if isinstance(data, pd.DataFrame) else [data.name]
+        hasher.update(json.dumps(names, default=str).encode('utf-8'))
+    else:
+        hasher.update(json.dumps(data, sort_keys=True, default=str).encode('utf-8'))
+    hasher.update(json.dumps(settings or {}, sort_keys=True, default=str).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class ChartManifest:
+
+    def __init__(self, folder: str, force_render: Optional[bool] = False) -> None:
+        """
+        Manifest of the charts saved in `folder`, kept in "{folder}/.chart-manifest.json" (filename => fingerprint of
+        the data slice plus render settings used for said chart).
+        Plotters call `should_render` before drawing each chart, and skip the charts whose fingerprint has not changed
+        since they were last saved (and which still exist). Call `save` once the charts have been saved.
+        If `force_render` is True, every chart is rendered (and the manifest is refreshed).
+        """
+        self.folder = folder
+        self.force_render = force_render
+        self.fingerprints = self.__read()
+        self.num_rendered = 0
+        self.num_skipped = 0
+        return None
+
+    def __get_filepath(self) -> str:
+        return os.path.join(self.folder, MANIFEST_FILENAME)
+
+    def __read(self) -> Dict[str, str]:
+        filepath = self.__get_filepath()
+        if not os.path.isfile(filepath):
+            return {}
+        with open(filepath, 'r', encoding='utf-8') as file_obj:
+            try:
+                return json.load(file_obj)
+            except json.JSONDecodeError:
+                return {}
+
+    def should_render(
+            self,
+            filepath: str,
+            data: Any,
+            settings: Optional[Dict[str, Any]] = None,
+        ) -> bool:
+        """
+        Returns True if the chart at `filepath` has to be (re-)rendered, i.e; its fingerprint changed or the file is
+        missing. The new fingerprint is recorded in the manifest.
+        """
+        filename = os.path.basename(filepath)
+        fingerprint = get_fingerprint(data=data, settings=settings)
+        is_up_to_date = (
+            not self.force_render
+            and self.fingerprints.get(filename) == fingerprint
+            and os.path.isfile(filepath)
+        )
+        if is_up_to_date:
+            self.num_skipped += 1
+            return False
+        self.fingerprints[filename] = fingerprint
+        self.num_rendered += 1
+        return True
+
+    def save(self) -> None:
+        """Saves the manifest (atomically), keeping only the entries of charts that exist"""
+        self.fingerprints = {
+            filename: fingerprint for filename, fingerprint in self.fingerprints.items()
+            if os.path.isfile(os.path.join(self.folder, filename))
+        }
+        def write_json(filepath: str) -> None:
+            with open(filepath, 'w', encoding='utf-8') as file_obj:
+                json.dump(self.fingerprints, file_obj, indent=4, sort_keys=True)
+            return None
+        output_sinks.write_atomically(filepath=self.__get_filepath(), writer=write_json)
+        return None
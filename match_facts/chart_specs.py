@@ -0,0 +1,170 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+import json
+import math
+import numpy as np
+import output_sinks
+
+CHART_FORMATS = ['png', 'json']
+CHART_SPEC_VERSION = 1
+
+
+def validate_chart_format(chart_format: str) -> None:
+    """Raises ValueError if `chart_format` is not one of the available chart formats"""
+    if chart_format not in CHART_FORMATS:
+        raise ValueError(f"Expected `chart_format` to be in {CHART_FORMATS}, but got '{chart_format}'")
+    return None
+
+
+def get_extension(chart_format: str) -> str:
+    """Returns file extension (including the leading dot) of charts saved in the given format"""
+    validate_chart_format(chart_format=chart_format)
+    return f".{chart_format}"
+
+
+def to_json_compatible(obj: Any) -> Any:
+    """Converts NumPy types to Python types, tuples to lists, and NaN/infinity to None (recursively)"""
+    if isinstance(obj, dict):
+        return {str(key): to_json_compatible(obj=value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [to_json_compatible(obj=value) for value in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+def save_chart_spec(
+        spec: Dict[str, Any],
+        filepath: str,
+        output_queue: Optional[output_sinks.OutputQueue] = None,
+    ) -> None:
+    """
+    Saves chart spec to a (compact) JSON file, atomically. If an `output_queue` is given, the spec is serialized here,
+    and written to disk by the writer threads of the queue.
+    """
+    content = json.dumps(to_json_compatible(obj=spec), separators=(',', ':'), allow_nan=False).encode('utf-8')
+    if output_queue is not None:
+        output_queue.submit_bytes(filepath=filepath, content=content)
+        return None
+    def write_json(temp_filepath: str) -> None:
+        with open(temp_filepath, 'wb') as file_obj:
+            file_obj.write(content)
+        return None
+    output_sinks.write_atomically(filepath=filepath, writer=write_json)
+    return None
+
+
+def __get_base_spec(chart_type: str, title: str, fig_size: Tuple[int, int]) -> Dict[str, Any]:
+    from plotter_helpers import get_calibrated_plot_fonts # Imported here, as it pulls in matplotlib which is slow to import
+    return {
+        'version': CHART_SPEC_VERSION,
+        'type': chart_type,
+        'title': title,
+        'figSize': fig_size,
+        'fonts': get_calibrated_plot_fonts(fig_size=fig_size),
+    }
+
+
+def get_distribution_spec(
+        title: str,
+        x_label: str,
+        y_label: str,
+        bxp_stats: List[Dict[str, Any]],
+        colors: List[str],
+        fig_size: Optional[Tuple[int, int]] = (30, 16),
+    ) -> Dict[str, Any]:
+    """
+    Returns spec of a horizontal box-plot chart. Expects box-plot stats in the format of `boxplot_stats.to_bxp_stats`.
+    Boxes are listed top to bottom, and `colors` are cycled over the boxes.
+    """
+    spec = __get_base_spec(chart_type='distribution', title=title, fig_size=fig_size)
+    spec.update({
+        'orientation': 'horizontal',
+        'xLabel': x_label,
+        'yLabel': y_label,
+        'boxes': [
+            {
+                'label': stats['label'],
+                'mean': stats['mean'],
+                'median': stats['med'],
+                'q1': stats['q1'],
+                'q3': stats['q3'],
+                'whiskerLow': stats['whislo'],
+                'whiskerHigh': stats['whishi'],
+                'outliers': stats['fliers'],
+                'color': colors[idx % len(colors)],
+            } for idx, stats in enumerate(bxp_stats)
+        ],
+    })
+    return spec
+
+
+def get_bar_spec(
+        title: str,
+        x_label: str,
+        y_label: str,
+        horizontal: bool,
+        bar_labels: List[str],
+        bar_values: List[Union[int, float]],
+        colors: List[str],
+        fig_size: Optional[Tuple[int, int]] = (12, 5),
+        annotate: Optional[bool] = True,
+        symmetrical: Optional[bool] = True,
+    ) -> Dict[str, Any]:
+    """
+    Returns spec of a bar chart (same parameters as `plotter_helpers.plot_bar`). If `symmetrical` is True and the
+    values have both signs, the value axis gets the same symmetrical limits as `plot_bar` uses.
+    """
+    from plotter_helpers import get_symmetrical_axis_limit
+    spec = __get_base_spec(chart_type='bar', title=title, fig_size=fig_size)
+    axis_limit = get_symmetrical_axis_limit(bar_values=bar_values) if symmetrical else None
+    spec.update({
+        'orientation': 'horizontal' if horizontal else 'vertical',
+        'xLabel': x_label,
+        'yLabel': y_label,
+        'labels': bar_labels,
+        'values': bar_values,
+        'colors': colors,
+        'annotate': annotate,
+        'valueAxisLimits': [-axis_limit, axis_limit] if axis_limit is not None else None,
+    })
+    return spec
+
+
+def get_timeseries_spec(
+        title: str,
+        values_by_team: Dict[str, List[Union[int, float]]],
+        fig_size: Optional[Tuple[int, int]] = (16, 10),
+    ) -> Dict[str, Any]:
+    """
+    Returns spec of a timeseries chart having one panel per team (x-values are the matchdays 1, 2, 3, ...).
+    Missing values (matchdays not played by a team) are null.
+    """
+    spec = __get_base_spec(chart_type='timeseries', title=title, fig_size=fig_size)
+    spec.update({
+        'xLabel': 'Matchday',
+        'panels': [
+            {'title': f"{title} - {team}", 'team': team, 'values': values} for team, values in values_by_team.items()
+        ],
+    })
+    return spec
+
+
+def get_radar_spec(
+        title: str,
+        labels: List[str],
+        values: List[Union[int, float]],
+        tick_limit: Optional[Tuple[Union[int, float], Union[int, float]]] = None,
+        fig_size: Optional[Tuple[int, int]] = (15, 9),
+        color: Optional[str] = None,
+    ) -> Dict[str, Any]:
+    """Returns spec of a radar chart (same parameters as `plotter_helpers.plot_radar`)"""
+    spec = __get_base_spec(chart_type='radar', title=title, fig_size=fig_size)
+    spec.update({
+        'labels': labels,
+        'values': values,
+        'radialLimits': tick_limit,
+        'color': color,
+    })
+    return spec
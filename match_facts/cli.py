@@ -0,0 +1,107 @@
+from typing import List, Optional
+import argparse
+
+from chart_specs import CHART_FORMATS
+from config import FOLDER_NAMES
+from output_sinks import OUTPUT_SINKS
+from pipeline import PARTICIPANT_TYPES, STAGES, execute_multi_file_pipeline, execute_pipeline
+from time_buckets import TIME_PERIODS
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Computes MatchFacts tables/visualizations. Only the requested stages/participant types are computed.",
+    )
+    parser.add_argument(
+        'src_filepaths', nargs='+', metavar='src_filepath',
+        help=(
+            "Filepath to MatchFacts CSV file, or root folder of a partitioned match store. If several are given, the"
+            " tables are computed across all of them (map-reduce over the files), and only the 'tables' stage is available"
+        ),
+    )
+    parser.add_argument(
+        '-o', '--output-root', default=FOLDER_NAMES['root-results'],
+        help="Folder in which all the results are stored (default: '%(default)s')",
+    )
+    parser.add_argument(
+        '-s', '--stages', nargs='+', choices=STAGES, default=None, metavar='STAGE',
+        help=f"Stages to run. Options: {STAGES} (default: all)",
+    )
+    parser.add_argument(
+        '-p', '--participant-types', nargs='+', choices=PARTICIPANT_TYPES, default=None, metavar='PARTICIPANT_TYPE',
+        help=f"Participant types to compute. Options: {PARTICIPANT_TYPES} (default: all for tables, 'team' for charts)",
+    )
+    parser.add_argument(
+        '--output-sink', choices=list(OUTPUT_SINKS.keys()), default='csv',
+        help="Sink used to save tables (default: '%(default)s')",
+    )
+    parser.add_argument(
+        '-t', '--time-period', choices=TIME_PERIODS, default=None,
+        help="Also save the tables of every time period (computed in one grouped pass)",
+    )
+    parser.add_argument(
+        '--start', type=int, default=None, metavar='YYYYMMDDHHMMSS',
+        help="Only use matches at/after this timestamp",
+    )
+    parser.add_argument(
+        '--end', type=int, default=None, metavar='YYYYMMDDHHMMSS',
+        help="Only use matches at/before this timestamp",
+    )
+    parser.add_argument(
+        '--chart-format', choices=CHART_FORMATS, default='png',
+        help="Format of the charts. 'json' saves chart specs (data, labels, scales, colors) instead of PNGs (default: '%(default)s')",
+    )
+    parser.add_argument(
+        '--force-render', action='store_true',
+        help="Re-render all charts, even the ones whose data has not changed since the last run",
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help=f"Profile every stage (cProfile + tracemalloc), and save the results to '{FOLDER_NAMES['root-profiling']}' next to the output root",
+    )
+    parser.add_argument(
+        '--writer-threads', type=int, default=2,
+        help="Number of background threads writing the tables/charts (0 writes them synchronously) (default: %(default)s)",
+    )
+    parser.add_argument(
+        '-w', '--max-workers', type=int, default=None,
+        help="Maximum number of worker processes used with several source files (default: number of CPUs)",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = get_argument_parser()
+    args = parser.parse_args(args=argv)
+    if len(args.src_filepaths) > 1:
+        if (args.stages and args.stages != ['tables']) or args.time_period or args.start or args.end or args.profile:
+            parser.error("Only the 'tables' stage (without time period/range/profiling options) is available with several source files")
+        execute_multi_file_pipeline(
+            src_filepaths=args.src_filepaths,
+            output_sink=args.output_sink,
+            output_root=args.output_root,
+            participant_types=args.participant_types,
+            max_workers=args.max_workers,
+        )
+        print("Done!")
+        return None
+    execute_pipeline(
+        src_filepath=args.src_filepaths[0],
+        output_sink=args.output_sink,
+        output_root=args.output_root,
+        stages=args.stages,
+        participant_types=args.participant_types,
+        time_period=args.time_period,
+        start_timestamp=args.start,
+        end_timestamp=args.end,
+        force_render=args.force_render,
+        chart_format=args.chart_format,
+        profile=args.profile,
+        writer_threads=args.writer_threads,
+    )
+    print("Done!")
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+from typing import Dict
 import os
 
 BIG_RESULT_GOAL_MARGIN = 3
+SEASON_START_MONTH = 8 # Matches from this month onwards belong to the season starting in the same year
 
 FOLDER_NAMES = {
     'root-results': "MatchFacts - Results",
+    'root-profiling': "MatchFacts - Profiling", # Created next to the results folder (opt-in)
     'tables': 'Tables',
     'viz': 'Visualizations',
     'viz-bar': 'Bar charts',
@@ -12,24 +15,32 @@ FOLDER_NAMES = {
     'viz-timeseries': 'Timeseries charts',
 }
 
-FOLDER_STRUCTURE = {
-    'root-results': FOLDER_NAMES['root-results'],
-    'tables': os.path.join(
-        FOLDER_NAMES['root-results'], FOLDER_NAMES['tables'],
-    ),
-    'viz': os.path.join(
-        FOLDER_NAMES['root-results'], FOLDER_NAMES['viz'],
-    ),
-    'viz-bar': os.path.join(
-        FOLDER_NAMES['root-results'], FOLDER_NAMES['viz'], FOLDER_NAMES['viz-bar'],
-    ),
-    'viz-distributions': os.path.join(
-        FOLDER_NAMES['root-results'], FOLDER_NAMES['viz'], FOLDER_NAMES['viz-distributions'],
-    ),
-    'viz-radar': os.path.join(
-        FOLDER_NAMES['root-results'], FOLDER_NAMES['viz'], FOLDER_NAMES['viz-radar'],
-    ),
-    'viz-timeseries': os.path.join(
-        FOLDER_NAMES['root-results'], FOLDER_NAMES['viz'], FOLDER_NAMES['viz-timeseries'],
-    ),
-}
\ No newline at end of file
+
+
+def get_folder_structure(root_folder: str) -> Dict[str, str]:
+    """Returns dictionary having keys = folder key, and values = path to said folder (inside `root_folder`)"""
+    folder_structure = {
+        'root-results': root_folder,
+        'tables': os.path.join(
+            root_folder, FOLDER_NAMES['tables'],
+        ),
+        'viz': os.path.join(
+            root_folder, FOLDER_NAMES['viz'],
+        ),
+        'viz-bar': os.path.join(
+            root_folder, FOLDER_NAMES['viz'], FOLDER_NAMES['viz-bar'],
+        ),
+        'viz-distributions': os.path.join(
+            root_folder, FOLDER_NAMES['viz'], FOLDER_NAMES['viz-distributions'],
+        ),
+        'viz-radar': os.path.join(
+            root_folder, FOLDER_NAMES['viz'], FOLDER_NAMES['viz-radar'],
+        ),
+        'viz-timeseries': os.path.join(
+            root_folder, FOLDER_NAMES['viz'], FOLDER_NAMES['viz-timeseries'],
+        ),
+    }
+    return folder_structure
+
+
+FOLDER_STRUCTURE = get_folder_structure(root_folder=FOLDER_NAMES['root-results'])
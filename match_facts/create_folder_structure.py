@@ -1,11 +1,11 @@
+from typing import Dict, Optional
 import os
 from config import FOLDER_STRUCTURE
 
 
-def create_folder_structure() -> None:
-    for _, folder_path in FOLDER_STRUCTURE.items():
-        try:
-            os.mkdir(folder_path)
-        except FileExistsError:
-            pass
+def create_folder_structure(folder_structure: Optional[Dict[str, str]] = None) -> None:
+    """Creates all folders in `folder_structure` (defaults to `config.FOLDER_STRUCTURE`) if they do not exist"""
+    folder_structure = folder_structure or FOLDER_STRUCTURE
+    for _, folder_path in folder_structure.items():
+        os.makedirs(folder_path, exist_ok=True)
     return None
\ No newline at end of file
@@ -0,0 +1,232 @@
+from typing import List, Optional, Tuple
+import os
+import numpy as np
+import pandas as pd
+from errors import InvalidMatchFactsError
+import output_sinks
+
+MATCH_KEY_COLUMNS = ['Timestamp', 'HomePlayer', 'AwayPlayer', 'HomeTeam', 'AwayTeam', 'HomeGoals', 'AwayGoals']
+DUPLICATE_POLICIES = ['drop', 'raise']
+EMPTY_SLOT = np.uint64(0)
+MAX_LOAD_FACTOR = 0.5
+INITIAL_CAPACITY = 1024 # Must be a power of 2
+TRAILER_LENGTH = 2 # Saved table ends with the generation and the number of keys
+
+
+def get_match_keys(data: pd.DataFrame) -> np.ndarray:
+    """
+    Returns 64-bit hash (uint64) of the identifying fields of every match (see `MATCH_KEY_COLUMNS`). Numbers are hashed
+    as integers and names as strings, so the same match read from CSV/Parquet/screenshots gets the same key.
+    Collisions are negligible (about 1 in 36 million for 1 million matches, per the birthday bound).
+    """
+    df_keys = data.loc[:, MATCH_KEY_COLUMNS].astype({
+        'Timestamp': 'int64',
+        'HomePlayer': str,
+        'AwayPlayer': str,
+        'HomeTeam': str,
+        'AwayTeam': str,
+        'HomeGoals': 'int64',
+        'AwayGoals': 'int64',
+    })
+    keys = pd.util.hash_pandas_object(df_keys, index=False).to_numpy(dtype=np.uint64)
+    keys[keys == EMPTY_SLOT] = 1 # 0 marks empty slots of the hash table
+    return keys
+
+
+class MatchDedupIndex:
+
+    def __init__(self, filepath: Optional[str] = None) -> None:
+        """
+        Persistent hash index of the matches in a match store, used to detect duplicate matches (eg: from merged exports
+        or re-uploaded screenshots) when appending. Keys are the hashes of `get_match_keys`.
+        The index is an open-addressing hash table (linear probing) in a NumPy array, so checking/adding rows costs
+        O(1) per row (expected), and is done for a whole batch of rows at once. It takes 8 bytes per slot, and is kept
+        at most half full (i.e; 16-32 bytes per stored match).
+        The table is saved to `filepath` (a .npy file having the slots, followed by the generation and the number of
+        keys) by `save`. It is memory-mapped (copy-on-write) when loaded, so only the pages that are probed are read, and
+        `save` writes only the slots that changed, in place. The file is rewritten as a whole only when the table has
+        been resized. In-place writes are recorded first in a journal ("{filepath}.journal"), which is written
+        atomically and replayed when the index is loaded, so a write that was cut short (eg: by a crash) is completed
+        instead of leaving a mix of old and new slots.
+        `generation` is set by the match store to the generation of its data before saving, so that an index that was
+        not saved along with the latest data (eg: due to a crash) can be detected and rebuilt.
+        """
+        self.filepath = filepath
+        self.generation = 0
+        self.__dirty_positions: List[np.ndarray] = []
+        self.__is_rewrite_needed = True
+        if filepath and os.path.isfile(filepath):
+            self.__replay_journal()
+            table = np.load(filepath, mmap_mode='c')
+            capacity = 1 << (len(table).bit_length() - 1) # Slots are followed by less than `capacity` values
+            trailer = [int(value) for value in table[capacity:]]
+            self.slots = table[:capacity]
+            self.num_keys = trailer[-1] if trailer else int(np.count_nonzero(self.slots))
+            self.generation = trailer[-2] if len(trailer) >= 2 else 0
+            if len(trailer) == TRAILER_LENGTH:
+                self.__is_rewrite_needed = False
+            else: # Saved by an earlier version (without generation/number of keys), so it is rewritten when saved
+                self.slots = np.array(self.slots)
+        else:
+            self.slots = np.zeros(shape=INITIAL_CAPACITY, dtype=np.uint64)
+            self.num_keys = 0
+        return None
+
+    def __len__(self) -> int:
+        return self.num_keys
+
+    @classmethod
+    def from_match_facts(cls, data: pd.DataFrame, filepath: Optional[str] = None) -> 'MatchDedupIndex':
+        """Returns new index having the matches in the MatchFacts DataFrame (eg: to build the index of an existing store)"""
+        dedup_index = cls(filepath=None)
+        dedup_index.filepath = filepath
+        dedup_index.add(keys=get_match_keys(data=data))
+        return dedup_index
+
+    def __probe(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns slot of every key (the slot having the key, or else the empty slot that ends its probe sequence), and
+        boolean mask of the keys that were found. All keys are probed together, one probe step at a time.
+        """
+        mask = np.uint64(len(self.slots) - 1)
+        slot_positions = (keys & mask).astype(np.int64)
+        is_found = np.zeros(shape=len(keys), dtype=bool)
+        is_pending = np.ones(shape=len(keys), dtype=bool)
+        pending = np.flatnonzero(is_pending)
+        while len(pending):
+            values = self.slots[slot_positions[pending]]
+            is_found[pending] = (values == keys[pending])
+            is_resolved = is_found[pending] | (values == EMPTY_SLOT)
+            pending = pending[~is_resolved]
+            slot_positions[pending] = (slot_positions[pending] + 1) & (len(self.slots) - 1)
+        return slot_positions, is_found
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Returns boolean mask of the keys that are in the index"""
+        _, is_found = self.__probe(keys=np.asarray(keys, dtype=np.uint64))
+        return is_found
+
+    def __insert_new(self, keys: np.ndarray) -> None:
+        """Inserts distinct keys that are not in the index (without resizing)"""
+        while len(keys):
+            slot_positions, _ = self.__probe(keys=keys)
+            # Keys probing into the same empty slot: the first one takes it, and the others probe again
+            _, first_indices = np.unique(slot_positions, return_index=True)
+            self.slots[slot_positions[first_indices]] = keys[first_indices]
+            self.__dirty_positions.append(slot_positions[first_indices])
+            is_inserted = np.zeros(shape=len(keys), dtype=bool)
+            is_inserted[first_indices] = True
+            keys = keys[~is_inserted]
+        return None
+
+    def __resize(self, min_num_keys: int) -> None:
+        capacity = len(self.slots)
+        while min_num_keys > capacity * MAX_LOAD_FACTOR:
+            capacity *= 2
+        if capacity == len(self.slots):
+            return None
+        keys = self.slots[self.slots != EMPTY_SLOT]
+        self.slots = np.zeros(shape=capacity, dtype=np.uint64)
+        self.__is_rewrite_needed = True # Every slot moves, so the whole file is rewritten
+        self.__insert_new(keys=keys)
+        return None
+
+    def get_duplicate_mask(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Returns boolean mask of the keys that are duplicates, i.e; already in the index, or repeating an earlier key of
+        the same batch. Does not modify the index.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        is_duplicate = np.ones(shape=len(keys), dtype=bool)
+        _, first_indices = np.unique(keys, return_index=True)
+        is_duplicate[first_indices] = False
+        is_duplicate[first_indices] = self.contains(keys=keys[first_indices])
+        return is_duplicate
+
+    def add(self, keys: np.ndarray) -> np.ndarray:
+        """Adds keys to the index. Returns boolean mask of the keys that were new (see `get_duplicate_mask`)"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        is_new = ~self.get_duplicate_mask(keys=keys)
+        new_keys = keys[is_new]
+        self.__resize(min_num_keys=self.num_keys + len(new_keys))
+        self.__insert_new(keys=new_keys)
+        self.num_keys += len(new_keys)
+        return is_new
+
+    def save(self) -> None:
+        """
+        Saves the index to `filepath`. Only the slots that changed since it was loaded/saved are written (in place, via
+        the journal), unless the table has been resized (or is new), in which case the file is rewritten atomically.
+        """
+        if not self.filepath:
+            raise ValueError("Expected `filepath` to save the index to, but got None")
+        self.__replay_journal() # A journal left by an earlier save must not be replayed over the new table
+        if self.__is_rewrite_needed or not os.path.isfile(self.filepath):
+            table = np.append(self.slots, np.array([self.generation, self.num_keys], dtype=np.uint64))
+            def write_npy(temp_filepath: str) -> None:
+                with open(temp_filepath, 'wb') as file_obj:
+                    np.save(file_obj, table)
+                return None
+            output_sinks.write_atomically(filepath=self.filepath, writer=write_npy)
+            self.__is_rewrite_needed = False
+        else:
+            positions = np.concatenate(self.__dirty_positions) if self.__dirty_positions else np.array([], dtype=np.int64)
+            journal = np.concatenate([
+                np.array([self.generation, self.num_keys], dtype=np.uint64),
+                positions.astype(np.uint64),
+                self.slots[positions],
+            ])
+            def write_journal(temp_filepath: str) -> None:
+                with open(temp_filepath, 'wb') as file_obj:
+                    np.save(file_obj, journal)
+                return None
+            output_sinks.write_atomically(filepath=self.__get_filepath_to_journal(), writer=write_journal)
+            self.__replay_journal()
+        self.__dirty_positions = []
+        return None
+
+    def __get_filepath_to_journal(self) -> str:
+        return f"{self.filepath}.journal"
+
+    def __replay_journal(self) -> None:
+        """
+        Writes the generation, number of keys and slots recorded in the journal (if any) to the saved table, and then
+        removes the journal. Replaying a journal more than once has no further effect.
+        Journal: generation, number of keys, positions of the slots, and values of the slots.
+        """
+        filepath_to_journal = self.__get_filepath_to_journal()
+        if not os.path.isfile(filepath_to_journal):
+            return None
+        if not os.path.isfile(self.filepath): # Nothing to complete
+            os.remove(filepath_to_journal)
+            return None
+        journal = np.load(filepath_to_journal)
+        num_positions = (len(journal) - TRAILER_LENGTH) // 2
+        positions = journal[TRAILER_LENGTH : TRAILER_LENGTH + num_positions].astype(np.int64)
+        table = np.load(self.filepath, mmap_mode='r+')
+        table[positions] = journal[TRAILER_LENGTH + num_positions :]
+        table[-TRAILER_LENGTH:] = journal[:TRAILER_LENGTH]
+        table.flush()
+        del table
+        os.remove(filepath_to_journal)
+        return None
+
+    def filter_new_matches(self, data: pd.DataFrame, on_duplicate: Optional[str] = 'drop') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Checks MatchFacts DataFrame against the index (and against its own earlier rows), and adds the new matches to
+        the index (call `save` once they have been stored). Returns tuple of (new matches, duplicate matches).
+        Options for `on_duplicate`: ['drop', 'raise']
+            - 'drop': Duplicates are left out of the new matches
+            - 'raise': Raises InvalidMatchFactsError listing the duplicates, without adding anything to the index
+        """
+        if on_duplicate not in DUPLICATE_POLICIES:
+            raise ValueError(f"Expected `on_duplicate` to be in {DUPLICATE_POLICIES}, but got '{on_duplicate}'")
+        keys = get_match_keys(data=data)
+        is_duplicate = self.get_duplicate_mask(keys=keys)
+        df_duplicates = data[is_duplicate]
+        if on_duplicate == 'raise' and not df_duplicates.empty:
+            raise InvalidMatchFactsError(
+                f"Found {len(df_duplicates)} duplicate match/es. Duplicates: {df_duplicates.loc[:, MATCH_KEY_COLUMNS].to_dict(orient='records')[:10]}"
+            )
+        self.add(keys=keys[~is_duplicate])
+        return data[~is_duplicate], df_duplicates
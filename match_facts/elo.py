@@ -0,0 +1,241 @@
+from array import array
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+PARTICIPANT_TYPES = ['team', 'player', 'combo']
+
+
+def get_goal_difference_multiplier(goal_difference: np.ndarray) -> np.ndarray:
+    """
+    Returns multiplier of the K-factor based on the absolute goal difference of each match (as used by the World Football
+    Elo Ratings): 1 for a draw or a win by 1 goal, 1.5 for a win by 2 goals, (11 + goal difference) / 8 otherwise
+    """
+    goal_difference = np.abs(goal_difference)
+    multiplier = np.where(goal_difference <= 1, 1.0, np.where(goal_difference == 2, 1.5, (11 + goal_difference) / 8))
+    return multiplier
+
+
+def get_participant_columns(data: pd.DataFrame, participant_type: str) -> Tuple[pd.Series, pd.Series]:
+    """Returns home/away participants of each match in the MatchFacts DataFrame, based on `participant_type`"""
+    if participant_type == 'team':
+        return data['HomeTeam'], data['AwayTeam']
+    if participant_type == 'player':
+        return data['HomePlayer'], data['AwayPlayer']
+    return data['HomePlayer'] + '|' + data['HomeTeam'], data['AwayPlayer'] + '|' + data['AwayTeam']
+
+
+class EloRatings:
+
+    def __init__(
+            self,
+            k_factor: Optional[float] = 20,
+            initial_rating: Optional[float] = 1500,
+            home_advantage: Optional[float] = 0,
+            use_goal_difference: Optional[bool] = True,
+        ) -> None:
+        """
+        Elo-style strength ratings of teams, players and (player, team) combos, kept together and updated in a single pass
+        over matches in ascending order of timestamp.
+        Use `EloRatings.from_match_facts` to rate a whole history, and `add_match` to add new matches one at a time
+        (O(1) each).
+
+        The rating of each participant after each match is recorded in compact typed arrays (4 bytes per rating), along
+        with the participant codes and timestamps, so that rating trajectories can be fetched later.
+
+        Parameters:
+            - k_factor (float): Maximum change in rating from one match (before the goal difference multiplier)
+            - initial_rating (float): Rating of a participant before their first match
+            - home_advantage (float): Rating points added to the home participant when computing the expected result
+            - use_goal_difference (bool): Whether to scale the K-factor by the goal difference of the match
+        """
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.home_advantage = home_advantage
+        self.use_goal_difference = use_goal_difference
+        self.timestamps = array('q')
+        self.codes = {} # Participant type => Dictionary having keys = participant, and values = code
+        self.participants = {} # Participant type => List of participants (index = code)
+        self.ratings = {} # Participant type => List of current ratings (index = code)
+        self.games_played = {} # Participant type => List of games played (index = code)
+        self.trajectories = {} # Participant type => Dictionary of arrays having home/away codes and ratings after each match
+        for participant_type in PARTICIPANT_TYPES:
+            self.codes[participant_type] = {}
+            self.participants[participant_type] = []
+            self.ratings[participant_type] = []
+            self.games_played[participant_type] = []
+            self.trajectories[participant_type] = {
+                'home_codes': array('i'),
+                'away_codes': array('i'),
+                'home_ratings': array('f'),
+                'away_ratings': array('f'),
+            }
+        return None
+
+    @classmethod
+    def from_match_facts(
+            cls,
+            data: pd.DataFrame,
+            k_factor: Optional[float] = 20,
+            initial_rating: Optional[float] = 1500,
+            home_advantage: Optional[float] = 0,
+            use_goal_difference: Optional[bool] = True,
+        ) -> 'EloRatings':
+        """
+        Rates all matches in the MatchFacts DataFrame (in ascending order of timestamp).
+        Participants are factorized into integer codes and the match results/multipliers are computed up front with
+        NumPy, so that the sequential part is a tight loop over plain lists.
+        """
+        elo = cls(
+            k_factor=k_factor,
+            initial_rating=initial_rating,
+            home_advantage=home_advantage,
+            use_goal_difference=use_goal_difference,
+        )
+        df_mf = data.sort_values(by='Timestamp', ascending=True, kind='mergesort', ignore_index=True)
+        home_goals = df_mf['HomeGoals'].values
+        away_goals = df_mf['AwayGoals'].values
+        home_scores = np.where(home_goals > away_goals, 1.0, np.where(home_goals < away_goals, 0.0, 0.5))
+        k_factors = np.full(len(df_mf), float(k_factor))
+        if use_goal_difference:
+            k_factors = k_factors * get_goal_difference_multiplier(goal_difference=home_goals - away_goals)
+        elo.timestamps.extend(df_mf['Timestamp'].values.astype(np.int64).tolist())
+        for participant_type in PARTICIPANT_TYPES:
+            home_participants, away_participants = get_participant_columns(data=df_mf, participant_type=participant_type)
+            codes, participants = pd.factorize(
+                pd.concat(objs=[home_participants, away_participants], ignore_index=True),
+            )
+            num_matches = len(df_mf)
+            home_codes, away_codes = codes[:num_matches], codes[num_matches:]
+            elo.participants[participant_type] = participants.tolist()
+            elo.codes[participant_type] = {participant: code for code, participant in enumerate(participants)}
+            elo.ratings[participant_type] = [float(initial_rating)] * len(participants)
+            elo.games_played[participant_type] = np.bincount(codes, minlength=len(participants)).tolist()
+            home_ratings_after, away_ratings_after = elo.__rate_matches(
+                ratings=elo.ratings[participant_type],
+                home_codes=home_codes.tolist(),
+                away_codes=away_codes.tolist(),
+                home_scores=home_scores.tolist(),
+                k_factors=k_factors.tolist(),
+            )
+            trajectory = elo.trajectories[participant_type]
+            trajectory['home_codes'].extend(home_codes.astype(np.int32).tolist())
+            trajectory['away_codes'].extend(away_codes.astype(np.int32).tolist())
+            trajectory['home_ratings'].extend(home_ratings_after)
+            trajectory['away_ratings'].extend(away_ratings_after)
+        return elo
+
+    def __rate_matches(
+            self,
+            ratings: List[float],
+            home_codes: List[int],
+            away_codes: List[int],
+            home_scores: List[float],
+            k_factors: List[float],
+        ) -> Tuple[List[float], List[float]]:
+        """
+        Updates `ratings` (in place) with the given matches, in order.
+        Returns ratings of the home and away participants after each match.
+        """
+        home_advantage = self.home_advantage
+        home_ratings_after = []
+        away_ratings_after = []
+        for home_code, away_code, home_score, k_factor in zip(home_codes, away_codes, home_scores, k_factors):
+            home_rating = ratings[home_code]
+            away_rating = ratings[away_code]
+            expected_home_score = 1 / (1 + 10 ** ((away_rating - home_rating - home_advantage) / 400))
+            change = k_factor * (home_score - expected_home_score)
+            home_rating += change
+            away_rating -= change
+            ratings[home_code] = home_rating
+            ratings[away_code] = away_rating
+            home_ratings_after.append(home_rating)
+            away_ratings_after.append(away_rating)
+        return home_ratings_after, away_ratings_after
+
+    def __get_or_add_code(self, participant_type: str, participant: str) -> int:
+        codes = self.codes[participant_type]
+        code = codes.get(participant)
+        if code is None:
+            code = len(self.participants[participant_type])
+            codes[participant] = code
+            self.participants[participant_type].append(participant)
+            self.ratings[participant_type].append(float(self.initial_rating))
+            self.games_played[participant_type].append(0)
+        return code
+
+    def add_match(
+            self,
+            timestamp: int,
+            home_player: str,
+            away_player: str,
+            home_team: str,
+            away_team: str,
+            home_goals: int,
+            away_goals: int,
+        ) -> None:
+        """
+        Updates ratings of the teams, players and combos of one match (O(1)).
+        Expects matches to be added in ascending order of timestamp.
+        """
+        home_score = 1.0 if home_goals > away_goals else (0.0 if home_goals < away_goals else 0.5)
+        k_factor = float(self.k_factor)
+        if self.use_goal_difference:
+            k_factor *= float(get_goal_difference_multiplier(goal_difference=np.array([home_goals - away_goals]))[0])
+        self.timestamps.append(int(timestamp))
+        dict_participants = {
+            'team': (home_team, away_team),
+            'player': (home_player, away_player),
+            'combo': (f"{home_player}|{home_team}", f"{away_player}|{away_team}"),
+        }
+        for participant_type, (home_participant, away_participant) in dict_participants.items():
+            home_code = self.__get_or_add_code(participant_type=participant_type, participant=home_participant)
+            away_code = self.__get_or_add_code(participant_type=participant_type, participant=away_participant)
+            self.games_played[participant_type][home_code] += 1
+            self.games_played[participant_type][away_code] += 1
+            home_ratings_after, away_ratings_after = self.__rate_matches(
+                ratings=self.ratings[participant_type],
+                home_codes=[home_code],
+                away_codes=[away_code],
+                home_scores=[home_score],
+                k_factors=[k_factor],
+            )
+            trajectory = self.trajectories[participant_type]
+            trajectory['home_codes'].append(home_code)
+            trajectory['away_codes'].append(away_code)
+            trajectory['home_ratings'].append(home_ratings_after[0])
+            trajectory['away_ratings'].append(away_ratings_after[0])
+        return None
+
+    def get_ratings(self, participant_type: str) -> pd.DataFrame:
+        """Returns DataFrame having the columns ['Rank', 'Participant', 'Rating', 'GamesPlayed'], sorted by rating"""
+        df_ratings = pd.DataFrame(data={
+            'Participant': self.participants[participant_type],
+            'Rating': np.round(self.ratings[participant_type], 2),
+            'GamesPlayed': self.games_played[participant_type],
+        })
+        df_ratings.sort_values(by=['Rating', 'Participant'], ascending=[False, True], ignore_index=True, inplace=True)
+        df_ratings.insert(loc=0, column='Rank', value=np.arange(start=1, stop=len(df_ratings) + 1, step=1))
+        return df_ratings
+
+    def get_trajectory(self, participant_type: str, participant: str) -> pd.DataFrame:
+        """Returns DataFrame having the columns ['Timestamp', 'Rating'] i.e; rating of participant after each of their matches"""
+        code = self.codes[participant_type].get(participant)
+        if code is None:
+            raise ValueError(f"Unknown {participant_type} '{participant}'")
+        trajectory = self.trajectories[participant_type]
+        home_codes = np.frombuffer(trajectory['home_codes'], dtype=np.int32)
+        away_codes = np.frombuffer(trajectory['away_codes'], dtype=np.int32)
+        is_home = (home_codes == code)
+        is_away = (away_codes == code)
+        ratings = np.where(
+            is_home,
+            np.frombuffer(trajectory['home_ratings'], dtype=np.float32),
+            np.frombuffer(trajectory['away_ratings'], dtype=np.float32),
+        )
+        is_playing = is_home | is_away
+        df_trajectory = pd.DataFrame(data={
+            'Timestamp': np.frombuffer(self.timestamps, dtype=np.int64)[is_playing],
+            'Rating': ratings[is_playing],
+        })
+        return df_trajectory
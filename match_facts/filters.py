@@ -1,35 +1,192 @@
-from typing import List
+from typing import Callable, Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
+from sqlite_store import SQLiteMatchStore, get_match_facts
 
+RESULTS = ['win', 'loss', 'draw']
 
-def filter_by_team(df_match_facts: pd.DataFrame, team: str) -> pd.DataFrame:
-    df_mf = df_match_facts.copy(deep=True)
-    team_is_playing = (df_mf['HomeTeam'] == team) | (df_mf['AwayTeam'] == team)
-    df_by_team = df_mf[team_is_playing]
-    return df_by_team
 
+class MatchFactsQuery:
 
-def filter_by_player(df_match_facts: pd.DataFrame, player: str) -> pd.DataFrame:
-    df_mf = df_match_facts.copy(deep=True)
-    player_is_playing = (df_mf['HomePlayer'] == player) | (df_mf['AwayPlayer'] == player)
-    df_by_player = df_mf[player_is_playing]
-    return df_by_player
+    def __init__(self, df_match_facts: pd.DataFrame) -> None:
+        """
+        Composable query over MatchFacts data. Predicates are collected by the chainable methods (`team`, `player`,
+        `player_and_team_combo`, `team_result`, `player_result`, `team_matchup`, `player_matchup`, `date_range`), and
+        are only evaluated by `get_positions`/`execute`.
+        Predicates are evaluated on NumPy arrays of the columns, in the order they were added. Each predicate is only
+        evaluated on the positions that passed the previous ones (index intersection), so the data is materialized at
+        most once (by `execute`), no matter how many predicates are combined.
+        Eg: `MatchFactsQuery(df_match_facts=data).team_result(team='Inter', result='win').date_range(start_timestamp=20210101000000).execute()`
+        """
+        self.data = df_match_facts
+        self.predicates: List[Callable[[Callable[[str], np.ndarray]], np.ndarray]] = []
+        self.__column_values: Dict[str, np.ndarray] = {}
+        return None
+
+    @staticmethod
+    def __validate_result(result: str) -> None:
+        if result not in RESULTS:
+            raise ValueError(f"Expected one of {RESULTS} for `result`, but got {result}")
+        return None
+
+    @staticmethod
+    def __validate_matchup(matchup: List[str]) -> None:
+        if len(matchup) != 2:
+            raise ValueError(f"Expected list of length 2, but got length {len(matchup)}")
+        return None
+
+    @staticmethod
+    def __get_result_mask(
+            is_home: np.ndarray,
+            is_away: np.ndarray,
+            home_goals: np.ndarray,
+            away_goals: np.ndarray,
+            result: str,
+        ) -> np.ndarray:
+        """Returns boolean mask of the matches in which the participant (playing home/away as per the masks) got the result"""
+        if result == 'win':
+            return (is_home & (home_goals > away_goals)) | (is_away & (away_goals > home_goals))
+        if result == 'loss':
+            return (is_home & (home_goals < away_goals)) | (is_away & (away_goals < home_goals))
+        return (is_home | is_away) & (home_goals == away_goals)
+
+    def __get_column_values(self, column: str) -> np.ndarray:
+        if column not in self.__column_values:
+            self.__column_values[column] = self.data[column].to_numpy()
+        return self.__column_values[column]
+
+    def where(self, predicate: Callable[[Callable[[str], np.ndarray]], np.ndarray]) -> 'MatchFactsQuery':
+        """
+        Adds custom predicate. It takes in a function returning the values of a column (by column name) of the rows
+        being evaluated, and returns a boolean mask over said rows.
+        Eg: `query.where(lambda get: get('HomeGoals') + get('AwayGoals') >= 5)`
+        """
+        self.predicates.append(predicate)
+        return self
+
+    def team(self, team: str) -> 'MatchFactsQuery':
+        """Keeps matches played by the team"""
+        return self.where(lambda get: (get('HomeTeam') == team) | (get('AwayTeam') == team))
+
+    def player(self, player: str) -> 'MatchFactsQuery':
+        """Keeps matches played by the player"""
+        return self.where(lambda get: (get('HomePlayer') == player) | (get('AwayPlayer') == player))
+
+    def player_and_team_combo(self, player: str, team: str) -> 'MatchFactsQuery':
+        """Keeps matches in which the player played with the team"""
+        return self.where(
+            lambda get: (
+                ((get('HomePlayer') == player) & (get('HomeTeam') == team))
+                | ((get('AwayPlayer') == player) & (get('AwayTeam') == team))
+            )
+        )
+
+    def team_result(self, team: str, result: str) -> 'MatchFactsQuery':
+        """Keeps matches in which the team got the result. Options for `result`: ['win', 'loss', 'draw']"""
+        self.__validate_result(result=result)
+        return self.where(
+            lambda get: self.__get_result_mask(
+                is_home=(get('HomeTeam') == team),
+                is_away=(get('AwayTeam') == team),
+                home_goals=get('HomeGoals'),
+                away_goals=get('AwayGoals'),
+                result=result,
+            )
+        )
+
+    def player_result(self, player: str, result: str) -> 'MatchFactsQuery':
+        """Keeps matches in which the player got the result. Options for `result`: ['win', 'loss', 'draw']"""
+        self.__validate_result(result=result)
+        return self.where(
+            lambda get: self.__get_result_mask(
+                is_home=(get('HomePlayer') == player),
+                is_away=(get('AwayPlayer') == player),
+                home_goals=get('HomeGoals'),
+                away_goals=get('AwayGoals'),
+                result=result,
+            )
+        )
+
+    def team_matchup(self, matchup: List[str]) -> 'MatchFactsQuery':
+        """Keeps matches between the 2 teams in `matchup` (either of them at home)"""
+        self.__validate_matchup(matchup=matchup)
+        team1, team2 = matchup
+        return self.where(
+            lambda get: (
+                ((get('HomeTeam') == team1) & (get('AwayTeam') == team2))
+                | ((get('HomeTeam') == team2) & (get('AwayTeam') == team1))
+            )
+        )
+
+    def player_matchup(self, matchup: List[str]) -> 'MatchFactsQuery':
+        """Keeps matches between the 2 players in `matchup` (either of them at home)"""
+        self.__validate_matchup(matchup=matchup)
+        player1, player2 = matchup
+        return self.where(
+            lambda get: (
+                ((get('HomePlayer') == player1) & (get('AwayPlayer') == player2))
+                | ((get('HomePlayer') == player2) & (get('AwayPlayer') == player1))
+            )
+        )
+
+    def date_range(
+            self,
+            start_timestamp: Optional[int] = None,
+            end_timestamp: Optional[int] = None,
+        ) -> 'MatchFactsQuery':
+        """Keeps matches played at/after `start_timestamp` and at/before `end_timestamp` (YYYYMMDDHHMMSS), if given"""
+        if start_timestamp is not None:
+            self.where(lambda get: get('Timestamp') >= start_timestamp)
+        if end_timestamp is not None:
+            self.where(lambda get: get('Timestamp') <= end_timestamp)
+        return self
+
+    def get_positions(self) -> np.ndarray:
+        """Returns (integer) positions of the rows that satisfy all predicates, without materializing any rows"""
+        positions = None
+        for predicate in self.predicates:
+            if positions is None:
+                get_values = self.__get_column_values
+            else:
+                get_values = lambda column: self.__get_column_values(column=column)[positions]
+            mask = np.asarray(predicate(get_values), dtype=bool)
+            positions = np.flatnonzero(mask) if positions is None else positions[mask]
+            if len(positions) == 0:
+                break
+        if positions is None:
+            return np.arange(len(self.data))
+        return positions
+
+    def count(self) -> int:
+        """Returns number of rows that satisfy all predicates"""
+        return len(self.get_positions())
+
+    def execute(self) -> pd.DataFrame:
+        """Returns DataFrame (new object, keeping the original index labels) of the rows that satisfy all predicates"""
+        return self.data.take(self.get_positions())
+
+
+def filter_by_team(df_match_facts: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> pd.DataFrame:
+    data = get_match_facts(data=df_match_facts, team=team)
+    return MatchFactsQuery(df_match_facts=data).team(team=team).execute()
+
+
+def filter_by_player(df_match_facts: Union[pd.DataFrame, SQLiteMatchStore], player: str) -> pd.DataFrame:
+    data = get_match_facts(data=df_match_facts, player=player)
+    return MatchFactsQuery(df_match_facts=data).player(player=player).execute()
 
 
 def filter_by_player_and_team_combo(
-        df_match_facts: pd.DataFrame,
+        df_match_facts: Union[pd.DataFrame, SQLiteMatchStore],
         player: str,
         team: str,
     ) -> pd.DataFrame:
-    df_mf = df_match_facts.copy(deep=True)
-    combo_is_home = (df_mf['HomePlayer'] == player) & (df_mf['HomeTeam'] == team)
-    combo_is_away = (df_mf['AwayPlayer'] == player) & (df_mf['AwayTeam'] == team)
-    df_by_player_and_team_combo = df_mf[combo_is_home | combo_is_away]
-    return df_by_player_and_team_combo
+    data = get_match_facts(data=df_match_facts, player_and_team_combo=(player, team))
+    return MatchFactsQuery(df_match_facts=data).player_and_team_combo(player=player, team=team).execute()
 
 
 def filter_by_team_result(
-        data: pd.DataFrame,
+        data: Union[pd.DataFrame, SQLiteMatchStore],
         team: str,
         result: str,
     ) -> pd.DataFrame:
@@ -37,24 +194,12 @@ def filter_by_team_result(
     Filters DataFrame having MatchFacts data (based on result obtained by the team).
     Options for `result`: ['win', 'loss', 'draw']
     """
-    if result not in ['win', 'loss', 'draw']:
-        raise ValueError(f"Expected one of ['win', 'loss', 'draw'] for `result`, but got {result}")
-    df_by_team = filter_by_team(df_match_facts=data, team=team)
-    if result == 'win':
-        home_win = ((df_by_team['HomeTeam'] == team) & (df_by_team['HomeGoals'] > df_by_team['AwayGoals']))
-        away_win = ((df_by_team['AwayTeam'] == team) & (df_by_team['AwayGoals'] > df_by_team['HomeGoals']))
-        df_by_team = df_by_team.loc[(home_win | away_win), :]
-    elif result == 'loss':
-        home_loss = ((df_by_team['HomeTeam'] == team) & (df_by_team['HomeGoals'] < df_by_team['AwayGoals']))
-        away_loss = ((df_by_team['AwayTeam'] == team) & (df_by_team['AwayGoals'] < df_by_team['HomeGoals']))
-        df_by_team = df_by_team.loc[(home_loss | away_loss), :]
-    elif result == 'draw':
-        df_by_team = df_by_team.loc[(df_by_team['HomeGoals'] == df_by_team['AwayGoals']), :]
-    return df_by_team
+    data = get_match_facts(data=data, team=team)
+    return MatchFactsQuery(df_match_facts=data).team_result(team=team, result=result).execute()
 
 
 def filter_by_player_result(
-        data: pd.DataFrame,
+        data: Union[pd.DataFrame, SQLiteMatchStore],
         player: str,
         result: str,
     ) -> pd.DataFrame:
@@ -62,45 +207,21 @@ def filter_by_player_result(
     Filters DataFrame having MatchFacts data (based on result obtained by the player).
     Options for `result`: ['win', 'loss', 'draw']
     """
-    if result not in ['win', 'loss', 'draw']:
-        raise ValueError(f"Expected one of ['win', 'loss', 'draw'] for `result`, but got {result}")
-    df_by_player = filter_by_player(df_match_facts=data, player=player)
-    if result == 'win':
-        home_win = ((df_by_player['HomePlayer'] == player) & (df_by_player['HomeGoals'] > df_by_player['AwayGoals']))
-        away_win = ((df_by_player['AwayPlayer'] == player) & (df_by_player['AwayGoals'] > df_by_player['HomeGoals']))
-        df_by_player = df_by_player.loc[(home_win | away_win), :]
-    elif result == 'loss':
-        home_loss = ((df_by_player['HomePlayer'] == player) & (df_by_player['HomeGoals'] < df_by_player['AwayGoals']))
-        away_loss = ((df_by_player['AwayPlayer'] == player) & (df_by_player['AwayGoals'] < df_by_player['HomeGoals']))
-        df_by_player = df_by_player.loc[(home_loss | away_loss), :]
-    elif result == 'draw':
-        df_by_player = df_by_player.loc[(df_by_player['HomeGoals'] == df_by_player['AwayGoals']), :]
-    return df_by_player
+    data = get_match_facts(data=data, player=player)
+    return MatchFactsQuery(df_match_facts=data).player_result(player=player, result=result).execute()
 
 
 def filter_by_team_matchup(
-        df_match_facts: pd.DataFrame,
+        df_match_facts: Union[pd.DataFrame, SQLiteMatchStore],
         matchup: List[str],
     ) -> pd.DataFrame:
-    if len(matchup) != 2:
-        raise ValueError(f"Expected list of length 2, but got length {len(matchup)}")
-    team1, team2 = matchup
-    df_mf = df_match_facts.copy(deep=True)
-    team1_is_home = (df_mf['HomeTeam'] == team1) & (df_mf['AwayTeam'] == team2)
-    team2_is_home = (df_mf['HomeTeam'] == team2) & (df_mf['AwayTeam'] == team1)
-    df_by_matchup = df_mf[team1_is_home | team2_is_home]
-    return df_by_matchup
+    data = get_match_facts(data=df_match_facts, team=matchup[0]) if matchup else df_match_facts
+    return MatchFactsQuery(df_match_facts=data).team_matchup(matchup=matchup).execute()
 
 
 def filter_by_player_matchup(
-        df_match_facts: pd.DataFrame,
+        df_match_facts: Union[pd.DataFrame, SQLiteMatchStore],
         matchup: List[str],
     ) -> pd.DataFrame:
-    if len(matchup) != 2:
-        raise ValueError(f"Expected list of length 2, but got length {len(matchup)}")
-    player1, player2 = matchup
-    df_mf = df_match_facts.copy(deep=True)
-    player1_is_home = (df_mf['HomePlayer'] == player1) & (df_mf['AwayPlayer'] == player2)
-    player2_is_home = (df_mf['HomePlayer'] == player2) & (df_mf['AwayPlayer'] == player1)
-    df_by_matchup = df_mf[player1_is_home | player2_is_home]
-    return df_by_matchup
\ No newline at end of file
+    data = get_match_facts(data=df_match_facts, player=matchup[0]) if matchup else df_match_facts
+    return MatchFactsQuery(df_match_facts=data).player_matchup(matchup=matchup).execute()
@@ -0,0 +1,205 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import os
+import re
+import sys
+import pandas as pd
+from dedup_index import MatchDedupIndex
+from errors import InvalidMatchFactsError
+from validators import (
+    EXPECTED_COLUMNS,
+    EXPECTED_FLOAT_COLUMNS,
+    EXPECTED_INTEGER_COLUMNS,
+    get_empty_match_facts,
+    validate_match_facts,
+)
+
+IMAGE2TEXT_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'image2text')
+if IMAGE2TEXT_FOLDER not in sys.path:
+    sys.path.append(IMAGE2TEXT_FOLDER)
+import image2text
+
+METADATA_COLUMNS = ['Timestamp', 'HomePlayer', 'AwayPlayer', 'HomeTeam', 'AwayTeam']
+SCREENSHOT_FILENAME_TIMESTAMP_PATTERN = r'(\d{8})_(\d{6})' # Eg: "20210529_214354.png"
+
+
+def get_filepath_to_sidecar(filepath_to_image: str) -> str:
+    """Returns filepath to the metadata sidecar of a screenshot (JSON file having the same name as the screenshot)"""
+    return f"{os.path.splitext(filepath_to_image)[0]}.json"
+
+
+def get_timestamp_from_filename(filepath_to_image: str) -> Optional[int]:
+    """Returns timestamp (as integer in the format YYYYMMDDHHMMSS) from screenshot filename if available, else None"""
+    match = re.search(pattern=SCREENSHOT_FILENAME_TIMESTAMP_PATTERN, string=os.path.basename(filepath_to_image))
+    if not match:
+        return None
+    return int(match.group(1) + match.group(2))
+
+
+def read_sidecar(filepath_to_image: str) -> Dict[str, Any]:
+    """
+    Reads metadata sidecar of a screenshot. The sidecar must have the keys ['HomePlayer', 'AwayPlayer', 'HomeTeam',
+    'AwayTeam'], and 'Timestamp' (integer in the format YYYYMMDDHHMMSS) unless the screenshot filename has it.
+    It can also have any other MatchFacts column (eg: 'HomeGoals'), which overrides the value read from the screenshot.
+    Example sidecar: {"Timestamp": 20210529214354, "HomePlayer": "Kevin", "AwayPlayer": "Toni", "HomeTeam": "Liverpool",
+    "AwayTeam": "Inter", "HomeGoals": 2, "AwayGoals": 1}
+    """
+    filepath_to_sidecar = get_filepath_to_sidecar(filepath_to_image=filepath_to_image)
+    if not os.path.isfile(filepath_to_sidecar):
+        raise InvalidMatchFactsError(f"Metadata sidecar not found for screenshot '{filepath_to_image}'")
+    with open(filepath_to_sidecar, 'r', encoding='utf-8') as file_obj:
+        metadata = json.load(file_obj)
+    if 'Timestamp' not in metadata:
+        timestamp = get_timestamp_from_filename(filepath_to_image=filepath_to_image)
+        if timestamp is not None:
+            metadata['Timestamp'] = timestamp
+    columns_missing = [column for column in METADATA_COLUMNS if column not in metadata]
+    if columns_missing:
+        raise InvalidMatchFactsError(
+            f"Metadata sidecar '{filepath_to_sidecar}' does not have the expected keys. Keys missing: {columns_missing}"
+        )
+    return metadata
+
+
+def to_match_facts(df_stats: pd.DataFrame, metadata_list: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Takes in DataFrame of stats read from screenshots (having a 'Filepath' column, one row per screenshot) and the
+    metadata of each screenshot (same order). Returns MatchFacts DataFrame having the expected columns and datatypes.
+    """
+    df_metadata = pd.DataFrame(data=metadata_list, index=df_stats.index)
+    df_mf = df_stats.copy(deep=True)
+    for column in df_metadata.columns.tolist():
+        df_mf[column] = df_metadata[column]
+    for side in ['Home', 'Away']:
+        if f"{side}ShotAccuracy" not in df_mf.columns and f"{side}ShotsOnTarget" in df_mf.columns:
+            shot_accuracy = (df_mf[f"{side}ShotsOnTarget"] * 100 / df_mf[f"{side}Shots"]).round(2)
+            df_mf[f"{side}ShotAccuracy"] = shot_accuracy.mask(df_mf[f"{side}Shots"] == 0, 0.0) # No shots => 0% accuracy
+    for row in df_mf.itertuples(index=False):
+        columns_missing = [column for column in EXPECTED_COLUMNS if pd.isnull(getattr(row, column, None))]
+        if columns_missing:
+            raise InvalidMatchFactsError(
+                f"Could not get all MatchFacts columns for screenshot '{row.Filepath}'. Columns missing: {columns_missing}"
+            )
+    df_mf = df_mf.loc[:, EXPECTED_COLUMNS]
+    df_mf = df_mf.astype({column: 'int64' for column in EXPECTED_INTEGER_COLUMNS})
+    df_mf = df_mf.astype({column: 'float64' for column in EXPECTED_FLOAT_COLUMNS})
+    return df_mf
+
+
+def iter_match_facts_from_screenshots(
+        directory_or_glob: str,
+        batch_size: Optional[int] = 100,
+        max_workers: Optional[int] = None,
+        cache_folder: Optional[str] = None,
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[pd.DataFrame]:
+    """
+    OCRs screenshots in the given directory/glob in batches (see `image2text.get_stats_dataframe_from_filepaths`),
+    combines them with their metadata sidecars, and yields one validated MatchFacts DataFrame per batch
+    """
+    filepaths = image2text.get_filepaths_to_images(directory_or_glob=directory_or_glob)
+    if not filepaths:
+        raise FileNotFoundError(f"No images found at '{directory_or_glob}'")
+    for idx in range(0, len(filepaths), batch_size):
+        filepaths_batch = filepaths[idx : idx + batch_size]
+        metadata_list = [read_sidecar(filepath_to_image=filepath) for filepath in filepaths_batch]
+        df_stats = image2text.get_stats_dataframe_from_filepaths(
+            filepaths=filepaths_batch,
+            max_workers=max_workers,
+            cache_folder=cache_folder,
+            preprocessing_settings=preprocessing_settings,
+        )
+        df_match_facts = to_match_facts(df_stats=df_stats, metadata_list=metadata_list)
+        validate_match_facts(df_match_facts=df_match_facts)
+        yield df_match_facts
+
+
+def get_filepath_to_dedup_index(match_store_filepath: str) -> str:
+    """Returns filepath to the dedup index of a MatchFacts CSV file (kept next to it)"""
+    return f"{match_store_filepath}.dedup-index.npy"
+
+
+def get_dedup_index(match_store_filepath: str) -> MatchDedupIndex:
+    """
+    Returns dedup index of the MatchFacts CSV file. If the index does not exist yet, it is built from the rows already
+    in the CSV file (if any)
+    """
+    filepath_to_dedup_index = get_filepath_to_dedup_index(match_store_filepath=match_store_filepath)
+    if os.path.isfile(filepath_to_dedup_index) or not os.path.isfile(match_store_filepath):
+        return MatchDedupIndex(filepath=filepath_to_dedup_index)
+    return MatchDedupIndex.from_match_facts(data=pd.read_csv(match_store_filepath), filepath=filepath_to_dedup_index)
+
+
+def append_to_match_store(
+        df_match_facts: pd.DataFrame,
+        match_store_filepath: str,
+        on_duplicate: Optional[str] = 'drop',
+        dedup_index: Optional[MatchDedupIndex] = None,
+    ) -> pd.DataFrame:
+    """
+    Appends MatchFacts rows to the MatchFacts CSV file (which is created if it does not exist), skipping matches that are
+    already in the file (or repeated within the rows), as per its dedup index (see `get_dedup_index`). Returns DataFrame
+    of the duplicate matches that were found.
+    Options for `on_duplicate`: ['drop', 'raise'] (see `MatchDedupIndex.filter_new_matches`)
+    Rows are written in the column order of the existing file. Raises InvalidMatchFactsError if its columns differ from
+    the MatchFacts columns.
+    """
+    is_new_file = not os.path.isfile(match_store_filepath)
+    columns = EXPECTED_COLUMNS if is_new_file else pd.read_csv(match_store_filepath, nrows=0).columns.tolist()
+    if sorted(columns) != sorted(EXPECTED_COLUMNS):
+        raise InvalidMatchFactsError(
+            f"Cannot append to '{match_store_filepath}', as its columns are not the MatchFacts columns. Columns: {columns}"
+        )
+    dedup_index = dedup_index or get_dedup_index(match_store_filepath=match_store_filepath)
+    df_new, df_duplicates = dedup_index.filter_new_matches(data=df_match_facts, on_duplicate=on_duplicate)
+    df_new.loc[:, columns].to_csv(match_store_filepath, mode='a', header=is_new_file, index=False)
+    dedup_index.save() # Saved after the rows, so that the index never has matches that are not in the file
+    return df_duplicates
+
+
+def ingest_screenshots(
+        directory_or_glob: str,
+        match_store_filepath: str,
+        batch_size: Optional[int] = 100,
+        max_workers: Optional[int] = None,
+        cache_folder: Optional[str] = None,
+        preprocessing_settings: Optional[Dict[str, Any]] = None,
+        on_duplicate: Optional[str] = 'drop',
+    ) -> Tuple[int, pd.DataFrame]:
+    """
+    Reads MatchFacts from screenshots (plus their metadata sidecars), and appends them in batches to the MatchFacts CSV
+    file at `match_store_filepath`. Returns tuple of (number of matches appended, DataFrame of the duplicate matches).
+    Matches that are already in the file (eg: re-uploaded screenshots) are dropped, or raise InvalidMatchFactsError if
+    `on_duplicate` is 'raise'.
+    """
+    num_matches_appended = 0
+    duplicates = [get_empty_match_facts()]
+    dedup_index = get_dedup_index(match_store_filepath=match_store_filepath)
+    batches = iter_match_facts_from_screenshots(
+        directory_or_glob=directory_or_glob,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        cache_folder=cache_folder,
+        preprocessing_settings=preprocessing_settings,
+    )
+    for df_match_facts in batches:
+        df_duplicates = append_to_match_store(
+            df_match_facts=df_match_facts,
+            match_store_filepath=match_store_filepath,
+            on_duplicate=on_duplicate,
+            dedup_index=dedup_index,
+        )
+        num_matches_appended += len(df_match_facts) - len(df_duplicates)
+        duplicates.append(df_duplicates)
+    df_duplicates = pd.concat(objs=duplicates, ignore_index=True)
+    return num_matches_appended, df_duplicates
+
+
+if __name__ == "__main__":
+    # Usage: python ingestion.py <directory-or-glob-of-screenshots> <filepath-to-match-facts-csv>
+    num_matches, df_duplicates = ingest_screenshots(
+        directory_or_glob=sys.argv[1],
+        match_store_filepath=sys.argv[2],
+        cache_folder=".ocr-cache",
+    )
+    print(f"Appended {num_matches} matches to '{sys.argv[2]}', and dropped {len(df_duplicates)} duplicate match/es")
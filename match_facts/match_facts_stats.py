@@ -1,12 +1,14 @@
-from typing import Union
+from typing import Optional, Union
 import numpy as np
 import pandas as pd
-import filters
-import utils
+from filters import MatchFactsQuery
+from partitions import ParticipantPartitions
+from sqlite_store import SQLiteMatchStore, get_match_facts
 
 
-def get_avg_possession(data: pd.DataFrame, team: str) -> Union[int, float]:
-    """Gets average possession of given team (Expects DataFrame having MatchFacts data)"""
+def get_avg_possession(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> Union[int, float]:
+    """Gets average possession of given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     if data.empty:
         return np.nan
     home_possession_values = data[(data['HomeTeam'] == team)]['HomePossession'].tolist()
@@ -15,8 +17,9 @@ def get_avg_possession(data: pd.DataFrame, team: str) -> Union[int, float]:
     return avg_possession
 
 
-def get_avg_shots(data: pd.DataFrame, team: str) -> Union[int, float]:
-    """Gets average shots of given team (Expects DataFrame having MatchFacts data)"""
+def get_avg_shots(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> Union[int, float]:
+    """Gets average shots of given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     if data.empty:
         return np.nan
     home_shots_values = data[(data['HomeTeam'] == team)]['HomeShots'].tolist()
@@ -25,8 +28,9 @@ def get_avg_shots(data: pd.DataFrame, team: str) -> Union[int, float]:
     return avg_shots
 
 
-def get_avg_shots_on_target(data: pd.DataFrame, team: str) -> Union[int, float]:
-    """Gets average shots on target of given team (Expects DataFrame having MatchFacts data)"""
+def get_avg_shots_on_target(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> Union[int, float]:
+    """Gets average shots on target of given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     if data.empty:
         return np.nan
     home_sot = data[(data['HomeTeam'] == team)]['HomeShotsOnTarget'].tolist()
@@ -35,8 +39,9 @@ def get_avg_shots_on_target(data: pd.DataFrame, team: str) -> Union[int, float]:
     return avg_shots_on_target
 
 
-def get_avg_shot_accuracy(data: pd.DataFrame, team: str) -> Union[int, float]:
-    """Gets average shot accuracy of given team (Expects DataFrame having MatchFacts data)"""
+def get_avg_shot_accuracy(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> Union[int, float]:
+    """Gets average shot accuracy of given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     if data.empty:
         return np.nan
     home_shot_accuracy = data[(data['HomeTeam'] == team)]['HomeShotAccuracy'].tolist()
@@ -45,8 +50,9 @@ def get_avg_shot_accuracy(data: pd.DataFrame, team: str) -> Union[int, float]:
     return avg_shot_accuracy
 
 
-def get_avg_pass_accuracy(data: pd.DataFrame, team: str) -> Union[int, float]:
-    """Gets average pass accuracy of given team (Expects DataFrame having MatchFacts data)"""
+def get_avg_pass_accuracy(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> Union[int, float]:
+    """Gets average pass accuracy of given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     if data.empty:
         return np.nan
     home_pass_accuracy = data[(data['HomeTeam'] == team)]['HomePassAccuracy'].tolist()
@@ -55,8 +61,9 @@ def get_avg_pass_accuracy(data: pd.DataFrame, team: str) -> Union[int, float]:
     return avg_pass_accuracy
 
 
-def get_avg_tackles(data: pd.DataFrame, team: str) -> Union[int, float]:
-    """Gets average tackles of given team (Expects DataFrame having MatchFacts data)"""
+def get_avg_tackles(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> Union[int, float]:
+    """Gets average tackles of given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     if data.empty:
         return np.nan
     home_tackles = data[(data['HomeTeam'] == team)]['HomeTackles'].tolist()
@@ -65,8 +72,9 @@ def get_avg_tackles(data: pd.DataFrame, team: str) -> Union[int, float]:
     return avg_tackles
 
 
-def get_avg_fouls(data: pd.DataFrame, team: str) -> Union[int, float]:
-    """Gets average fouls of given team (Expects DataFrame having MatchFacts data)"""
+def get_avg_fouls(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> Union[int, float]:
+    """Gets average fouls of given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     if data.empty:
         return np.nan
     home_fouls = data[(data['HomeTeam'] == team)]['HomeFouls'].tolist()
@@ -89,14 +97,14 @@ def __drop_result_based_columns(df_mf_stats: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def get_match_facts_stats_by_team(data: pd.DataFrame) -> pd.DataFrame:
-    """Expects MatchFacts DataFrame. Returns DataFrame of MatchFacts related stats by team"""
-    df_mf = data.copy(deep=True)
+def __get_match_facts_stats(partitions: ParticipantPartitions) -> pd.DataFrame:
+    """Returns DataFrame of MatchFacts related stats by participant (from the rows of each participant)"""
     df_mf_stats = pd.DataFrame()
-    teams = utils.get_unique_teams(df_match_facts=df_mf)
-    for team in teams:
-        df_by_team = filters.filter_by_team(df_match_facts=df_mf, team=team)
+    for team, df_by_team in partitions.items():
         games_played = len(df_by_team)
+        df_wins = MatchFactsQuery(df_match_facts=df_by_team).team_result(team=team, result='win').execute()
+        df_losses = MatchFactsQuery(df_match_facts=df_by_team).team_result(team=team, result='loss').execute()
+        df_draws = MatchFactsQuery(df_match_facts=df_by_team).team_result(team=team, result='draw').execute()
         df_temp = pd.DataFrame(data={
             'Team': team,
             'GamesPlayed': games_played,
@@ -108,87 +116,87 @@ def get_match_facts_stats_by_team(data: pd.DataFrame) -> pd.DataFrame:
             'AvgTackles': get_avg_tackles(data=df_by_team, team=team),
             'AvgFouls': get_avg_fouls(data=df_by_team, team=team),
             'AvgPossessionWhileWinning': get_avg_possession(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='win'),
+                data=df_wins,
                 team=team,
             ),
             'AvgPossessionWhileLosing': get_avg_possession(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='loss'),
+                data=df_losses,
                 team=team,
             ),
             'AvgPossessionWhileDrawing': get_avg_possession(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='draw'),
+                data=df_draws,
                 team=team,
             ),
             'AvgShotsWhileWinning': get_avg_shots(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='win'),
+                data=df_wins,
                 team=team,
             ),
             'AvgShotsWhileLosing': get_avg_shots(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='loss'),
+                data=df_losses,
                 team=team,
             ),
             'AvgShotsWhileDrawing': get_avg_shots(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='draw'),
+                data=df_draws,
                 team=team,
             ),
             'AvgShotsOnTargetWhileWinning': get_avg_shots_on_target(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='win'),
+                data=df_wins,
                 team=team,
             ),
             'AvgShotsOnTargetWhileLosing': get_avg_shots_on_target(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='loss'),
+                data=df_losses,
                 team=team,
             ),
             'AvgShotsOnTargetWhileDrawing': get_avg_shots_on_target(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='draw'),
+                data=df_draws,
                 team=team,
             ),
             'AvgShotAccuracyWhileWinning': get_avg_shot_accuracy(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='win'),
+                data=df_wins,
                 team=team,
             ),
             'AvgShotAccuracyWhileLosing': get_avg_shot_accuracy(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='loss'),
+                data=df_losses,
                 team=team,
             ),
             'AvgShotAccuracyWhileDrawing': get_avg_shot_accuracy(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='draw'),
+                data=df_draws,
                 team=team,
             ),
             'AvgPassAccuracyWhileWinning': get_avg_pass_accuracy(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='win'),
+                data=df_wins,
                 team=team,
             ),
             'AvgPassAccuracyWhileLosing': get_avg_pass_accuracy(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='loss'),
+                data=df_losses,
                 team=team,
             ),
             'AvgPassAccuracyWhileDrawing': get_avg_pass_accuracy(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='draw'),
+                data=df_draws,
                 team=team,
             ),
             'AvgTacklesWhileWinning': get_avg_tackles(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='win'),
+                data=df_wins,
                 team=team,
             ),
             'AvgTacklesWhileLosing': get_avg_tackles(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='loss'),
+                data=df_losses,
                 team=team,
             ),
             'AvgTacklesWhileDrawing': get_avg_tackles(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='draw'),
+                data=df_draws,
                 team=team,
             ),
             'AvgFoulsWhileWinning': get_avg_fouls(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='win'),
+                data=df_wins,
                 team=team,
             ),
             'AvgFoulsWhileLosing': get_avg_fouls(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='loss'),
+                data=df_losses,
                 team=team,
             ),
             'AvgFoulsWhileDrawing': get_avg_fouls(
-                data=filters.filter_by_team_result(data=df_by_team, team=team, result='draw'),
+                data=df_draws,
                 team=team,
             ),
         }, index=[0])
@@ -198,19 +206,40 @@ def get_match_facts_stats_by_team(data: pd.DataFrame) -> pd.DataFrame:
     return df_mf_stats
 
 
-def get_match_facts_stats_by_player(data: pd.DataFrame) -> pd.DataFrame:
-    """Expects MatchFacts DataFrame. Returns DataFrame of MatchFacts related stats by player"""
-    df_mf = data.copy(deep=True)
-    df_mf['HomeTeam'] = df_mf['HomePlayer'].tolist()
-    df_mf['AwayTeam'] = df_mf['AwayPlayer'].tolist()
-    df_mf_stats_by_player = get_match_facts_stats_by_team(data=df_mf)
-    return df_mf_stats_by_player
-
-
-def get_match_facts_stats_by_player_and_team_combo(data: pd.DataFrame) -> pd.DataFrame:
-    """Expects MatchFacts DataFrame. Returns DataFrame of MatchFacts related stats by (player, team) combo"""
-    df_mf = data.copy(deep=True)
-    df_mf['HomeTeam'] = df_mf['HomePlayer'] + '|' + df_mf['HomeTeam']
-    df_mf['AwayTeam'] = df_mf['AwayPlayer'] + '|' + df_mf['AwayTeam']
-    df_mf_stats_by_player_and_team_combo = get_match_facts_stats_by_team(data=df_mf)
-    return df_mf_stats_by_player_and_team_combo
\ No newline at end of file
+def get_match_facts_stats_by_team(
+        data: Union[pd.DataFrame, SQLiteMatchStore],
+        partitions: Optional[ParticipantPartitions] = None,
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame (or SQLiteMatchStore). Returns DataFrame of MatchFacts related stats by team.
+    Pass `partitions` (of `data`, split by team) to reuse rows that are already split, eg: across stats functions
+    """
+    if partitions is None:
+        partitions = ParticipantPartitions(df_match_facts=get_match_facts(data=data), participant_type='team')
+    return __get_match_facts_stats(partitions=partitions)
+
+
+def get_match_facts_stats_by_player(
+        data: Union[pd.DataFrame, SQLiteMatchStore],
+        partitions: Optional[ParticipantPartitions] = None,
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame (or SQLiteMatchStore). Returns DataFrame of MatchFacts related stats by player.
+    Pass `partitions` (of `data`, split by player) to reuse rows that are already split, eg: across stats functions
+    """
+    if partitions is None:
+        partitions = ParticipantPartitions(df_match_facts=get_match_facts(data=data), participant_type='player')
+    return __get_match_facts_stats(partitions=partitions)
+
+
+def get_match_facts_stats_by_player_and_team_combo(
+        data: Union[pd.DataFrame, SQLiteMatchStore],
+        partitions: Optional[ParticipantPartitions] = None,
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame (or SQLiteMatchStore). Returns DataFrame of MatchFacts related stats by (player, team) combo.
+    Pass `partitions` (of `data`, split by (player, team) combo) to reuse rows that are already split, eg: across stats functions
+    """
+    if partitions is None:
+        partitions = ParticipantPartitions(df_match_facts=get_match_facts(data=data), participant_type='combo')
+    return __get_match_facts_stats(partitions=partitions)
\ No newline at end of file
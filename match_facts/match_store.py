@@ -0,0 +1,252 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import pandas as pd
+from dedup_index import MatchDedupIndex
+from errors import InvalidMatchFactsError
+import output_sinks
+from sqlite_store import SQLiteMatchStore, is_sqlite_store
+from validators import EXPECTED_COLUMNS, get_empty_match_facts, validate_match_facts
+
+PARTITION_FILENAME_FORMAT = 'matches-{generation}.parquet'
+PARTITION_FILENAME = 'matches.parquet' # Partitions written before the partition files were named after the generation
+METADATA_FILENAME = '_partitions.json'
+DEDUP_INDEX_FILENAME = '_dedup-index.npy'
+
+
+def get_partition_keys(timestamps: pd.Series) -> pd.Series:
+    """Returns partition key (eg: 'year=2021/month=06') of each timestamp (integer in the format YYYYMMDDHHMMSS)"""
+    timestamps = timestamps.astype('int64')
+    years = (timestamps // 10**10).astype(str)
+    months = (timestamps // 10**8 % 100).astype(str).str.zfill(2)
+    partition_keys = 'year=' + years + '/month=' + months
+    return partition_keys
+
+
+class PartitionedMatchStore:
+
+    def __init__(self, root_folder: str) -> None:
+        """
+        Match store that keeps MatchFacts data in one Parquet file per month, at
+        "{root_folder}/year=YYYY/month=MM/matches-{generation}.parquet" (rows in ascending order of timestamp).
+        The file, minimum/maximum timestamp and number of rows of every partition are kept in
+        "{root_folder}/_partitions.json", so that reads limited to a range of timestamps only open the partitions that
+        overlap with the range.
+        Appending matches only rewrites the partitions that receive new rows (usually just the newest one), and skips
+        matches that are already in the store, as per the dedup index at "{root_folder}/_dedup-index.npy".
+        Every append is a new generation of the store. Its partition files are written under new names, and take effect
+        only once "_partitions.json" (which references them) has been replaced, so an append that fails midway leaves
+        the store as it was.
+        """
+        self.root_folder = root_folder
+        # Partition key => {'filename', 'min_timestamp', 'max_timestamp', 'num_rows'}
+        self.metadata, self.generation = self.__read_metadata()
+        self.duplicates = get_empty_match_facts() # Duplicate matches found by the latest `append`
+        return None
+
+    @staticmethod
+    def is_match_store(path: str) -> bool:
+        """Returns True if `path` is the root folder of a PartitionedMatchStore"""
+        return os.path.isfile(os.path.join(path, METADATA_FILENAME))
+
+    def __get_filepath_to_metadata(self) -> str:
+        return os.path.join(self.root_folder, METADATA_FILENAME)
+
+    def __get_folder_of_partition(self, partition_key: str) -> str:
+        return os.path.join(self.root_folder, *partition_key.split('/'))
+
+    def __get_filepath_to_partition(self, partition_key: str) -> str:
+        filename = self.metadata[partition_key].get('filename', PARTITION_FILENAME)
+        return os.path.join(self.__get_folder_of_partition(partition_key=partition_key), filename)
+
+    def __read_metadata(self) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """Returns tuple of (metadata of every partition, generation of the store)"""
+        filepath_to_metadata = self.__get_filepath_to_metadata()
+        if not os.path.isfile(filepath_to_metadata):
+            return {}, 0
+        with open(filepath_to_metadata, 'r', encoding='utf-8') as file_obj:
+            metadata = json.load(file_obj)
+        if 'partitions' not in metadata: # Written before the store had generations
+            return metadata, 0
+        return metadata['partitions'], metadata['generation']
+
+    def __write_metadata(self, metadata: Dict[str, Dict[str, Any]], generation: int) -> None:
+        def write_json(filepath: str) -> None:
+            with open(filepath, 'w', encoding='utf-8') as file_obj:
+                json.dump({'generation': generation, 'partitions': metadata}, file_obj, indent=4, sort_keys=True)
+            return None
+        output_sinks.write_atomically(filepath=self.__get_filepath_to_metadata(), writer=write_json)
+        return None
+
+    def get_partition_keys(
+            self,
+            start_timestamp: Optional[int] = None,
+            end_timestamp: Optional[int] = None,
+        ) -> List[str]:
+        """
+        Returns keys of the partitions (in chronological order) that have at least one match within the range
+        [start_timestamp, end_timestamp] according to their min/max timestamps. Both ends of the range are optional.
+        """
+        partition_keys = []
+        for partition_key, partition_metadata in sorted(self.metadata.items()):
+            if start_timestamp is not None and partition_metadata['max_timestamp'] < start_timestamp:
+                continue
+            if end_timestamp is not None and partition_metadata['min_timestamp'] > end_timestamp:
+                continue
+            partition_keys.append(partition_key)
+        return partition_keys
+
+    def get_dedup_index(self) -> MatchDedupIndex:
+        """
+        Returns dedup index of the store. It is built from the stored matches if it does not exist yet, or if it is not
+        of the current generation of the store (i.e; the latest append failed before the index was saved).
+        """
+        filepath_to_dedup_index = os.path.join(self.root_folder, DEDUP_INDEX_FILENAME)
+        if os.path.isfile(filepath_to_dedup_index):
+            dedup_index = MatchDedupIndex(filepath=filepath_to_dedup_index)
+            if dedup_index.generation == self.generation:
+                return dedup_index
+        elif not self.metadata:
+            return MatchDedupIndex(filepath=filepath_to_dedup_index)
+        dedup_index = MatchDedupIndex.from_match_facts(data=self.read(), filepath=filepath_to_dedup_index)
+        dedup_index.generation = self.generation
+        return dedup_index
+
+    def __read_partition(self, partition_key: str) -> pd.DataFrame:
+        return pd.read_parquet(self.__get_filepath_to_partition(partition_key=partition_key), engine='pyarrow')
+
+    def read(
+            self,
+            start_timestamp: Optional[int] = None,
+            end_timestamp: Optional[int] = None,
+        ) -> pd.DataFrame:
+        """
+        Returns MatchFacts DataFrame having the matches within the range [start_timestamp, end_timestamp] (both ends
+        optional), in ascending order of timestamp. Only the overlapping partitions are read.
+        """
+        dataframes = []
+        for partition_key in self.get_partition_keys(start_timestamp=start_timestamp, end_timestamp=end_timestamp):
+            df_partition = self.__read_partition(partition_key=partition_key)
+            partition_metadata = self.metadata[partition_key]
+            # Rows are filtered only in the partitions at the edges of the range
+            if start_timestamp is not None and partition_metadata['min_timestamp'] < start_timestamp:
+                df_partition = df_partition[df_partition['Timestamp'] >= start_timestamp]
+            if end_timestamp is not None and partition_metadata['max_timestamp'] > end_timestamp:
+                df_partition = df_partition[df_partition['Timestamp'] <= end_timestamp]
+            dataframes.append(df_partition)
+        if not dataframes:
+            return get_empty_match_facts()
+        df_match_facts = pd.concat(objs=dataframes, ignore_index=True)
+        return df_match_facts
+
+    def append(self, data: pd.DataFrame, on_duplicate: Optional[str] = 'drop') -> List[str]:
+        """
+        Appends MatchFacts DataFrame to the store (validated first). Returns keys of the partitions that were written.
+        Matches already in the store (or repeated within `data`) are dropped, and kept in `self.duplicates`.
+        Options for `on_duplicate`: ['drop', 'raise'] (see `MatchDedupIndex.filter_new_matches`)
+        """
+        self.duplicates = get_empty_match_facts()
+        if data.empty:
+            return []
+        validate_match_facts(df_match_facts=data)
+        dedup_index = self.get_dedup_index()
+        df_new, self.duplicates = dedup_index.filter_new_matches(data=data.loc[:, EXPECTED_COLUMNS], on_duplicate=on_duplicate)
+        if df_new.empty:
+            return []
+        generation = self.generation + 1
+        filename = PARTITION_FILENAME_FORMAT.format(generation=generation)
+        metadata = dict(self.metadata)
+        partition_keys_written = []
+        for partition_key, df_new_partition in df_new.groupby(by=get_partition_keys(timestamps=df_new['Timestamp']).values):
+            if partition_key in metadata:
+                df_partition = pd.concat(
+                    objs=[self.__read_partition(partition_key=partition_key), df_new_partition],
+                    ignore_index=True,
+                )
+            else:
+                df_partition = df_new_partition
+            df_partition = df_partition.sort_values(by='Timestamp', ascending=True, kind='mergesort', ignore_index=True)
+            folder_of_partition = self.__get_folder_of_partition(partition_key=partition_key)
+            os.makedirs(folder_of_partition, exist_ok=True)
+            output_sinks.write_atomically(
+                filepath=os.path.join(folder_of_partition, filename),
+                writer=lambda temp_filepath: df_partition.to_parquet(temp_filepath, index=False, engine='pyarrow'),
+            )
+            metadata[partition_key] = {
+                'filename': filename,
+                'min_timestamp': int(df_partition['Timestamp'].iloc[0]),
+                'max_timestamp': int(df_partition['Timestamp'].iloc[-1]),
+                'num_rows': len(df_partition),
+            }
+            partition_keys_written.append(partition_key)
+        # The metadata commits the append (until then, the new partition files are not referenced). The dedup index is
+        # saved last, so that it never has matches that are not in the store. If saving it fails, it is rebuilt from the
+        # store, as its generation is behind the store's
+        self.__write_metadata(metadata=metadata, generation=generation)
+        self.metadata, self.generation = metadata, generation
+        for partition_key in partition_keys_written:
+            self.__remove_unreferenced_files(partition_key=partition_key)
+        dedup_index.generation = generation
+        dedup_index.save()
+        return partition_keys_written
+
+    def __remove_unreferenced_files(self, partition_key: str) -> None:
+        """Removes files of the partition that were replaced by the latest append (or left behind by a failed one)"""
+        folder_of_partition = self.__get_folder_of_partition(partition_key=partition_key)
+        for filename in os.listdir(folder_of_partition):
+            if filename.startswith('matches') and filename != self.metadata[partition_key]['filename']:
+                os.remove(os.path.join(folder_of_partition, filename))
+        return None
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Returns dictionary having the number of partitions/rows, and the min/max timestamp of the store"""
+        if not self.metadata:
+            return {'num_partitions': 0, 'num_rows': 0, 'min_timestamp': None, 'max_timestamp': None}
+        return {
+            'num_partitions': len(self.metadata),
+            'num_rows': sum(partition_metadata['num_rows'] for partition_metadata in self.metadata.values()),
+            'min_timestamp': min(partition_metadata['min_timestamp'] for partition_metadata in self.metadata.values()),
+            'max_timestamp': max(partition_metadata['max_timestamp'] for partition_metadata in self.metadata.values()),
+        }
+
+
+def read_match_facts(
+        src_filepath: str,
+        start_timestamp: Optional[int] = None,
+        end_timestamp: Optional[int] = None,
+    ) -> pd.DataFrame:
+    """
+    Reads MatchFacts data within the range [start_timestamp, end_timestamp] (both ends optional) from either a CSV file,
+    the root folder of a PartitionedMatchStore (in which case only the overlapping partitions are read), or a
+    SQLiteMatchStore file (in which case the range is looked up via its timestamp index).
+    """
+    if is_sqlite_store(path=src_filepath):
+        if not os.path.isfile(src_filepath):
+            raise InvalidMatchFactsError(f"SQLite match store '{src_filepath}' does not exist")
+        with SQLiteMatchStore(filepath=src_filepath) as sqlite_store:
+            return sqlite_store.read(start_timestamp=start_timestamp, end_timestamp=end_timestamp)
+    if os.path.isdir(src_filepath):
+        if not PartitionedMatchStore.is_match_store(path=src_filepath):
+            raise InvalidMatchFactsError(f"Folder '{src_filepath}' is not a partitioned match store")
+        return PartitionedMatchStore(root_folder=src_filepath).read(
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+        )
+    df_match_facts = pd.read_csv(src_filepath)
+    if start_timestamp is not None:
+        df_match_facts = df_match_facts[df_match_facts['Timestamp'] >= start_timestamp]
+    if end_timestamp is not None:
+        df_match_facts = df_match_facts[df_match_facts['Timestamp'] <= end_timestamp]
+    df_match_facts = df_match_facts.reset_index(drop=True)
+    return df_match_facts
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        print("Usage: python match_store.py <MatchFacts CSV> <match store folder>")
+        sys.exit(1)
+    match_store = PartitionedMatchStore(root_folder=sys.argv[2])
+    partition_keys_written = match_store.append(data=pd.read_csv(sys.argv[1]))
+    print(f"Wrote {len(partition_keys_written)} partition/s, and dropped {len(match_store.duplicates)} duplicate match/es")
+    print(f"Store summary: {match_store.get_summary()}")
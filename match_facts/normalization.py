@@ -0,0 +1,139 @@
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+NORMALIZATION_METHODS = ['percentile', 'min-max']
+LEADERBOARD_COLUMNS = ['AvgPossession', 'AvgShots', 'AvgShotsOnTarget', 'AvgShotAccuracy', 'AvgPassAccuracy', 'AvgTackles', 'AvgFouls']
+LEADERBOARD_COLUMNS_WITH_DESIRABLE_LOWS = ['AvgFouls']
+
+
+def __get_percentile_ranks(matrix: np.ndarray) -> np.ndarray:
+    """
+    Returns percentile rank (in range [0, 1]) of every value within its column, i.e; (number of values below it +
+    half the number of values equal to it) / number of values. NaNs stay NaN and are not counted.
+    All columns are ranked together by sorting the flattened matrix once by (column, value).
+    """
+    num_rows, num_columns = matrix.shape
+    values = matrix.ravel(order='F')
+    column_ids = np.repeat(np.arange(num_columns), num_rows)
+    order = np.lexsort((values, column_ids)) # NaNs are sorted to the end of each column
+    sorted_values, sorted_column_ids = values[order], column_ids[order]
+    is_nan = np.isnan(sorted_values)
+    counts = np.bincount(column_ids[~np.isnan(values)], minlength=num_columns)
+    column_starts = np.arange(num_columns) * num_rows
+    # Bounds of each run of equal values (within a column)
+    is_run_start = np.ones(len(sorted_values), dtype=bool)
+    is_run_start[1:] = (sorted_values[1:] != sorted_values[:-1]) | (sorted_column_ids[1:] != sorted_column_ids[:-1])
+    run_ids = np.cumsum(is_run_start) - 1
+    run_starts = np.flatnonzero(is_run_start)
+    run_lengths = np.diff(np.append(run_starts, len(sorted_values)))
+    num_below = run_starts[run_ids] - column_starts[sorted_column_ids]
+    num_equal = run_lengths[run_ids]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sorted_ranks = (num_below + 0.5 * num_equal) / counts[sorted_column_ids]
+    sorted_ranks[is_nan] = np.nan
+    ranks = np.empty_like(sorted_ranks)
+    ranks[order] = sorted_ranks
+    return ranks.reshape((num_rows, num_columns), order='F')
+
+
+def __get_min_max_scaled(matrix: np.ndarray) -> np.ndarray:
+    """
+    Returns values of every column scaled to range [0, 1] (NaNs stay NaN and are ignored).
+    Columns having a single distinct value are set to 0.5
+    """
+    minimums = np.fmin.reduce(matrix, axis=0) # Ignores NaNs
+    ranges = np.fmax.reduce(matrix, axis=0) - minimums
+    with np.errstate(invalid='ignore'):
+        scaled = np.where(ranges > 0, (matrix - minimums) / np.where(ranges > 0, ranges, 1), 0.5)
+    scaled[np.isnan(matrix)] = np.nan
+    return scaled
+
+
+def normalize_matrix(
+        matrix: np.ndarray,
+        method: Optional[str] = 'percentile',
+        lower_is_better: Optional[List[bool]] = None,
+        scale: Optional[float] = 100,
+    ) -> np.ndarray:
+    """
+    Normalizes every column of a 2D matrix to the range [0, `scale`], keeping NaNs in place (NaNs are ignored when
+    computing the normalized values of the other rows).
+    Options for `method`: ['percentile', 'min-max']
+        - 'percentile': Percentile rank within the column (ties get the same rank)
+        - 'min-max': (value - min) / (max - min). Columns having a single distinct value get `scale` / 2
+    If given, `lower_is_better` has one boolean per column; those columns are flipped (`scale` - value), so that higher
+    is always better.
+    """
+    if method not in NORMALIZATION_METHODS:
+        raise ValueError(f"Expected `method` to be in {NORMALIZATION_METHODS}, but got '{method}'")
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected `matrix` to be 2-dimensional, but got {matrix.ndim} dimension/s")
+    if matrix.size == 0:
+        return matrix.copy()
+    if method == 'percentile':
+        normalized = __get_percentile_ranks(matrix=matrix)
+    else:
+        normalized = __get_min_max_scaled(matrix=matrix)
+    if lower_is_better is not None:
+        if len(lower_is_better) != matrix.shape[1]:
+            raise ValueError(
+                f"Expected `lower_is_better` to have {matrix.shape[1]} values (one per column), but got {len(lower_is_better)}"
+            )
+        normalized = np.where(np.asarray(lower_is_better, dtype=bool), 1 - normalized, normalized)
+    return normalized * scale
+
+
+def normalize_columns(
+        data: pd.DataFrame,
+        columns: List[str],
+        method: Optional[str] = 'percentile',
+        columns_with_desirable_lows: Optional[List[str]] = None,
+        scale: Optional[float] = 100,
+    ) -> pd.DataFrame:
+    """
+    Returns copy of DataFrame in which the given numerical columns are normalized to the range [0, `scale`] (rounded to
+    2 decimals) with `normalize_matrix`. NaNs are kept in place. Columns in `columns_with_desirable_lows` are flipped,
+    so that higher is always better
+    """
+    columns_with_desirable_lows = columns_with_desirable_lows or []
+    df = data.copy(deep=True)
+    df[columns] = np.round(
+        normalize_matrix(
+            matrix=df.loc[:, columns].to_numpy(dtype=float),
+            method=method,
+            lower_is_better=[column in columns_with_desirable_lows for column in columns],
+            scale=scale,
+        ),
+        2,
+    )
+    return df
+
+
+def get_leaderboard(
+        df_match_facts_stats: pd.DataFrame,
+        columns: Optional[List[str]] = None,
+        columns_with_desirable_lows: Optional[List[str]] = None,
+        method: Optional[str] = 'percentile',
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFactsStats DataFrame (eg: output of `match_facts_stats.get_match_facts_stats_by_team`).
+    Returns DataFrame having the columns ['Rank', 'Team', 'GamesPlayed', 'OverallScore'] followed by the normalized
+    `columns` (0-100, higher is better), sorted by 'OverallScore' (mean of the normalized values, ignoring NaNs).
+    """
+    columns = columns or LEADERBOARD_COLUMNS
+    if columns_with_desirable_lows is None:
+        columns_with_desirable_lows = LEADERBOARD_COLUMNS_WITH_DESIRABLE_LOWS
+    df_leaderboard = normalize_columns(
+        data=df_match_facts_stats.loc[:, ['Team', 'GamesPlayed'] + columns],
+        columns=columns,
+        method=method,
+        columns_with_desirable_lows=columns_with_desirable_lows,
+    )
+    df_leaderboard.insert(loc=2, column='OverallScore', value=df_leaderboard.loc[:, columns].mean(axis=1).round(2))
+    df_leaderboard.sort_values(by=['OverallScore', 'Team'], ascending=[False, True], ignore_index=True, inplace=True)
+    values = df_leaderboard['OverallScore']
+    positions = pd.Series(data=np.arange(start=1, stop=len(df_leaderboard) + 1, step=1))
+    df_leaderboard.insert(loc=0, column='Rank', value=positions.where(values.ne(values.shift()), 0).cummax())
+    return df_leaderboard
@@ -0,0 +1,208 @@
+from typing import Callable, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import tempfile
+import threading
+import pandas as pd
+
+
+def __write_csv(data: pd.DataFrame, filepath: str) -> None:
+    data.to_csv(filepath, index=False)
+    return None
+
+
+def __write_csv_gzip(data: pd.DataFrame, filepath: str) -> None:
+    data.to_csv(filepath, index=False, compression='gzip')
+    return None
+
+
+def __write_csv_zstd(data: pd.DataFrame, filepath: str) -> None:
+    import zstandard
+    compressor = zstandard.ZstdCompressor(level=3)
+    with open(filepath, 'wb') as file_obj:
+        with compressor.stream_writer(file_obj) as zstd_writer:
+            with io.TextIOWrapper(zstd_writer, encoding='utf-8', newline='') as text_writer:
+                data.to_csv(text_writer, index=False)
+    return None
+
+
+def __write_parquet(data: pd.DataFrame, filepath: str) -> None:
+    data.to_parquet(filepath, index=False, engine='pyarrow', compression='snappy')
+    return None
+
+
+# Sink name => (file extension, writer function)
+OUTPUT_SINKS: Dict[str, Tuple[str, Callable]] = {
+    'csv': ('.csv', __write_csv),
+    'csv-gzip': ('.csv.gz', __write_csv_gzip),
+    'csv-zstd': ('.csv.zst', __write_csv_zstd),
+    'parquet': ('.parquet', __write_parquet),
+}
+
+
+def validate_sink(sink: str) -> None:
+    """Raises ValueError if `sink` is not one of the available output sinks"""
+    valid_sinks = list(OUTPUT_SINKS.keys())
+    if sink not in valid_sinks:
+        raise ValueError(f"Expected `sink` to be in {valid_sinks}, but got '{sink}'")
+    return None
+
+
+def get_extension(sink: str) -> str:
+    """Returns file extension (including the leading dot) used by the given output sink"""
+    validate_sink(sink=sink)
+    extension, _ = OUTPUT_SINKS[sink]
+    return extension
+
+
+def __get_default_file_mode() -> int:
+    """Returns permission bits that a regular file would get when created with the current umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# Read once at import time, since reading the umask means (briefly) changing it for the whole process, which races
+# with files being created by the writer threads of `OutputQueue`
+DEFAULT_FILE_MODE = __get_default_file_mode()
+
+
+def write_atomically(filepath: str, writer: Callable[[str], None]) -> None:
+    """
+    Calls `writer` with a path to a temporary file in the same folder as `filepath`, and then renames the temporary
+    file to `filepath`. Readers of `filepath` never see a partially written file.
+    """
+    folder = os.path.dirname(os.path.abspath(filepath))
+    file_descriptor, temp_filepath = tempfile.mkstemp(dir=folder, prefix='.tmp-', suffix=os.path.basename(filepath))
+    os.close(file_descriptor)
+    try:
+        writer(temp_filepath)
+        os.chmod(temp_filepath, DEFAULT_FILE_MODE)
+        os.replace(temp_filepath, filepath)
+    except BaseException:
+        if os.path.exists(temp_filepath):
+            os.remove(temp_filepath)
+        raise
+    return None
+
+
+class OutputQueue:
+
+    def __init__(self, max_workers: Optional[int] = 2, max_pending: Optional[int] = 8) -> None:
+        """
+        Writes files in background writer threads, so that the next artifact can be computed while the previous ones
+        are being written. `submit` blocks while `max_pending` writes are queued/in progress (backpressure, which bounds
+        the memory held by pending artifacts). Every file is written atomically (see `write_atomically`) and fsync-ed.
+        Call `flush` (a barrier) to wait for all pending writes, fsync the folders written to, and re-raise the first
+        error of said writes (if any). Call `close` (or use as a context manager) to flush and stop the threads.
+        Writers run in other threads, so they must not touch matplotlib's pyplot. Render figures to bytes first, and
+        use `submit_bytes`.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='output-writer')
+        self.semaphore = threading.BoundedSemaphore(value=max_pending)
+        self.lock = threading.Lock()
+        self.futures = []
+        self.folders = set()
+        return None
+
+    def __enter__(self) -> 'OutputQueue':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.executor.shutdown(wait=True) # Pending writes are completed, but their errors are not raised
+        return None
+
+    @staticmethod
+    def __fsync(path: str) -> None:
+        file_descriptor = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+        return None
+
+    def __write(self, filepath: str, writer: Callable[[str], None]) -> None:
+        def write_and_fsync(temp_filepath: str) -> None:
+            writer(temp_filepath)
+            self.__fsync(path=temp_filepath)
+            return None
+        write_atomically(filepath=filepath, writer=write_and_fsync)
+        return None
+
+    def submit(self, filepath: str, writer: Callable[[str], None]) -> None:
+        """
+        Queues the writing of `filepath` (`writer` is called with a path to a temporary file, see `write_atomically`).
+        Blocks while the queue is full. Objects used by `writer` must not be modified until the write is done.
+        """
+        self.semaphore.acquire()
+        try:
+            future = self.executor.submit(self.__write, filepath, writer)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self.semaphore.release())
+        with self.lock:
+            self.futures.append(future)
+            self.folders.add(os.path.dirname(os.path.abspath(filepath)))
+        return None
+
+    def submit_bytes(self, filepath: str, content: bytes) -> None:
+        """Queues the writing of already serialized `content` to `filepath`"""
+        def write_bytes(temp_filepath: str) -> None:
+            with open(temp_filepath, 'wb') as file_obj:
+                file_obj.write(content)
+            return None
+        self.submit(filepath=filepath, writer=write_bytes)
+        return None
+
+    def flush(self) -> None:
+        """
+        Waits for all pending writes, and fsyncs the folders written to (so that the renames are durable).
+        Raises the first error of the writes (if any).
+        """
+        with self.lock:
+            futures, self.futures = self.futures, []
+            folders, self.folders = self.folders, set()
+        errors = [future.exception() for future in futures]
+        if os.name == 'posix': # Folders cannot be opened/fsync-ed on Windows
+            for folder in sorted(folders):
+                if os.path.isdir(folder):
+                    self.__fsync(path=folder)
+        for error in errors:
+            if error is not None:
+                raise error
+        return None
+
+    def close(self) -> None:
+        """Flushes the queue (see `flush`), and stops the writer threads"""
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown(wait=True)
+        return None
+
+
+def save_table(
+        data: pd.DataFrame,
+        filepath_without_ext: str,
+        sink: str,
+        output_queue: Optional[OutputQueue] = None,
+    ) -> str:
+    """
+    Saves DataFrame (without index) using the given output sink, and returns the filepath it was saved to.
+    Options for `sink`: ['csv', 'csv-gzip', 'csv-zstd', 'parquet']
+    If an `output_queue` is given, the DataFrame is written in the background (it must not be modified afterwards).
+    """
+    validate_sink(sink=sink)
+    extension, write_func = OUTPUT_SINKS[sink]
+    filepath = f"{filepath_without_ext}{extension}"
+    writer = lambda temp_filepath: write_func(data=data, filepath=temp_filepath)
+    if output_queue is not None:
+        output_queue.submit(filepath=filepath, writer=writer)
+    else:
+        write_atomically(filepath=filepath, writer=writer)
+    return filepath
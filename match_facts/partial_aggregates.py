@@ -0,0 +1,224 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import functools
+import numpy as np
+import pandas as pd
+import config
+import match_store
+from time_buckets import MATCH_FACTS, PARTICIPANT_TYPES, RESULT_SUFFIXES, get_participant_rows
+import utils
+from validators import validate_match_facts
+
+SCORELINE_TOTAL_COLUMNS = [
+    'GamesPlayed', 'Wins', 'Losses', 'Draws', 'GoalsScored', 'GoalsAllowed', 'CleanSheets', 'CleanSheetsAgainst',
+    'BigWins', 'BigLosses',
+]
+RESULT_COUNT_COLUMNS = {1: 'Wins', -1: 'Losses', 0: 'Draws'}
+
+
+class PartialAggregate:
+
+    def __init__(self, totals: Optional[pd.DataFrame] = None) -> None:
+        """
+        Mergeable totals of match data by participant (counts, sums, sums of squares, and tallies of results).
+        Aggregates computed from different files/chunks can be merged in any order and grouping (the merge is
+        associative and commutative), and the scoreline/MatchFacts stats are derived from the merged totals.
+
+        Use `PartialAggregate.from_match_facts` to compute an aggregate, and `merge` (or `+`) to combine two of them.
+        """
+        self.totals = totals if totals is not None else pd.DataFrame(columns=self.get_total_columns(), dtype=float)
+        return None
+
+    @staticmethod
+    def get_total_columns() -> List[str]:
+        total_columns = SCORELINE_TOTAL_COLUMNS[:]
+        for match_fact in MATCH_FACTS:
+            total_columns += [f"Sum{match_fact}", f"SumOfSquares{match_fact}"]
+            total_columns += [f"Sum{match_fact}{suffix}" for suffix in RESULT_SUFFIXES.values()]
+        return total_columns
+
+    @classmethod
+    def from_match_facts(cls, data: pd.DataFrame, participant_type: Optional[str] = 'team') -> 'PartialAggregate':
+        """
+        Expects MatchFacts DataFrame. Returns PartialAggregate having the totals of every participant.
+        Options for `participant_type`: ['team', 'player', 'combo']
+        """
+        df_rows = get_participant_rows(data=data, participant_type=participant_type)
+        totals = cls.get_row_totals(df_rows=df_rows).groupby(by='Team', sort=True).sum()
+        return cls(totals=totals.loc[:, cls.get_total_columns()])
+
+    @staticmethod
+    def get_row_totals(df_rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Expects DataFrame of participant rows (output of `time_buckets.get_participant_rows`). Returns DataFrame having
+        the 'Team' column, and the totals of every row by itself (in the same order), so that the totals of any subset
+        of the rows are the sums of their row totals.
+        """
+        goal_margin = df_rows['GoalsScored'] - df_rows['GoalsAllowed']
+        df_totals = pd.DataFrame(data={
+            'Team': df_rows['Team'],
+            'GamesPlayed': 1,
+            'Wins': (df_rows['Result'] == 1).astype(int),
+            'Losses': (df_rows['Result'] == -1).astype(int),
+            'Draws': (df_rows['Result'] == 0).astype(int),
+            'GoalsScored': df_rows['GoalsScored'],
+            'GoalsAllowed': df_rows['GoalsAllowed'],
+            'CleanSheets': (df_rows['GoalsAllowed'] == 0).astype(int),
+            'CleanSheetsAgainst': (df_rows['GoalsScored'] == 0).astype(int),
+            'BigWins': (goal_margin >= config.BIG_RESULT_GOAL_MARGIN).astype(int),
+            'BigLosses': (goal_margin <= -config.BIG_RESULT_GOAL_MARGIN).astype(int),
+        })
+        for match_fact in MATCH_FACTS:
+            values = df_rows[match_fact].astype(float)
+            df_totals[f"Sum{match_fact}"] = values
+            df_totals[f"SumOfSquares{match_fact}"] = values ** 2
+            for result, suffix in RESULT_SUFFIXES.items():
+                df_totals[f"Sum{match_fact}{suffix}"] = values.where(df_rows['Result'] == result, 0)
+        return df_totals
+
+    def merge(self, other: 'PartialAggregate') -> 'PartialAggregate':
+        """Returns new PartialAggregate having the totals of both aggregates"""
+        totals = self.totals.add(other.totals, fill_value=0).sort_index()
+        return PartialAggregate(totals=totals)
+
+    def __add__(self, other: 'PartialAggregate') -> 'PartialAggregate':
+        return self.merge(other=other)
+
+    def get_scoreline_stats(self) -> pd.DataFrame:
+        """
+        Returns DataFrame of scoreline related stats by participant (same columns as
+        `scoreline_stats.get_scoreline_stats_by_team`, except 'ResultsString', which depends on the order of matches)
+        """
+        df_stats = self.totals.loc[:, SCORELINE_TOTAL_COLUMNS].astype(int).reset_index()
+        df_stats.insert(loc=2, column='Points', value=3 * df_stats['Wins'] + df_stats['Draws'])
+        df_stats.insert(loc=3, column='GoalDifference', value=df_stats['GoalsScored'] - df_stats['GoalsAllowed'])
+        df_stats['PPG'] = df_stats['Points'] / df_stats['GamesPlayed']
+        df_stats['GDPG'] = df_stats['GoalDifference'] / df_stats['GamesPlayed']
+        df_stats = utils.add_ranking_column(
+            data=df_stats,
+            rank_column_name='Rank',
+            rank_by=['PPG', 'GDPG'],
+            ascending=[False, False],
+            method='competition',
+        )
+        df_stats.drop(labels=['PPG', 'GDPG'], axis=1, inplace=True)
+        return df_stats
+
+    def get_match_facts_stats(self, include_standard_deviations: Optional[bool] = False) -> pd.DataFrame:
+        """
+        Returns DataFrame of MatchFacts related stats by participant (same columns as
+        `match_facts_stats.get_match_facts_stats_by_team`). If `include_standard_deviations` is True, the
+        (population) standard deviation of every MatchFact is added as well, eg: 'StdPossession'
+        """
+        totals = self.totals
+        games_played = totals['GamesPlayed']
+        df_stats = pd.DataFrame(index=totals.index)
+        df_stats['GamesPlayed'] = games_played.astype(int)
+        for match_fact in MATCH_FACTS:
+            df_stats[f"Avg{match_fact}"] = totals[f"Sum{match_fact}"] / games_played
+        for match_fact in MATCH_FACTS:
+            for result, suffix in RESULT_SUFFIXES.items():
+                result_count = totals[RESULT_COUNT_COLUMNS[result]].replace(to_replace=0, value=np.nan)
+                df_stats[f"Avg{match_fact}{suffix}"] = totals[f"Sum{match_fact}{suffix}"] / result_count
+        if include_standard_deviations:
+            for match_fact in MATCH_FACTS:
+                variance = totals[f"SumOfSquares{match_fact}"] / games_played - df_stats[f"Avg{match_fact}"] ** 2
+                df_stats[f"Std{match_fact}"] = np.sqrt(variance.clip(lower=0))
+        df_stats = df_stats.reset_index().round(2)
+        return df_stats
+
+
+def compute_partial_aggregates(
+        src_filepath: str,
+        participant_types: Optional[List[str]] = None,
+    ) -> Dict[str, PartialAggregate]:
+    """
+    Reads and validates one MatchFacts file (CSV file or partitioned match store). Returns dictionary having keys =
+    participant type, and values = PartialAggregate of said participant type
+    """
+    df_match_facts = match_store.read_match_facts(src_filepath=src_filepath)
+    validate_match_facts(df_match_facts=df_match_facts)
+    partial_aggregates = {
+        participant_type: PartialAggregate.from_match_facts(data=df_match_facts, participant_type=participant_type)
+        for participant_type in participant_types or PARTICIPANT_TYPES
+    }
+    return partial_aggregates
+
+
+def __compute_partial_aggregates_of_rows(
+        rows: Tuple[int, int],
+        handle: 'SharedArraysHandle',
+        participant_types: List[str],
+    ) -> Dict[str, PartialAggregate]:
+    """Runs in a worker process. Computes PartialAggregate of the rows [start, stop) of the shared arrays"""
+    from shared_arrays import attach_shared_arrays
+    start, stop = rows
+    shared_arrays = attach_shared_arrays(handle=handle)
+    partial_aggregates = {}
+    for participant_type in participant_types:
+        df_participants = shared_arrays.get_participant_frame(participant_type=participant_type, start=start, stop=stop)
+        # Participants of every type are in the 'HomeTeam'/'AwayTeam' columns
+        partial_aggregates[participant_type] = PartialAggregate.from_match_facts(data=df_participants, participant_type='team')
+    return partial_aggregates
+
+
+def __merge_dicts_of_partial_aggregates(
+        dict_1: Dict[str, PartialAggregate],
+        dict_2: Dict[str, PartialAggregate],
+    ) -> Dict[str, PartialAggregate]:
+    return {participant_type: dict_1[participant_type].merge(other=dict_2[participant_type]) for participant_type in dict_1}
+
+
+def aggregate_files(
+        src_filepaths: List[str],
+        participant_types: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, PartialAggregate]:
+    """
+    Computes PartialAggregate of every file in a separate worker process (map), and merges them (reduce), without
+    concatenating the files into one DataFrame.
+    Returns dictionary having keys = participant type, and values = merged PartialAggregate of said participant type.
+    """
+    participant_types = participant_types or PARTICIPANT_TYPES
+    map_func = functools.partial(compute_partial_aggregates, participant_types=participant_types)
+    if len(src_filepaths) == 1 or max_workers == 1:
+        partial_aggregates_by_file = list(map(map_func, src_filepaths))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            partial_aggregates_by_file = list(executor.map(map_func, src_filepaths))
+    merged_partial_aggregates = functools.reduce(__merge_dicts_of_partial_aggregates, partial_aggregates_by_file)
+    return merged_partial_aggregates
+
+
+def aggregate_match_facts(
+        df_match_facts: pd.DataFrame,
+        participant_types: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: Optional[int] = 250_000,
+    ) -> Dict[str, PartialAggregate]:
+    """
+    Computes PartialAggregate of every chunk of `chunk_size` rows of MatchFacts DataFrame in worker processes (map), and
+    merges them (reduce). The numeric columns and participant codes are published once into shared memory (see
+    `shared_arrays.SharedMatchFacts`), so every task only pickles a small handle and a row range, instead of the data.
+    The shared memory segments are released once all chunks are aggregated.
+    Returns dictionary having keys = participant type, and values = merged PartialAggregate of said participant type.
+    """
+    participant_types = participant_types or PARTICIPANT_TYPES
+    num_rows = len(df_match_facts)
+    if num_rows <= chunk_size or max_workers == 1:
+        return {
+            participant_type: PartialAggregate.from_match_facts(data=df_match_facts, participant_type=participant_type)
+            for participant_type in participant_types
+        }
+    from shared_arrays import SharedMatchFacts # Needs `multiprocessing.shared_memory` (Python 3.8+)
+    row_ranges = [(start, min(start + chunk_size, num_rows)) for start in range(0, num_rows, chunk_size)]
+    with SharedMatchFacts(df_match_facts=df_match_facts, participant_types=participant_types) as shared_match_facts:
+        map_func = functools.partial(
+            __compute_partial_aggregates_of_rows,
+            handle=shared_match_facts.handle,
+            participant_types=participant_types,
+        )
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            partial_aggregates_by_chunk = list(executor.map(map_func, row_ranges))
+    merged_partial_aggregates = functools.reduce(__merge_dicts_of_partial_aggregates, partial_aggregates_by_chunk)
+    return merged_partial_aggregates
@@ -0,0 +1,79 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+PARTICIPANT_TYPES = ['team', 'player', 'combo']
+
+
+def get_participant_frame(data: pd.DataFrame, participant_type: Optional[str] = 'team') -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame. Returns DataFrame in which the 'HomeTeam'/'AwayTeam' columns have the participants of
+    the given type, so that participants can be handled like teams. Options for `participant_type`: ['team', 'player',
+    'combo'] (combos are named "Player|Team"). For 'team', returns `data` itself (not a copy).
+    """
+    if participant_type not in PARTICIPANT_TYPES:
+        raise ValueError(f"Expected `participant_type` to be in {PARTICIPANT_TYPES}, but got '{participant_type}'")
+    if participant_type == 'team':
+        return data
+    df_mf = data.copy(deep=True)
+    if participant_type == 'player':
+        df_mf['HomeTeam'] = df_mf['HomePlayer'].tolist()
+        df_mf['AwayTeam'] = df_mf['AwayPlayer'].tolist()
+    else:
+        df_mf['HomeTeam'] = df_mf['HomePlayer'] + '|' + df_mf['HomeTeam']
+        df_mf['AwayTeam'] = df_mf['AwayPlayer'] + '|' + df_mf['AwayTeam']
+    return df_mf
+
+
+class ParticipantPartitions:
+
+    def __init__(self, df_match_facts: pd.DataFrame, participant_type: Optional[str] = 'team') -> None:
+        """
+        Splits the match rows by participant (of the given type) once. The rows of a participant are the matches played
+        by said participant (home or away), in their original order (same rows as `filters.filter_by_team`).
+        Participants are grouped together with one sort, instead of filtering the whole DataFrame for every participant.
+        `data` has the participants in the 'HomeTeam'/'AwayTeam' columns (see `get_participant_frame`), and the rows
+        of each participant (`get_rows`) are materialized once, and cached. Consumers must not modify them.
+        """
+        self.participant_type = participant_type
+        self.data = get_participant_frame(data=df_match_facts, participant_type=participant_type)
+        self.participants, self.__positions_by_participant = self.__split(data=self.data)
+        self.__rows_by_participant: Dict[str, pd.DataFrame] = {}
+        return None
+
+    @staticmethod
+    def __split(data: pd.DataFrame) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        num_rows = len(data)
+        values = np.concatenate([data['HomeTeam'].to_numpy(dtype=object), data['AwayTeam'].to_numpy(dtype=object)])
+        codes, participants = pd.factorize(values, sort=True) # Missing participants get the code -1
+        positions = np.tile(np.arange(num_rows), 2)
+        is_valid = (codes >= 0)
+        is_valid[num_rows:] &= (codes[num_rows:] != codes[:num_rows]) # Count a match once if home = away
+        codes, positions = codes[is_valid], positions[is_valid]
+        order = np.lexsort((positions, codes))
+        counts = np.bincount(codes, minlength=len(participants))
+        positions_by_code = np.split(positions[order], np.cumsum(counts)[:-1])
+        participants = participants.tolist()
+        return participants, dict(zip(participants, positions_by_code))
+
+    def __len__(self) -> int:
+        return len(self.participants)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.participants)
+
+    def get_positions(self, participant: str) -> np.ndarray:
+        """Returns (integer) positions of the rows of the participant (empty if unknown)"""
+        return self.__positions_by_participant.get(participant, np.array([], dtype=np.int64))
+
+    def get_rows(self, participant: str) -> pd.DataFrame:
+        """Returns DataFrame (cached) of the rows of the participant. Must not be modified"""
+        if participant not in self.__rows_by_participant:
+            self.__rows_by_participant[participant] = self.data.take(self.get_positions(participant=participant))
+        return self.__rows_by_participant[participant]
+
+    def items(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Yields tuples of (participant, rows of the participant), in sorted order of participants"""
+        for participant in self.participants:
+            yield participant, self.get_rows(participant=participant)
+
@@ -1,96 +1,385 @@
+from typing import Dict, List, Optional
 import pandas as pd
 
-from config import FOLDER_STRUCTURE
+from boxplot_stats import get_boxplot_stats_by_stat, get_boxplot_stats_table
+from chart_manifest import ChartManifest
+from config import FOLDER_NAMES, get_folder_structure
 from create_folder_structure import create_folder_structure
+from errors import InvalidMatchFactsError
+import chart_specs
 import excel_formatter
+import match_store
+from normalization import get_leaderboard
+from partitions import ParticipantPartitions
 from match_facts_stats import (
     get_match_facts_stats_by_player,
     get_match_facts_stats_by_player_and_team_combo,
     get_match_facts_stats_by_team,
 )
-import plotter
+import output_sinks
+from partial_aggregates import aggregate_files
+from profiling import StageProfiler, get_profiling_folder
 from scoreline_stats import (
     get_scoreline_stats_by_player,
     get_scoreline_stats_by_player_and_team_combo,
     get_scoreline_stats_by_team,
 )
 from stat_value_fetcher import StatValueFetcher
+import time_buckets
 from validators import validate_match_facts
 
+STAGES = ['tables', 'excel', 'distributions', 'bars', 'timeseries', 'radar']
+CHART_STAGES_NEEDING_STAT_VALUES = ['distributions', 'bars', 'timeseries']
 
-def execute_pipeline(src_filepath: str) -> None:
-    df_match_facts = pd.read_csv(src_filepath)
-    validate_match_facts(df_match_facts=df_match_facts)
+PARTICIPANT_TYPES = ['team', 'player', 'combo']
+PARTICIPANT_TYPE_SETTINGS = {
+    'team': {
+        'name': 'Team', # Used in filenames of tables, and as sheet name in the Excel file
+        'label': 'team', # Used in titles of charts
+        'svf_participant_type': 'team',
+        'scoreline_stats_func': get_scoreline_stats_by_team,
+        'match_facts_stats_func': get_match_facts_stats_by_team,
+    },
+    'player': {
+        'name': 'Player',
+        'label': 'player',
+        'svf_participant_type': 'player',
+        'scoreline_stats_func': get_scoreline_stats_by_player,
+        'match_facts_stats_func': get_match_facts_stats_by_player,
+    },
+    'combo': {
+        'name': 'PlayerAndTeam',
+        'label': 'player and team',
+        'svf_participant_type': 'team_and_player_combo',
+        'scoreline_stats_func': get_scoreline_stats_by_player_and_team_combo,
+        'match_facts_stats_func': get_match_facts_stats_by_player_and_team_combo,
+    },
+}
+
+
+def __validate_choices(name: str, values: List[str], valid_values: List[str]) -> None:
+    invalid_values = [value for value in values if value not in valid_values]
+    if invalid_values:
+        raise ValueError(f"Expected `{name}` to be a subset of {valid_values}, but got invalid values {invalid_values}")
+    return None
+
+
+def __close_output_queue(output_queue: Optional[output_sinks.OutputQueue], profiler: StageProfiler) -> None:
+    """Waits for the pending writes of the output queue (flush/fsync barrier), and stops its writer threads"""
+    if output_queue is None:
+        return None
+    with profiler.profile_stage(stage='flush outputs'):
+        output_queue.close()
+    return None
+
+
+def __get_partitions(
+        partitions_by_type: Dict[str, ParticipantPartitions],
+        df_match_facts: pd.DataFrame,
+        participant_type: str,
+    ) -> ParticipantPartitions:
+    """Returns partitions of the participant type from `partitions_by_type`, splitting the rows on first use"""
+    if participant_type not in partitions_by_type:
+        partitions_by_type[participant_type] = ParticipantPartitions(
+            df_match_facts=df_match_facts,
+            participant_type=participant_type,
+        )
+    return partitions_by_type[participant_type]
+
+
+def execute_pipeline(
+        src_filepath: str,
+        output_sink: Optional[str] = 'csv',
+        output_root: Optional[str] = None,
+        stages: Optional[List[str]] = None,
+        participant_types: Optional[List[str]] = None,
+        time_period: Optional[str] = None,
+        start_timestamp: Optional[int] = None,
+        end_timestamp: Optional[int] = None,
+        force_render: Optional[bool] = False,
+        chart_format: Optional[str] = 'png',
+        profile: Optional[bool] = False,
+        writer_threads: Optional[int] = 2,
+    ) -> None:
+    """
+    Computes tables/visualizations from the MatchFacts CSV file at `src_filepath`, and saves them inside `output_root`
+    (defaults to "MatchFacts - Results"). Only the requested stages/participant types are computed.
+
+    Parameters:
+        - src_filepath (str): Filepath to MatchFacts CSV file, or root folder of a partitioned match store
+        - output_sink (str): Sink used to save tables. Options: ['csv', 'csv-gzip', 'csv-zstd', 'parquet']
+        - output_root (str): Folder in which all the results are stored
+        - stages (list): Subset of ['tables', 'excel', 'distributions', 'bars', 'timeseries', 'radar']. Defaults to all
+        - participant_types (list): Subset of ['team', 'player', 'combo']. Defaults to all for the tables, and to
+        ['team'] for the charts
+        - time_period (str): If given, the 'tables' stage also saves the scoreline/MatchFacts stats of every time
+        period. Options: ['month', 'season', 'year']
+        - start_timestamp (int): If given, only matches at/after this timestamp (YYYYMMDDHHMMSS) are used
+        - end_timestamp (int): If given, only matches at/before this timestamp (YYYYMMDDHHMMSS) are used. With a
+        partitioned match store, only the partitions overlapping with the range are read
+        - force_render (bool): Charts are skipped if their data/settings have not changed since they were last saved
+        (tracked by a manifest in each chart folder). Set to True to re-render all charts
+        - chart_format (str): 'png' renders the charts with matplotlib. 'json' saves a compact JSON spec of every chart
+        (data, labels, scales, colors) instead, for client-side rendering. Options: ['png', 'json']
+        - profile (bool): If True, every stage is profiled (cProfile dump and tracemalloc top allocations), and the
+        results are saved to "MatchFacts - Profiling/{timestamp}" next to `output_root`, along with a summary
+        - writer_threads (int): Number of background threads writing the tables/charts while the next ones are computed
+        (writes are flushed and fsync-ed at the end of the run). Set to 0 to write them synchronously
+    """
+    stages = stages or STAGES
+    __validate_choices(name='stages', values=stages, valid_values=STAGES)
+    __validate_choices(name='participant_types', values=participant_types or [], valid_values=PARTICIPANT_TYPES)
+    __validate_choices(name='time_period', values=[time_period] if time_period else [], valid_values=time_buckets.TIME_PERIODS)
+    table_participant_types = participant_types or PARTICIPANT_TYPES
+    chart_participant_types = participant_types or ['team']
+    output_sinks.validate_sink(sink=output_sink)
+    chart_specs.validate_chart_format(chart_format=chart_format)
+    output_root = output_root or FOLDER_NAMES['root-results']
+    profiler = StageProfiler(folder=get_profiling_folder(output_root=output_root), enabled=profile)
+    with profiler.profile_stage(stage='read'):
+        df_match_facts = match_store.read_match_facts(
+            src_filepath=src_filepath,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+        )
+        if df_match_facts.empty:
+            raise InvalidMatchFactsError(f"No matches in [{start_timestamp}, {end_timestamp}] of '{src_filepath}'")
+        validate_match_facts(df_match_facts=df_match_facts)
 
     # Create folder structure to store the tables/visualizations
-    create_folder_structure()
+    folder_structure = get_folder_structure(root_folder=output_root)
+    create_folder_structure(folder_structure=folder_structure)
+    output_queue = output_sinks.OutputQueue(max_workers=writer_threads) if writer_threads else None
+
+    # Rows split by participant once per participant type, and shared by the scoreline/MatchFacts stats of this run
+    partitions_by_type = {}
 
     # Table - Scoreline stats
-    df_scoreline_stats_by_team = get_scoreline_stats_by_team(data=df_match_facts)
-    df_scoreline_stats_by_player = get_scoreline_stats_by_player(data=df_match_facts)
-    df_scoreline_stats_by_player_and_team_combo = get_scoreline_stats_by_player_and_team_combo(data=df_match_facts)
-    df_scoreline_stats_by_team.to_csv(f"{FOLDER_STRUCTURE['tables']}/ScorelineStats - Team.csv", index=False)
-    df_scoreline_stats_by_player.to_csv(f"{FOLDER_STRUCTURE['tables']}/ScorelineStats - Player.csv", index=False)
-    df_scoreline_stats_by_player_and_team_combo.to_csv(f"{FOLDER_STRUCTURE['tables']}/ScorelineStats - PlayerAndTeam.csv", index=False)
-    
+    if 'tables' in stages:
+        for participant_type in table_participant_types:
+            settings = PARTICIPANT_TYPE_SETTINGS[participant_type]
+            with profiler.profile_stage(stage=f"scoreline stats ({participant_type})"):
+                df_scoreline_stats = settings['scoreline_stats_func'](
+                    data=df_match_facts,
+                    partitions=__get_partitions(
+                        partitions_by_type=partitions_by_type,
+                        df_match_facts=df_match_facts,
+                        participant_type=participant_type,
+                    ),
+                )
+                output_sinks.save_table(
+                    data=df_scoreline_stats,
+                    filepath_without_ext=f"{folder_structure['tables']}/ScorelineStats - {settings['name']}",
+                    sink=output_sink,
+                    output_queue=output_queue,
+                )
+
     # Table - MatchFacts stats
-    df_mfs_by_team = get_match_facts_stats_by_team(data=df_match_facts)
-    df_mfs_by_player = get_match_facts_stats_by_player(data=df_match_facts)
-    df_mfs_by_player_and_team_combo = get_match_facts_stats_by_player_and_team_combo(data=df_match_facts)
-    df_mfs_by_team.to_csv(f"{FOLDER_STRUCTURE['tables']}/MatchFactsStats - Team.csv", index=False)
-    df_mfs_by_player.to_csv(f"{FOLDER_STRUCTURE['tables']}/MatchFactsStats - Player.csv", index=False)
-    df_mfs_by_player_and_team_combo.to_csv(f"{FOLDER_STRUCTURE['tables']}/MatchFactsStats - PlayerAndTeam.csv", index=False)
+    mfs_participant_types = []
+    if 'tables' in stages or 'excel' in stages:
+        mfs_participant_types += table_participant_types
+    if 'radar' in stages:
+        mfs_participant_types += chart_participant_types
+    dict_mfs_by_participant_type = {}
+    for participant_type in PARTICIPANT_TYPES:
+        if participant_type in mfs_participant_types:
+            settings = PARTICIPANT_TYPE_SETTINGS[participant_type]
+            with profiler.profile_stage(stage=f"match facts stats ({participant_type})"):
+                dict_mfs_by_participant_type[participant_type] = settings['match_facts_stats_func'](
+                    data=df_match_facts,
+                    partitions=__get_partitions(
+                        partitions_by_type=partitions_by_type,
+                        df_match_facts=df_match_facts,
+                        participant_type=participant_type,
+                    ),
+                )
+    partitions_by_type.clear() # Not needed by the later stages
+    if 'tables' in stages:
+        with profiler.profile_stage(stage='match facts tables'):
+            for participant_type in table_participant_types:
+                df_mfs = dict_mfs_by_participant_type[participant_type]
+                output_sinks.save_table(
+                    data=df_mfs,
+                    filepath_without_ext=f"{folder_structure['tables']}/MatchFactsStats - {PARTICIPANT_TYPE_SETTINGS[participant_type]['name']}",
+                    sink=output_sink,
+                    output_queue=output_queue,
+                )
+                output_sinks.save_table(
+                    data=get_leaderboard(df_match_facts_stats=df_mfs),
+                    filepath_without_ext=f"{folder_structure['tables']}/Leaderboard - {PARTICIPANT_TYPE_SETTINGS[participant_type]['name']}",
+                    sink=output_sink,
+                    output_queue=output_queue,
+                )
+
+    # Table - Scoreline/MatchFacts stats by time period
+    if 'tables' in stages and time_period:
+        for participant_type in table_participant_types:
+            name = PARTICIPANT_TYPE_SETTINGS[participant_type]['name']
+            with profiler.profile_stage(stage=f"stats by {time_period} ({participant_type})"):
+                df_scoreline_stats_by_period = time_buckets.get_scoreline_stats_by_period(
+                    data=df_match_facts,
+                    time_period=time_period,
+                    participant_type=participant_type,
+                )
+                output_sinks.save_table(
+                    data=df_scoreline_stats_by_period,
+                    filepath_without_ext=f"{folder_structure['tables']}/ScorelineStats - {name} (by {time_period})",
+                    sink=output_sink,
+                    output_queue=output_queue,
+                )
+                df_mfs_by_period = time_buckets.get_match_facts_stats_by_period(
+                    data=df_match_facts,
+                    time_period=time_period,
+                    participant_type=participant_type,
+                )
+                output_sinks.save_table(
+                    data=df_mfs_by_period,
+                    filepath_without_ext=f"{folder_structure['tables']}/MatchFactsStats - {name} (by {time_period})",
+                    sink=output_sink,
+                    output_queue=output_queue,
+                )
 
     # Table - MatchFacts stats (Excel formatted)
-    df_mfs_by_team_styled = excel_formatter.style_dataframe(
-        data=df_mfs_by_team,
-        columns_with_desirable_highs=['AvgPossession', 'AvgShots', 'AvgShotsOnTarget', 'AvgShotAccuracy', 'AvgPassAccuracy', 'AvgTackles'],
-        columns_with_desirable_lows=['AvgFouls'],
-    )
-    df_mfs_by_player_styled = excel_formatter.style_dataframe(
-        data=df_mfs_by_player,
-        columns_with_desirable_highs=['AvgPossession', 'AvgShots', 'AvgShotsOnTarget', 'AvgShotAccuracy', 'AvgPassAccuracy', 'AvgTackles'],
-        columns_with_desirable_lows=['AvgFouls'],
-    )
-    df_mfs_by_player_and_team_combo_styled = excel_formatter.style_dataframe(
-        data=df_mfs_by_player_and_team_combo,
-        columns_with_desirable_highs=['AvgPossession', 'AvgShots', 'AvgShotsOnTarget', 'AvgShotAccuracy', 'AvgPassAccuracy', 'AvgTackles'],
-        columns_with_desirable_lows=['AvgFouls'],
-    )
-    excel_formatter.save_styled_dataframe(
-        filepath_with_ext=f"{FOLDER_STRUCTURE['tables']}/MatchFactsStats - All (Excel formatted).xlsx",
-        sheet_name_to_styler={
-            'Team': df_mfs_by_team_styled,
-            'Player': df_mfs_by_player_styled,
-            'PlayerAndTeam': df_mfs_by_player_and_team_combo_styled,
-        },
-    )
+    if 'excel' in stages:
+        with profiler.profile_stage(stage='excel'):
+            save_excel = lambda filepath: excel_formatter.save_dataframes_with_color_scales(
+                filepath_with_ext=filepath,
+                sheet_name_to_dataframe={
+                    PARTICIPANT_TYPE_SETTINGS[participant_type]['name']: dict_mfs_by_participant_type[participant_type]
+                    for participant_type in table_participant_types
+                },
+                columns_with_desirable_highs=['AvgPossession', 'AvgShots', 'AvgShotsOnTarget', 'AvgShotAccuracy', 'AvgPassAccuracy', 'AvgTackles'],
+                columns_with_desirable_lows=['AvgFouls'],
+            )
+            filepath_to_excel = f"{folder_structure['tables']}/MatchFactsStats - All (Excel formatted).xlsx"
+            if output_queue is not None:
+                output_queue.submit(filepath=filepath_to_excel, writer=save_excel)
+            else:
+                save_excel(filepath_to_excel)
 
-    # DataViz
-    svf_teams = StatValueFetcher(
-        df_match_facts=df_match_facts,
-        participant_type='team',
-    )
-    dataframes_by_stat = svf_teams.as_dataframes()
-    plotter.plot_match_facts_distributions(
-        dataframes_by_stat=dataframes_by_stat,
-        folder_to_store=FOLDER_STRUCTURE['viz-distributions'],
-    )
-    plotter.plot_match_facts_bar_charts(
-        dataframes_by_stat=dataframes_by_stat,
-        folder_to_store=FOLDER_STRUCTURE['viz-bar'],
-    )
-    plotter.plot_match_facts_timeseries(
-        dataframes_by_stat=dataframes_by_stat,
-        folder_to_store=FOLDER_STRUCTURE['viz-timeseries'],
-    )
-    plotter.plot_match_facts_radar(
-        df_match_facts_stats=df_mfs_by_team,
-        folder_to_store=FOLDER_STRUCTURE['viz-radar'],
+    # DataViz (plotter is imported only here, as it pulls in matplotlib which is slow to import)
+    chart_stages = [stage for stage in stages if stage not in ['tables', 'excel']]
+    if not chart_stages:
+        __close_output_queue(output_queue=output_queue, profiler=profiler)
+        profiler.save_summary()
+        return None
+    with profiler.profile_stage(stage='import plotter'):
+        import plotter
+    manifests = {
+        stage: ChartManifest(folder=folder_structure[folder_key], force_render=force_render)
+        for stage, folder_key in [
+            ('distributions', 'viz-distributions'), ('bars', 'viz-bar'), ('timeseries', 'viz-timeseries'), ('radar', 'viz-radar'),
+        ] if stage in stages
+    }
+    for participant_type in chart_participant_types:
+        settings = PARTICIPANT_TYPE_SETTINGS[participant_type]
+        if set(stages).intersection(set(CHART_STAGES_NEEDING_STAT_VALUES)):
+            with profiler.profile_stage(stage=f"stat values ({participant_type})"):
+                svf = StatValueFetcher(
+                    df_match_facts=df_match_facts,
+                    participant_type=settings['svf_participant_type'],
+                )
+                if 'bars' in stages or 'timeseries' in stages:
+                    dataframes_by_stat = svf.as_dataframes()
+        if 'distributions' in stages:
+            with profiler.profile_stage(stage=f"distributions ({participant_type})"):
+                boxplot_stats_by_stat = get_boxplot_stats_by_stat(dict_stat_values=svf.as_dicts())
+                output_sinks.save_table(
+                    data=get_boxplot_stats_table(boxplot_stats_by_stat=boxplot_stats_by_stat),
+                    filepath_without_ext=f"{folder_structure['tables']}/BoxPlotStats - {settings['name']}",
+                    sink=output_sink,
+                    output_queue=output_queue,
+                )
+                plotter.plot_match_facts_distributions(
+                    boxplot_stats_by_stat=boxplot_stats_by_stat,
+                    folder_to_store=folder_structure['viz-distributions'],
+                    participant_label=settings['label'],
+                    manifest=manifests['distributions'],
+                    chart_format=chart_format,
+                    output_queue=output_queue,
+                )
+        if 'bars' in stages:
+            with profiler.profile_stage(stage=f"bars ({participant_type})"):
+                plotter.plot_match_facts_bar_charts(
+                    dataframes_by_stat=dataframes_by_stat,
+                    folder_to_store=folder_structure['viz-bar'],
+                    participant_label=settings['label'],
+                    manifest=manifests['bars'],
+                    chart_format=chart_format,
+                    output_queue=output_queue,
+                )
+        if 'timeseries' in stages:
+            with profiler.profile_stage(stage=f"timeseries ({participant_type})"):
+                plotter.plot_match_facts_timeseries(
+                    dataframes_by_stat=dataframes_by_stat,
+                    folder_to_store=folder_structure['viz-timeseries'],
+                    participant_label=settings['label'],
+                    manifest=manifests['timeseries'],
+                    chart_format=chart_format,
+                    output_queue=output_queue,
+                )
+        if 'radar' in stages:
+            with profiler.profile_stage(stage=f"radar ({participant_type})"):
+                plotter.plot_match_facts_radar(
+                    df_match_facts_stats=dict_mfs_by_participant_type[participant_type],
+                    folder_to_store=folder_structure['viz-radar'],
+                    participant_label=settings['label'],
+                    manifest=manifests['radar'],
+                    chart_format=chart_format,
+                    output_queue=output_queue,
+                )
+    __close_output_queue(output_queue=output_queue, profiler=profiler) # Charts must exist before saving the manifests
+    for manifest in manifests.values():
+        manifest.save()
+    profiler.save_summary()
+    return None
+
+
+def execute_multi_file_pipeline(
+        src_filepaths: List[str],
+        output_sink: Optional[str] = 'csv',
+        output_root: Optional[str] = None,
+        participant_types: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+    """
+    Computes scoreline/MatchFacts tables across several MatchFacts files (eg: one per league/competition), and saves
+    them inside `output_root` (defaults to "MatchFacts - Results").
+    Every file is aggregated in a worker process into mergeable partial aggregates, which are then merged, so the
+    files are never concatenated into one DataFrame. The scoreline tables do not have the 'ResultsString' column.
+
+    Parameters:
+        - src_filepaths (list): Filepaths to MatchFacts CSV files (or root folders of partitioned match stores)
+        - output_sink (str): Sink used to save tables. Options: ['csv', 'csv-gzip', 'csv-zstd', 'parquet']
+        - output_root (str): Folder in which all the results are stored
+        - participant_types (list): Subset of ['team', 'player', 'combo']. Defaults to all
+        - max_workers (int): Maximum number of worker processes (defaults to the number of CPUs)
+    """
+    participant_types = participant_types or PARTICIPANT_TYPES
+    __validate_choices(name='participant_types', values=participant_types, valid_values=PARTICIPANT_TYPES)
+    output_sinks.validate_sink(sink=output_sink)
+    folder_structure = get_folder_structure(root_folder=output_root or FOLDER_NAMES['root-results'])
+    create_folder_structure(folder_structure=folder_structure)
+    partial_aggregates = aggregate_files(
+        src_filepaths=src_filepaths,
+        participant_types=participant_types,
+        max_workers=max_workers,
     )
+    for participant_type in participant_types:
+        name = PARTICIPANT_TYPE_SETTINGS[participant_type]['name']
+        output_sinks.save_table(
+            data=partial_aggregates[participant_type].get_scoreline_stats(),
+            filepath_without_ext=f"{folder_structure['tables']}/ScorelineStats - {name}",
+            sink=output_sink,
+        )
+        output_sinks.save_table(
+            data=partial_aggregates[participant_type].get_match_facts_stats(),
+            filepath_without_ext=f"{folder_structure['tables']}/MatchFactsStats - {name}",
+            sink=output_sink,
+        )
     return None
 
 
 if __name__ == "__main__":
     execute_pipeline(src_filepath="FakeMatchFacts 20210606190918.csv")
-    print("Done!")
\ No newline at end of file
+    print("Done!")
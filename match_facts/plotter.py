@@ -1,12 +1,19 @@
-from typing import Dict
+from typing import Dict, Optional
+import zlib
 import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
+from matplotlib.colors import to_hex
+from boxplot_stats import to_bxp_stats
 from casing import sc2ucc
+from chart_manifest import ChartManifest
+import chart_specs
+from normalization import normalize_columns
+from output_sinks import OutputQueue
 from plotter_helpers import (
     add_plot_skeleton,
     plot_bar,
     plot_radar,
+    save_figure,
 )
 import utils
 
@@ -14,35 +21,95 @@ plt.rcParams.update({'figure.max_open_warning': 0})
 
 
 def plot_match_facts_distributions(
-        dataframes_by_stat: Dict[str, pd.DataFrame],
+        boxplot_stats_by_stat: Dict[str, pd.DataFrame],
         folder_to_store: str,
+        participant_label: Optional[str] = 'team',
+        manifest: Optional[ChartManifest] = None,
+        chart_format: Optional[str] = 'png',
+        output_queue: Optional[OutputQueue] = None,
     ) -> None:
-    """Saves MatchFacts related distribution plots to PNG file/s"""
-    for stat, df_obj in dataframes_by_stat.items():
+    """
+    Saves MatchFacts related distribution plots (horizontal box-plots) to PNG file/s, or to JSON chart spec/s if
+    `chart_format` is 'json'.
+    Expects precomputed box-plot stats (output of `boxplot_stats.get_boxplot_stats_by_stat`), which are drawn as they
+    are, without recomputing quartiles from the stat values.
+    If a `manifest` is given, charts whose data/settings have not changed since they were last saved are skipped.
+    If an `output_queue` is given, the charts are written to disk in the background.
+    """
+    colors = [to_hex(color) for color in plt.get_cmap('Set2').colors]
+    for stat, df_boxplot_stats in boxplot_stats_by_stat.items():
         stat_cleaned = sc2ucc(string=stat)
-        title = f"Distribution of {stat_cleaned} by team"
-        add_plot_skeleton(title=title, x_label=stat_cleaned, y_label='Team', fig_size=(30, 16))
-        sns.boxplot(data=df_obj, orient='h', dodge=False, palette='Set2')
-        plt.savefig(f"{folder_to_store}/{title}.png")
+        title = f"Distribution of {stat_cleaned} by {participant_label}"
+        filepath = f"{folder_to_store}/{title}{chart_specs.get_extension(chart_format=chart_format)}"
+        bxp_stats = to_bxp_stats(df_boxplot_stats=df_boxplot_stats)
+        settings = {'title': title, 'x_label': stat_cleaned, 'y_label': participant_label.title(), 'fig_size': (30, 16)}
+        if manifest and not manifest.should_render(filepath=filepath, data=bxp_stats, settings=settings):
+            continue
+        if chart_format == 'json':
+            chart_specs.save_chart_spec(
+                spec=chart_specs.get_distribution_spec(
+                    title=title, x_label=stat_cleaned, y_label=participant_label.title(), bxp_stats=bxp_stats,
+                    colors=colors, fig_size=(30, 16),
+                ),
+                filepath=filepath,
+                output_queue=output_queue,
+            )
+            continue
+        add_plot_skeleton(title=title, x_label=stat_cleaned, y_label=participant_label.title(), fig_size=(30, 16))
+        ax = plt.gca()
+        boxes = ax.bxp(bxpstats=bxp_stats, vert=False, patch_artist=True)['boxes']
+        for idx, box in enumerate(boxes):
+            box.set_facecolor(colors[idx % len(colors)])
+        ax.invert_yaxis() # First participant at the top
+        save_figure(filepath=filepath, output_queue=output_queue)
+        plt.close()
     return None
 
 
 def plot_match_facts_bar_charts(
         dataframes_by_stat: Dict[str, pd.DataFrame],
         folder_to_store: str,
+        participant_label: Optional[str] = 'team',
+        manifest: Optional[ChartManifest] = None,
+        chart_format: Optional[str] = 'png',
+        output_queue: Optional[OutputQueue] = None,
     ) -> None:
-    """Saves MatchFacts related bar-charts to PNG file/s"""
+    """
+    Saves MatchFacts related bar-charts to PNG file/s, or to JSON chart spec/s if `chart_format` is 'json'.
+    If a `manifest` is given, charts whose data/settings have not changed since they were last saved are skipped.
+    If an `output_queue` is given, the charts are written to disk in the background.
+    """
+    colors = [to_hex(color) for color in plt.get_cmap('tab10').colors]
     for stat, df_obj in dataframes_by_stat.items():
         stat_cleaned = f"Average {sc2ucc(string=stat)}"
+        color = colors[zlib.crc32(stat.encode('utf-8')) % len(colors)] # Same color for a stat on every run
         dict_averages_by_team = df_obj.mean().sort_values(ascending=True).apply(round, args=[2]).to_dict()
         
-        title = f"{stat_cleaned} by team"
+        title = f"{stat_cleaned} by {participant_label}"
         bar_labels = list(dict_averages_by_team.keys())
         bar_values = list(dict_averages_by_team.values())
+        filepath = f"{folder_to_store}/{title}{chart_specs.get_extension(chart_format=chart_format)}"
+        settings = {
+            'title': title, 'x_label': stat_cleaned, 'y_label': participant_label.title(), 'fig_size': (30, 16),
+            'color': color,
+        }
+        if manifest and not manifest.should_render(filepath=filepath, data=dict_averages_by_team, settings=settings):
+            continue
+        if chart_format == 'json':
+            chart_specs.save_chart_spec(
+                spec=chart_specs.get_bar_spec(
+                    title=title, x_label=stat_cleaned, y_label=participant_label.title(), horizontal=True,
+                    fig_size=(30, 16), colors=[color], bar_labels=bar_labels,
+                    bar_values=bar_values, annotate=True, symmetrical=False,
+                ),
+                filepath=filepath,
+                output_queue=output_queue,
+            )
+            continue
         plot_bar(
-            title=title, x_label=stat_cleaned, y_label='Team', horizontal=True, fig_size=(30, 16),
-            colors=[utils.generate_random_hex_code()], bar_labels=bar_labels, bar_values=bar_values,
-            annotate=True, symmetrical=False, save_at=f"{folder_to_store}/{title}.png",
+            title=title, x_label=stat_cleaned, y_label=participant_label.title(), horizontal=True, fig_size=(30, 16),
+            colors=[color], bar_labels=bar_labels, bar_values=bar_values,
+            annotate=True, symmetrical=False, save_at=filepath, output_queue=output_queue,
         )
     return None
 
@@ -50,19 +117,46 @@ def plot_match_facts_bar_charts(
 def plot_match_facts_timeseries(
         dataframes_by_stat: Dict[str, pd.DataFrame],
         folder_to_store: str,
+        participant_label: Optional[str] = 'team',
+        manifest: Optional[ChartManifest] = None,
+        chart_format: Optional[str] = 'png',
+        output_queue: Optional[OutputQueue] = None,
     ) -> None:
-    """Saves MatchFacts related timeseries charts to PNG file/s"""
+    """
+    Saves MatchFacts related timeseries charts to PNG file/s (one file per section of teams), or to JSON chart spec/s
+    if `chart_format` is 'json'.
+    If a `manifest` is given, charts whose data (values of the teams in the section) and settings have not changed
+    since they were last saved are skipped.
+    If an `output_queue` is given, the charts are written to disk in the background.
+    """
     for stat, df_obj in dataframes_by_stat.items():
         stat_cleaned = sc2ucc(string=stat)
-        title = f"{stat_cleaned} over time"
+        title = f"{stat_cleaned} over time by {participant_label}"
         teams = sorted(df_obj.columns.tolist())
         matchdays = list(range(1, len(df_obj) + 1))
         max_teams_per_plot = 6
         sections_of_teams = [
             teams[idx : idx + max_teams_per_plot] for idx in range(0, len(teams), max_teams_per_plot)
         ]
-        for section_of_teams in sections_of_teams:
-            section_name = "".join(list(map(lambda team: team[0], section_of_teams)))
+        num_digits = len(str(len(sections_of_teams)))
+        for section_number, section_of_teams in enumerate(sections_of_teams, start=1):
+            # Numbered (not named after the initials of the teams, which are not unique)
+            section_name = f"{section_number:0{num_digits}d} of {len(sections_of_teams)}"
+            filepath = f"{folder_to_store}/{title} ({section_name}){chart_specs.get_extension(chart_format=chart_format)}"
+            settings = {'title': title, 'fig_size': (16, 10), 'dpi': 300}
+            if manifest and not manifest.should_render(filepath=filepath, data=df_obj[section_of_teams], settings=settings):
+                continue
+            if chart_format == 'json':
+                chart_specs.save_chart_spec(
+                    spec=chart_specs.get_timeseries_spec(
+                        title=title,
+                        values_by_team={team: df_obj[team].tolist() for team in section_of_teams},
+                        fig_size=(16, 10),
+                    ),
+                    filepath=filepath,
+                    output_queue=output_queue,
+                )
+                continue
             plt.figure(figsize=(16, 10), dpi=300, clear=True)
             subplot_counter = 910
             for team in section_of_teams:
@@ -74,15 +168,26 @@ def plot_match_facts_timeseries(
                 plt.plot(matchdays, df_obj[team], linewidth=3)
                 plt.setp(ax.get_xticklabels(), visible=False)
                 plt.tight_layout()
-            plt.savefig(f"{folder_to_store}/{title} ({section_name}).png")
+            save_figure(filepath=filepath, output_queue=output_queue)
+            plt.close()
     return None
 
 
 def plot_match_facts_radar(
         df_match_facts_stats: pd.DataFrame,
         folder_to_store: str,
+        participant_label: Optional[str] = 'team',
+        manifest: Optional[ChartManifest] = None,
+        chart_format: Optional[str] = 'png',
+        output_queue: Optional[OutputQueue] = None,
     ) -> None:
-    """Saves MatchFacts related radar charts to PNG file/s"""
+    """
+    Saves MatchFacts related radar charts to PNG file/s (one file per participant), or to JSON chart spec/s if
+    `chart_format` is 'json'.
+    If a `manifest` is given, charts whose data (percentiles of the participant) and settings have not changed since
+    they were last saved are skipped.
+    If an `output_queue` is given, the charts are written to disk in the background.
+    """
     df_mfs = df_match_facts_stats.copy(deep=True)
     dict_stats_by_type = {
         'Overall': ['AvgPossession', 'AvgShots', 'AvgShotsOnTarget', 'AvgShotAccuracy', 'AvgPassAccuracy', 'AvgTackles', 'AvgFouls'],
@@ -102,15 +207,16 @@ def plot_match_facts_radar(
     for stat_type, stat_columns_by_type in dict_stats_by_type.items():
         columns_subset = ['Team'] + stat_columns_by_type
         df_mfs_subset = df_mfs.loc[:, columns_subset]
-        df_mfs_norm = utils.normalize_numerical_columns(
+        df_mfs_norm = normalize_columns(
             data=df_mfs_subset,
             columns=stat_columns_by_type,
+            method='percentile',
+            columns_with_desirable_lows=list(
+                filter(lambda string: 'AvgFouls' in string, stat_columns_by_type)
+            ),
         )
-        columns_to_flip = list(
-            filter(lambda string: 'AvgFouls' in string, stat_columns_by_type)
-        )
-        for column_to_flip in columns_to_flip:
-            df_mfs_norm[column_to_flip] = df_mfs_norm[column_to_flip].apply(lambda number: abs(number - 100))
+        # Participants without any match of the given result (eg: never drew) have no values to plot
+        df_mfs_norm = df_mfs_norm.dropna(subset=stat_columns_by_type, how='all').fillna(value=0)
         teams = df_mfs_norm['Team'].tolist()
         for team in teams:
             title = f"Performance Radar by percentile ({stat_type}) - {team}"
@@ -123,8 +229,23 @@ def plot_match_facts_radar(
                     labels,
                 )
             )
+            # Named after the participant label too, as teams/players/combos share the folder
+            filename = utils.get_safe_filename(name=f"Performance Radar by percentile ({stat_type}) - {participant_label.title()} - {team}")
+            filepath = f"{folder_to_store}/{filename}{chart_specs.get_extension(chart_format=chart_format)}"
+            settings = {'title': title, 'labels': labels, 'fig_size': (15, 9), 'tick_limit': (0, 100)}
+            if manifest and not manifest.should_render(filepath=filepath, data=values, settings=settings):
+                continue
+            if chart_format == 'json':
+                chart_specs.save_chart_spec(
+                    spec=chart_specs.get_radar_spec(
+                        title=title, labels=labels, values=values, tick_limit=(0, 100), fig_size=(15, 9),
+                    ),
+                    filepath=filepath,
+                    output_queue=output_queue,
+                )
+                continue
             plot_radar(
                 title=title, labels=labels, values=values, fig_size=(15, 9), color=None,
-                ticks=[], tick_limit=(0, 100), save_at=f"{folder_to_store}/{title}.png",
+                ticks=[], tick_limit=(0, 100), save_at=filepath, output_queue=output_queue,
             )
     return None
\ No newline at end of file
@@ -1,6 +1,8 @@
 from typing import Dict, Optional, List, Tuple, Union
+import io
 import matplotlib.pyplot as plt
 import numpy as np
+from output_sinks import OutputQueue
 import utils
 
 
@@ -53,6 +55,30 @@ def add_plot_skeleton(
     return obj
 
 
+def save_figure(filepath: str, output_queue: Optional[OutputQueue] = None) -> None:
+    """
+    Saves the current figure to `filepath`. If an `output_queue` is given, the figure is rendered to bytes here (as
+    pyplot is not thread-safe), and the bytes are written to disk by the writer threads of the queue.
+    """
+    if output_queue is None:
+        plt.savefig(filepath)
+        return None
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format=filepath.rsplit('.', 1)[-1])
+    output_queue.submit_bytes(filepath=filepath, content=buffer.getvalue())
+    return None
+
+
+def get_symmetrical_axis_limit(bar_values: List[Union[int, float]]) -> Optional[float]:
+    """
+    Returns limit for a value axis that is symmetrical around zero (i.e; [-limit, limit]) if `bar_values` have both
+    negative and positive numbers, else None
+    """
+    if utils.has_negative_number(array=bar_values) and utils.has_positive_number(array=bar_values):
+        return utils.get_max_of_abs_values(array=bar_values) * 1.05
+    return None
+
+
 def plot_bar(title: str,
              x_label: str,
              y_label: str,
@@ -64,7 +90,8 @@ def plot_bar(title: str,
              annotate: Optional[bool] = True,
              symmetrical: Optional[bool] = True,
              save_at: Optional[str] = None,
-             show: Optional[bool] = False) -> None:
+             show: Optional[bool] = False,
+             output_queue: Optional[OutputQueue] = None) -> None:
     add_plot_skeleton(title=title,
                       x_label=x_label,
                       y_label=y_label,
@@ -97,14 +124,14 @@ def plot_bar(title: str,
                      fontsize=annotation_size,
                      color='black')
     if symmetrical:
-        if utils.has_negative_number(array=bar_values) and utils.has_positive_number(array=bar_values):
-            axis_limit = utils.get_max_of_abs_values(array=bar_values) * 1.05
+        axis_limit = get_symmetrical_axis_limit(bar_values=bar_values)
+        if axis_limit is not None:
             if horizontal:
                 plt.xlim(-axis_limit, axis_limit)
             else:
                 plt.ylim(-axis_limit, axis_limit)
     if save_at:
-        plt.savefig(save_at)
+        save_figure(filepath=save_at, output_queue=output_queue)
     if show:
         plt.show()
     plt.close()
@@ -121,6 +148,7 @@ def plot_radar(
         color: Optional[str] = None,
         save_at: Optional[str] = None,
         show: Optional[bool] = False,
+        output_queue: Optional[OutputQueue] = None,
     ) -> None:
     dict_calibrated_plot_fonts = get_calibrated_plot_fonts(fig_size=fig_size)
     angles = np.linspace(start=0, stop=2*np.pi, num=len(labels), endpoint=False)
@@ -142,7 +170,7 @@ def plot_radar(
         plt.ylim(tick_limit)
     plt.title(title, size=dict_calibrated_plot_fonts['title_size'])
     if save_at:
-        plt.savefig(save_at)
+        save_figure(filepath=save_at, output_queue=output_queue)
     if show:
         plt.show()
     plt.close()
@@ -0,0 +1,167 @@
+from typing import Iterator, Optional, Union
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from config import FOLDER_NAMES
+import utils
+
+NUM_TOP_FUNCTIONS = 15
+NUM_TOP_ALLOCATION_SITES = 15
+
+
+def get_profiling_folder(output_root: str) -> str:
+    """
+    Returns folder in which the profiling results of a run are stored, i.e; "MatchFacts - Profiling/{timestamp}" next
+    to `output_root` (one sub-folder per run, so that runs can be compared)
+    """
+    parent_folder = os.path.dirname(os.path.abspath(output_root))
+    return os.path.join(parent_folder, FOLDER_NAMES['root-profiling'], str(utils.get_current_timestamp()))
+
+
+class StageProfiler:
+
+    def __init__(self, folder: str, enabled: Optional[bool] = False) -> None:
+        """
+        Opt-in profiler of the stages of a pipeline run. Wrap every stage with `profile_stage`, and call
+        `save_summary` at the end of the run. Does nothing if `enabled` is False.
+        For every stage, saves to `folder`:
+            - "{idx} - {stage}.prof": cProfile dump (open with `pstats`/snakeviz)
+            - "{idx} - {stage} (allocations).txt": top allocation sites (by size of the memory allocated during the
+            stage and still held at its end), from tracemalloc snapshots taken at the start/end of the stage
+        `save_summary` saves "Summary.txt" having the wall time, peak traced memory, top functions (by cumulative time)
+        and top allocation sites of every stage.
+        Note: tracemalloc slows down allocation-heavy code, so the timings are only comparable between profiled runs.
+        """
+        self.folder = folder
+        self.enabled = enabled
+        self.summaries = []
+        return None
+
+    @staticmethod
+    def __to_filename(stage: str) -> str:
+        return "".join(char if char.isalnum() or char in ' -_()' else '_' for char in stage)
+
+    @staticmethod
+    def __format_size(num_bytes: Union[int, float]) -> str:
+        for unit in ['B', 'KiB', 'MiB']:
+            if abs(num_bytes) < 1024:
+                return f"{num_bytes:.1f} {unit}"
+            num_bytes /= 1024
+        return f"{num_bytes:.1f} GiB"
+
+    @contextlib.contextmanager
+    def profile_stage(self, stage: str) -> Iterator[None]:
+        """Context manager that profiles the code run inside it as the given stage"""
+        if not self.enabled:
+            yield
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else: # Python < 3.9. Restarting the tracing resets the peak (but also forgets the memory traced so far)
+            traceback_limit = tracemalloc.get_traceback_limit()
+            tracemalloc.stop()
+            tracemalloc.start(traceback_limit)
+        snapshot_before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall_time = time.perf_counter() - start
+            _, peak_memory = tracemalloc.get_traced_memory()
+            snapshot_after = tracemalloc.take_snapshot()
+            if not was_tracing:
+                tracemalloc.stop()
+            self.__save_stage(
+                stage=stage,
+                profile=profile,
+                wall_time=wall_time,
+                peak_memory=peak_memory,
+                snapshot_before=snapshot_before,
+                snapshot_after=snapshot_after,
+            )
+        return
+
+    def __save_stage(
+            self,
+            stage: str,
+            profile: cProfile.Profile,
+            wall_time: float,
+            peak_memory: int,
+            snapshot_before: tracemalloc.Snapshot,
+            snapshot_after: tracemalloc.Snapshot,
+        ) -> None:
+        filepath_without_ext = os.path.join(self.folder, f"{len(self.summaries) + 1:02d} - {self.__to_filename(stage=stage)}")
+        profile.dump_stats(f"{filepath_without_ext}.prof")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(NUM_TOP_FUNCTIONS)
+        top_functions = stream.getvalue().strip()
+
+        ignored_filters = [
+            tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+            tracemalloc.Filter(inclusive=False, filename_pattern="<frozen importlib._bootstrap*>"),
+        ]
+        differences = snapshot_after.filter_traces(ignored_filters).compare_to(
+            old_snapshot=snapshot_before.filter_traces(ignored_filters),
+            key_type='lineno',
+        )
+        differences = sorted(differences, key=lambda difference: difference.size_diff, reverse=True)
+        top_allocation_sites = [
+            f"{self.__format_size(num_bytes=difference.size_diff):>12} in {difference.count_diff:>8} block/s - {difference.traceback[0]}"
+            for difference in differences[:NUM_TOP_ALLOCATION_SITES] if difference.size_diff > 0
+        ]
+        with open(f"{filepath_without_ext} (allocations).txt", 'w', encoding='utf-8') as file_obj:
+            file_obj.write("\n".join(str(difference) for difference in differences if difference.size_diff != 0))
+
+        self.summaries.append({
+            'stage': stage,
+            'wall_time': wall_time,
+            'peak_memory': peak_memory,
+            'top_functions': top_functions,
+            'top_allocation_sites': top_allocation_sites,
+        })
+        return None
+
+    def get_summary(self) -> str:
+        """Returns summary (text) of the stages profiled so far"""
+        lines = [f"{'Stage':<40} {'Wall time':>12} {'Peak memory':>14}"]
+        for summary in self.summaries:
+            lines.append(
+                f"{summary['stage']:<40} {summary['wall_time']:>10.3f} s"
+                f" {self.__format_size(num_bytes=summary['peak_memory']):>14}"
+            )
+        for summary in self.summaries:
+            lines += [
+                "",
+                "=" * 100,
+                f"Stage: {summary['stage']}",
+                "=" * 100,
+                "Top functions (by cumulative time):",
+                summary['top_functions'],
+                "",
+                "Top allocation sites (memory allocated during the stage, and held at its end):",
+            ]
+            lines += summary['top_allocation_sites'] or ["None"]
+        return "\n".join(lines)
+
+    def save_summary(self) -> Optional[str]:
+        """Saves summary to "Summary.txt" in the profiling folder, and returns its filepath (None if not enabled)"""
+        if not self.enabled or not self.summaries:
+            return None
+        filepath = os.path.join(self.folder, 'Summary.txt')
+        with open(filepath, 'w', encoding='utf-8') as file_obj:
+            file_obj.write(self.get_summary())
+        print(f"Saved profiling results to '{self.folder}'")
+        return filepath
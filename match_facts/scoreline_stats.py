@@ -1,12 +1,14 @@
-from typing import Dict
+from typing import Dict, Optional, Union
 import pandas as pd
 import config
-import filters
+from partitions import ParticipantPartitions
+from sqlite_store import SQLiteMatchStore, get_match_facts
 import utils
 
 
-def get_win_count(data: pd.DataFrame, team: str) -> int:
-    """Get count of wins by team (Expects DataFrame having MatchFacts data)"""
+def get_win_count(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> int:
+    """Get count of wins by team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     team_is_home = (data['HomeTeam'] == team)
     team_is_away = (data['AwayTeam'] == team)
     df_home_wins = data[team_is_home & (data['HomeGoals'] > data['AwayGoals'])]
@@ -15,8 +17,9 @@ def get_win_count(data: pd.DataFrame, team: str) -> int:
     return win_count
 
 
-def get_loss_count(data: pd.DataFrame, team: str) -> int:
-    """Get count of losses by team (Expects DataFrame having MatchFacts data)"""
+def get_loss_count(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> int:
+    """Get count of losses by team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     team_is_home = (data['HomeTeam'] == team)
     team_is_away = (data['AwayTeam'] == team)
     df_home_losses = data[team_is_home & (data['HomeGoals'] < data['AwayGoals'])]
@@ -25,32 +28,36 @@ def get_loss_count(data: pd.DataFrame, team: str) -> int:
     return loss_count
 
 
-def get_draw_count(data: pd.DataFrame, team: str) -> int:
-    """Get count of draws by team (Expects DataFrame having MatchFacts data)"""
+def get_draw_count(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> int:
+    """Get count of draws by team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     team_is_playing = (data['HomeTeam'] == team) | (data['AwayTeam'] == team)
     is_drawn = (data['HomeGoals'] == data['AwayGoals'])
     draw_count = len(data[team_is_playing & is_drawn])
     return draw_count
 
 
-def get_goals_scored(data: pd.DataFrame, team: str) -> int:
-    """Get count of goals scored by team (Expects DataFrame having MatchFacts data)"""
+def get_goals_scored(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> int:
+    """Get count of goals scored by team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     home_goals_scored = data[data['HomeTeam'] == team]['HomeGoals'].sum()
     away_goals_scored = data[data['AwayTeam'] == team]['AwayGoals'].sum()
     goals_scored = home_goals_scored + away_goals_scored
     return goals_scored
 
 
-def get_goals_allowed(data: pd.DataFrame, team: str) -> int:
-    """Get count of goals allowed by team (Expects DataFrame having MatchFacts data)"""
+def get_goals_allowed(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> int:
+    """Get count of goals allowed by team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     home_goals_allowed = data[data['HomeTeam'] == team]['AwayGoals'].sum()
     away_goals_allowed = data[data['AwayTeam'] == team]['HomeGoals'].sum()
     goals_allowed = home_goals_allowed + away_goals_allowed
     return goals_allowed
 
 
-def get_clean_sheet_count(data: pd.DataFrame, team: str) -> int:
-    """Get count of clean sheets kept by team (Expects DataFrame having MatchFacts data)"""
+def get_clean_sheet_count(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> int:
+    """Get count of clean sheets kept by team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     team_is_home = (data['HomeTeam'] == team)
     team_is_away = (data['AwayTeam'] == team)
     df_cs_away = data[team_is_away & (data['HomeGoals'] == 0)]
@@ -59,8 +66,9 @@ def get_clean_sheet_count(data: pd.DataFrame, team: str) -> int:
     return number_of_clean_sheets
 
 
-def get_clean_sheets_against_count(data: pd.DataFrame, team: str) -> int:
-    """Get count of clean sheets kept against given team (Expects DataFrame having MatchFacts data)"""
+def get_clean_sheets_against_count(data: Union[pd.DataFrame, SQLiteMatchStore], team: str) -> int:
+    """Get count of clean sheets kept against given team (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     team_is_home = (data['HomeTeam'] == team)
     team_is_away = (data['AwayTeam'] == team)
     df_cs_against_away = data[team_is_away & (data['AwayGoals'] == 0)]
@@ -69,8 +77,9 @@ def get_clean_sheets_against_count(data: pd.DataFrame, team: str) -> int:
     return number_of_clean_sheets_against
 
 
-def get_rout_count(data: pd.DataFrame, team: str, goal_margin: int) -> int:
-    """Get count of wins by team that are by margin >= `goal_margin` (Expects DataFrame having MatchFacts data)"""
+def get_rout_count(data: Union[pd.DataFrame, SQLiteMatchStore], team: str, goal_margin: int) -> int:
+    """Get count of wins by team that are by margin >= `goal_margin` (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     df_altered = data.copy(deep=True)
     df_altered['goal_margin'] = (df_altered['HomeGoals'] - df_altered['AwayGoals']).abs()
     df_rout_subset = df_altered[df_altered['goal_margin'] >= goal_margin]
@@ -82,8 +91,9 @@ def get_rout_count(data: pd.DataFrame, team: str, goal_margin: int) -> int:
     return total_routs
 
 
-def get_capitulation_count(data: pd.DataFrame, team: str, goal_margin: int) -> int:
-    """Get count of losses by team that are by margin >= `goal_margin` (Expects DataFrame having MatchFacts data)"""
+def get_capitulation_count(data: Union[pd.DataFrame, SQLiteMatchStore], team: str, goal_margin: int) -> int:
+    """Get count of losses by team that are by margin >= `goal_margin` (Expects DataFrame having MatchFacts data, or SQLiteMatchStore)"""
+    data = get_match_facts(data=data, team=team)
     df_altered = data.copy(deep=True)
     df_altered['goal_margin'] = (df_altered['HomeGoals'] - df_altered['AwayGoals']).abs()
     df_capitulation_subset = df_altered[df_altered['goal_margin'] >= goal_margin]
@@ -133,14 +143,11 @@ def get_results_string(data: pd.DataFrame) -> Dict[str, str]:
     return dictionary_results
 
 
-def get_scoreline_stats_by_team(data: pd.DataFrame) -> pd.DataFrame:
-    """Expects MatchFacts DataFrame. Returns DataFrame of scoreline related stats by team"""
-    df_mf = data.copy(deep=True)
+def __get_scoreline_stats(partitions: ParticipantPartitions) -> pd.DataFrame:
+    """Returns DataFrame of scoreline related stats by participant (from the rows of each participant)"""
     df_scoreline_stats = pd.DataFrame()
-    dict_results_string = get_results_string(data=df_mf)
-    teams = utils.get_unique_teams(df_match_facts=df_mf)
-    for team in teams:
-        df_by_team = filters.filter_by_team(df_match_facts=df_mf, team=team)
+    dict_results_string = get_results_string(data=partitions.data)
+    for team, df_by_team in partitions.items():
         games_played = len(df_by_team)
         wins = get_win_count(data=df_by_team, team=team)
         losses = get_loss_count(data=df_by_team, team=team)
@@ -175,24 +182,46 @@ def get_scoreline_stats_by_team(data: pd.DataFrame) -> pd.DataFrame:
         rank_column_name='Rank',
         rank_by=['PPG', 'GDPG'],
         ascending=[False, False],
+        method='competition',
     )
     df_scoreline_stats.drop(labels=['PPG', 'GDPG'], axis=1, inplace=True)
     return df_scoreline_stats
 
 
-def get_scoreline_stats_by_player(data: pd.DataFrame) -> pd.DataFrame:
-    """Expects MatchFacts DataFrame. Returns DataFrame of scoreline related stats by player"""
-    df_mf = data.copy(deep=True)
-    df_mf['HomeTeam'] = df_mf['HomePlayer'].tolist()
-    df_mf['AwayTeam'] = df_mf['AwayPlayer'].tolist()
-    df_scoreline_stats_by_player = get_scoreline_stats_by_team(data=df_mf)
-    return df_scoreline_stats_by_player
+def get_scoreline_stats_by_team(
+        data: Union[pd.DataFrame, SQLiteMatchStore],
+        partitions: Optional[ParticipantPartitions] = None,
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame (or SQLiteMatchStore). Returns DataFrame of scoreline related stats by team.
+    Pass `partitions` (of `data`, split by team) to reuse rows that are already split, eg: across stats functions
+    """
+    if partitions is None:
+        partitions = ParticipantPartitions(df_match_facts=get_match_facts(data=data), participant_type='team')
+    return __get_scoreline_stats(partitions=partitions)
 
 
-def get_scoreline_stats_by_player_and_team_combo(data: pd.DataFrame) -> pd.DataFrame:
-    """Expects MatchFacts DataFrame. Returns DataFrame of scoreline related stats by (player, team) combo"""
-    df_mf = data.copy(deep=True)
-    df_mf['HomeTeam'] = df_mf['HomePlayer'] + '|' + df_mf['HomeTeam']
-    df_mf['AwayTeam'] = df_mf['AwayPlayer'] + '|' + df_mf['AwayTeam']
-    df_scoreline_stats_by_player_and_team_combo = get_scoreline_stats_by_team(data=df_mf)
-    return df_scoreline_stats_by_player_and_team_combo
\ No newline at end of file
+def get_scoreline_stats_by_player(
+        data: Union[pd.DataFrame, SQLiteMatchStore],
+        partitions: Optional[ParticipantPartitions] = None,
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame (or SQLiteMatchStore). Returns DataFrame of scoreline related stats by player.
+    Pass `partitions` (of `data`, split by player) to reuse rows that are already split, eg: across stats functions
+    """
+    if partitions is None:
+        partitions = ParticipantPartitions(df_match_facts=get_match_facts(data=data), participant_type='player')
+    return __get_scoreline_stats(partitions=partitions)
+
+
+def get_scoreline_stats_by_player_and_team_combo(
+        data: Union[pd.DataFrame, SQLiteMatchStore],
+        partitions: Optional[ParticipantPartitions] = None,
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame (or SQLiteMatchStore). Returns DataFrame of scoreline related stats by (player, team) combo.
+    Pass `partitions` (of `data`, split by (player, team) combo) to reuse rows that are already split, eg: across stats functions
+    """
+    if partitions is None:
+        partitions = ParticipantPartitions(df_match_facts=get_match_facts(data=data), participant_type='combo')
+    return __get_scoreline_stats(partitions=partitions)
\ No newline at end of file
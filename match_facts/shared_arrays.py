@@ -0,0 +1,192 @@
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import sys
+import uuid
+import weakref
+import numpy as np
+import pandas as pd
+from partitions import PARTICIPANT_TYPES, get_participant_frame
+from validators import EXPECTED_FLOAT_COLUMNS, EXPECTED_INTEGER_COLUMNS
+
+NUMERIC_COLUMNS = EXPECTED_INTEGER_COLUMNS + EXPECTED_FLOAT_COLUMNS
+PARTICIPANT_CODE_DTYPE = 'int32'
+PARTICIPANT_NAME_SEPARATOR = '\x00'
+
+# Arrays attached by this (worker) process, for the most recently attached handle
+__attached = {'token': None, 'shared_arrays': None}
+
+
+class SharedArraysHandle:
+
+    def __init__(self, token: str, num_rows: int, arrays: Dict[str, Tuple[str, str, int]]) -> None:
+        """
+        Picklable reference to arrays published by `SharedMatchFacts`, passed to worker processes (instead of the data).
+        `arrays` has keys = array name, and values = tuple of (shared memory segment name, dtype, length).
+        It holds no data, so pickling it per task costs a few hundred bytes, regardless of the number of matches.
+        """
+        self.token = token
+        self.num_rows = num_rows
+        self.arrays = arrays
+        return None
+
+    @staticmethod
+    def get_codes_key(participant_type: str, side: str) -> str:
+        """Returns name of the array having the codes of the home/away participants. Options for `side`: ['Home', 'Away']"""
+        return f"{participant_type}:{side}Codes"
+
+    @staticmethod
+    def get_names_key(participant_type: str) -> str:
+        """Returns name of the array having the (encoded) names of the participants"""
+        return f"{participant_type}:Names"
+
+
+class SharedMatchFacts:
+
+    def __init__(self, df_match_facts: pd.DataFrame, participant_types: Optional[List[str]] = None) -> None:
+        """
+        Publishes the numeric columns of MatchFacts DataFrame, and the participant codes of every participant type, once
+        into shared memory segments (`multiprocessing.shared_memory`), so that worker processes can read them without
+        the DataFrame being pickled to every worker/task. Pass `handle` to the workers, which get zero-copy (read-only)
+        NumPy views of the arrays with `attach_shared_arrays`.
+        Participants are stored as codes (int32) of their home/away sides, and their names (one segment per participant
+        type). Options for `participant_types`: Subset of ['team', 'player', 'combo']. Defaults to all.
+        The segments are released by `close` (or when used as a context manager), and at the latest when the object is
+        garbage collected or the interpreter exits.
+        """
+        self.segments: List[shared_memory.SharedMemory] = []
+        self.__finalizer = weakref.finalize(self, SharedMatchFacts.__release, self.segments)
+        arrays = {column: df_match_facts[column].to_numpy() for column in NUMERIC_COLUMNS}
+        df_names = df_match_facts.loc[:, ['HomePlayer', 'AwayPlayer', 'HomeTeam', 'AwayTeam']]
+        for participant_type in participant_types or PARTICIPANT_TYPES:
+            df_participants = get_participant_frame(data=df_names, participant_type=participant_type)
+            num_rows = len(df_participants)
+            values = np.concatenate([df_participants['HomeTeam'].to_numpy(dtype=object), df_participants['AwayTeam'].to_numpy(dtype=object)])
+            codes, participants = pd.factorize(values, sort=True)
+            names = PARTICIPANT_NAME_SEPARATOR.join(participants.tolist()).encode('utf-8')
+            arrays[SharedArraysHandle.get_codes_key(participant_type=participant_type, side='Home')] = codes[:num_rows].astype(PARTICIPANT_CODE_DTYPE)
+            arrays[SharedArraysHandle.get_codes_key(participant_type=participant_type, side='Away')] = codes[num_rows:].astype(PARTICIPANT_CODE_DTYPE)
+            arrays[SharedArraysHandle.get_names_key(participant_type=participant_type)] = np.frombuffer(names, dtype=np.uint8)
+        try:
+            handle_arrays = {name: self.__publish(array=array) for name, array in arrays.items()}
+        except BaseException:
+            self.close()
+            raise
+        self.handle = SharedArraysHandle(token=uuid.uuid4().hex, num_rows=len(df_match_facts), arrays=handle_arrays)
+        return None
+
+    def __enter__(self) -> 'SharedMatchFacts':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        return None
+
+    def __publish(self, array: np.ndarray) -> Tuple[str, str, int]:
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1)) # Size must be positive
+        self.segments.append(segment)
+        np.ndarray(shape=array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        return segment.name, array.dtype.str, len(array)
+
+    @staticmethod
+    def __release(segments: List[shared_memory.SharedMemory]) -> None:
+        for segment in segments:
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        segments.clear()
+        return None
+
+    def close(self) -> None:
+        """Closes and unlinks the shared memory segments (workers must be done with them)"""
+        self.__finalizer()
+        return None
+
+
+class SharedArrays:
+
+    def __init__(self, handle: SharedArraysHandle) -> None:
+        """
+        Zero-copy, read-only NumPy views of the arrays published by `SharedMatchFacts` (see `attach_shared_arrays`).
+        `get_participants` decodes the names of the participants (once per participant type).
+        """
+        self.num_rows = handle.num_rows
+        self.segments: List[shared_memory.SharedMemory] = []
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (segment_name, dtype, length) in handle.arrays.items():
+            segment = self.__attach_segment(name=segment_name)
+            self.segments.append(segment)
+            array = np.ndarray(shape=(length,), dtype=np.dtype(dtype), buffer=segment.buf)
+            array.flags.writeable = False
+            self.arrays[name] = array
+        self.__participants_by_type: Dict[str, List[str]] = {}
+        return None
+
+    @staticmethod
+    def __attach_segment(name: str) -> shared_memory.SharedMemory:
+        """Attaches existing segment. Only the publisher unlinks segments, so attaching processes do not track them"""
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=name, track=False)
+        return shared_memory.SharedMemory(name=name) # Worker processes share the resource tracker of their parent
+
+    def get_column(self, column: str) -> np.ndarray:
+        """Returns view of a numeric MatchFacts column (see `NUMERIC_COLUMNS`)"""
+        return self.arrays[column]
+
+    def get_participant_codes(self, participant_type: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns views of the codes of the home and away participants (indices into `get_participants`)"""
+        home_codes = self.arrays[SharedArraysHandle.get_codes_key(participant_type=participant_type, side='Home')]
+        away_codes = self.arrays[SharedArraysHandle.get_codes_key(participant_type=participant_type, side='Away')]
+        return home_codes, away_codes
+
+    def get_participants(self, participant_type: str) -> List[str]:
+        """Returns names of the participants of the given type (in sorted order)"""
+        if participant_type not in self.__participants_by_type:
+            names = self.arrays[SharedArraysHandle.get_names_key(participant_type=participant_type)].tobytes().decode('utf-8')
+            self.__participants_by_type[participant_type] = names.split(PARTICIPANT_NAME_SEPARATOR) if names else []
+        return self.__participants_by_type[participant_type]
+
+    def get_participant_frame(
+            self,
+            participant_type: Optional[str] = 'team',
+            start: Optional[int] = None,
+            stop: Optional[int] = None,
+        ) -> pd.DataFrame:
+        """
+        Returns DataFrame of the rows [start, stop) having the numeric columns, and the participants of the given type
+        in the 'HomeTeam'/'AwayTeam' columns (like `partitions.get_participant_frame`). The rows are copied.
+        """
+        participants = np.array(self.get_participants(participant_type=participant_type), dtype=object)
+        home_codes, away_codes = self.get_participant_codes(participant_type=participant_type)
+        data = {column: self.arrays[column][start:stop] for column in NUMERIC_COLUMNS}
+        data['HomeTeam'] = participants[home_codes[start:stop]]
+        data['AwayTeam'] = participants[away_codes[start:stop]]
+        return pd.DataFrame(data=data)
+
+    def close(self) -> None:
+        """Detaches the segments (views of the arrays must no longer be used)"""
+        self.arrays = {}
+        self.__participants_by_type = {}
+        for segment in self.segments:
+            try:
+                segment.close()
+            except BufferError: # Views still referenced elsewhere. Detached once they are garbage collected
+                pass
+        self.segments = []
+        return None
+
+
+def attach_shared_arrays(handle: SharedArraysHandle) -> SharedArrays:
+    """
+    Returns `SharedArrays` (views of the published arrays) of the handle. Segments are attached once per process, and
+    reused by all tasks given the same handle (the previously attached handle is released).
+    """
+    if __attached['token'] != handle.token:
+        if __attached['shared_arrays'] is not None:
+            __attached['shared_arrays'].close()
+        __attached['token'] = None
+        __attached['shared_arrays'] = SharedArrays(handle=handle)
+        __attached['token'] = handle.token
+    return __attached['shared_arrays']
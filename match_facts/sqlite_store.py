@@ -0,0 +1,227 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import os
+import sqlite3
+import pandas as pd
+from dedup_index import DUPLICATE_POLICIES, MATCH_KEY_COLUMNS
+from errors import InvalidMatchFactsError
+from validators import (
+    EXPECTED_COLUMNS,
+    EXPECTED_COLUMNS_WITH_DATATYPE,
+    PANDAS_DATATYPES,
+    get_empty_match_facts,
+    validate_match_facts,
+)
+
+SQLITE_EXTENSIONS = ['.sqlite', '.sqlite3', '.db']
+TABLE_NAME = 'matches'
+SQLITE_DATATYPES = {'integer': 'INTEGER', 'float': 'REAL', 'string': 'TEXT'}
+# Index name => indexed columns. Queries by team/player/combo look up the home and away indexes (OR optimization)
+INDEXES = {
+    'idx_matches_timestamp': ['Timestamp'],
+    'idx_matches_home_team': ['HomeTeam'],
+    'idx_matches_away_team': ['AwayTeam'],
+    'idx_matches_home_player': ['HomePlayer'],
+    'idx_matches_away_player': ['AwayPlayer'],
+    'idx_matches_home_player_team': ['HomePlayer', 'HomeTeam'],
+    'idx_matches_away_player_team': ['AwayPlayer', 'AwayTeam'],
+}
+UNIQUE_INDEX_NAME = 'idx_matches_unique_match' # Over `dedup_index.MATCH_KEY_COLUMNS`
+
+
+def is_sqlite_store(path: str) -> bool:
+    """Returns True if `path` is the filepath to an SQLite match store (based on its extension)"""
+    return os.path.splitext(path)[1].lower() in SQLITE_EXTENSIONS
+
+
+class SQLiteMatchStore:
+
+    def __init__(self, filepath: str) -> None:
+        """
+        Optional match store that keeps MatchFacts data in an (embedded) SQLite database, with indexes on the team,
+        player, (player, team) combo and timestamp columns. Lookups by participant and/or timestamp range only read the
+        matching rows (`read`, or `iter_chunks` to stream them in chunks), instead of loading the whole dataset.
+        Matches are bulk inserted in one transaction by `append`. Duplicate matches (same timestamp, players, teams and
+        score) are kept out by a unique index.
+        The functions in `filters` accept the store in place of a MatchFacts DataFrame.
+        """
+        self.filepath = filepath
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.__create_schema()
+        return None
+
+    def __enter__(self) -> 'SQLiteMatchStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        return None
+
+    def close(self) -> None:
+        self.connection.close()
+        return None
+
+    def __create_schema(self) -> None:
+        column_definitions = ", ".join(
+            f"{column} {SQLITE_DATATYPES[datatype]} NOT NULL" for column, datatype in EXPECTED_COLUMNS_WITH_DATATYPE.items()
+        )
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({column_definitions})")
+            for index_name, columns in INDEXES.items():
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {TABLE_NAME} ({', '.join(columns)})")
+            self.connection.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_INDEX_NAME} ON {TABLE_NAME} ({', '.join(MATCH_KEY_COLUMNS)})"
+            )
+        return None
+
+    def __len__(self) -> int:
+        return self.connection.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()[0]
+
+    def append(self, data: pd.DataFrame, on_duplicate: Optional[str] = 'drop') -> int:
+        """
+        Bulk inserts MatchFacts DataFrame (validated first) in one transaction. Returns number of matches inserted.
+        Options for `on_duplicate`: ['drop', 'raise']
+            - 'drop': Matches already in the store (or repeated within `data`) are skipped
+            - 'raise': Raises InvalidMatchFactsError (and inserts nothing) if there are duplicate matches
+        """
+        if on_duplicate not in DUPLICATE_POLICIES:
+            raise ValueError(f"Expected `on_duplicate` to be in {DUPLICATE_POLICIES}, but got '{on_duplicate}'")
+        if data.empty:
+            return 0
+        validate_match_facts(df_match_facts=data)
+        rows = data.loc[:, EXPECTED_COLUMNS].astype(object).itertuples(index=False, name=None)
+        placeholders = ", ".join(["?"] * len(EXPECTED_COLUMNS))
+        with self.connection: # Commits, or rolls back if an exception is raised
+            num_changes_before = self.connection.total_changes
+            self.connection.executemany(
+                f"INSERT OR IGNORE INTO {TABLE_NAME} ({', '.join(EXPECTED_COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+            num_inserted = self.connection.total_changes - num_changes_before
+            num_duplicates = len(data) - num_inserted
+            if on_duplicate == 'raise' and num_duplicates > 0:
+                raise InvalidMatchFactsError(f"Found {num_duplicates} duplicate match/es. Nothing was inserted")
+        return num_inserted
+
+    @staticmethod
+    def __get_where_clause(
+            team: Optional[str] = None,
+            player: Optional[str] = None,
+            player_and_team_combo: Optional[Tuple[str, str]] = None,
+            start_timestamp: Optional[int] = None,
+            end_timestamp: Optional[int] = None,
+        ) -> Tuple[str, List[Any]]:
+        conditions, parameters = [], []
+        if team is not None:
+            conditions.append("(HomeTeam = ? OR AwayTeam = ?)")
+            parameters += [team, team]
+        if player is not None:
+            conditions.append("(HomePlayer = ? OR AwayPlayer = ?)")
+            parameters += [player, player]
+        if player_and_team_combo is not None:
+            combo_player, combo_team = player_and_team_combo
+            conditions.append("((HomePlayer = ? AND HomeTeam = ?) OR (AwayPlayer = ? AND AwayTeam = ?))")
+            parameters += [combo_player, combo_team, combo_player, combo_team]
+        if start_timestamp is not None:
+            conditions.append("Timestamp >= ?")
+            parameters.append(int(start_timestamp))
+        if end_timestamp is not None:
+            conditions.append("Timestamp <= ?")
+            parameters.append(int(end_timestamp))
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where_clause, parameters
+
+    @staticmethod
+    def __to_match_facts(data: pd.DataFrame) -> pd.DataFrame:
+        return data.astype({
+            column: PANDAS_DATATYPES[datatype] for column, datatype in EXPECTED_COLUMNS_WITH_DATATYPE.items()
+        })
+
+    def iter_chunks(
+            self,
+            team: Optional[str] = None,
+            player: Optional[str] = None,
+            player_and_team_combo: Optional[Tuple[str, str]] = None,
+            start_timestamp: Optional[int] = None,
+            end_timestamp: Optional[int] = None,
+            chunk_size: Optional[int] = 100_000,
+        ) -> Iterator[pd.DataFrame]:
+        """
+        Yields MatchFacts DataFrames of at most `chunk_size` rows, having the matches that satisfy all the given filters
+        (in the order they were inserted). `player_and_team_combo` is a tuple of (player, team).
+        Filters are answered with the indexes, and only one chunk is held in memory at a time.
+        """
+        where_clause, parameters = self.__get_where_clause(
+            team=team,
+            player=player,
+            player_and_team_combo=player_and_team_combo,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+        )
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(EXPECTED_COLUMNS)} FROM {TABLE_NAME} {where_clause} ORDER BY rowid",
+            parameters,
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield self.__to_match_facts(data=pd.DataFrame.from_records(data=rows, columns=EXPECTED_COLUMNS))
+        return
+
+    def read(
+            self,
+            team: Optional[str] = None,
+            player: Optional[str] = None,
+            player_and_team_combo: Optional[Tuple[str, str]] = None,
+            start_timestamp: Optional[int] = None,
+            end_timestamp: Optional[int] = None,
+        ) -> pd.DataFrame:
+        """Returns MatchFacts DataFrame having the matches that satisfy all the given filters (see `iter_chunks`)"""
+        dataframes = list(
+            self.iter_chunks(
+                team=team,
+                player=player,
+                player_and_team_combo=player_and_team_combo,
+                start_timestamp=start_timestamp,
+                end_timestamp=end_timestamp,
+            )
+        )
+        if not dataframes:
+            return get_empty_match_facts()
+        return pd.concat(objs=dataframes, ignore_index=True)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Returns dictionary having the number of rows, and the min/max timestamp of the store"""
+        num_rows, min_timestamp, max_timestamp = self.connection.execute(
+            f"SELECT COUNT(*), MIN(Timestamp), MAX(Timestamp) FROM {TABLE_NAME}"
+        ).fetchone()
+        return {'num_rows': num_rows, 'min_timestamp': min_timestamp, 'max_timestamp': max_timestamp}
+
+
+def get_match_facts(
+        data: Union[pd.DataFrame, SQLiteMatchStore],
+        team: Optional[str] = None,
+        player: Optional[str] = None,
+        player_and_team_combo: Optional[Tuple[str, str]] = None,
+    ) -> pd.DataFrame:
+    """
+    Returns `data` itself if it is a MatchFacts DataFrame. If it is a `SQLiteMatchStore`, returns MatchFacts DataFrame
+    of only the matches of the team/player/combo (read via the indexes of the store), or of all matches if none is given.
+    Lets the filter and stats functions accept either.
+    """
+    if isinstance(data, SQLiteMatchStore):
+        return data.read(team=team, player=player, player_and_team_combo=player_and_team_combo)
+    return data
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        print("Usage: python sqlite_store.py <MatchFacts CSV> <SQLite match store (.sqlite)>")
+        sys.exit(1)
+    with SQLiteMatchStore(filepath=sys.argv[2]) as match_store:
+        df_match_facts = pd.read_csv(sys.argv[1])
+        num_inserted = match_store.append(data=df_match_facts)
+        print(f"Inserted {num_inserted} match/es, and dropped {len(df_match_facts) - num_inserted} duplicate match/es")
+        print(f"Store summary: {match_store.get_summary()}")
@@ -0,0 +1,251 @@
+from typing import List, Optional, Tuple, Union
+import bisect
+import pandas as pd
+
+TIE_BREAKERS = ['points', 'ppg', 'goal_difference', 'gdpg', 'goals_scored', 'wins', 'head_to_head']
+RANKING_METHODS = ['dense', 'competition']
+DEFAULT_TIE_BREAKERS = ['points', 'goal_difference', 'goals_scored', 'head_to_head']
+
+
+class LeagueTable:
+
+    def __init__(
+            self,
+            tie_breakers: Optional[List[str]] = None,
+            ranking_method: Optional[str] = 'competition',
+        ) -> None:
+        """
+        League table (standings) that can be updated one match at a time.
+        Teams are ordered by the given tie-breakers (in order, higher is better). Teams that are level on all
+        tie-breakers share a rank.
+
+        Parameters:
+            - tie_breakers (list): Subset of ['points', 'ppg', 'goal_difference', 'gdpg', 'goals_scored', 'wins',
+            'head_to_head']. Defaults to ['points', 'goal_difference', 'goals_scored', 'head_to_head'].
+            'head_to_head' compares points, then goal difference, then goals scored in the matches played between
+            the tied teams only.
+            - ranking_method (str): 'competition' (1, 2, 2, 4) or 'dense' (1, 2, 2, 3)
+
+        After every `add_match` call, only the positions affected by the match are re-ranked (the teams between the
+        old and new positions of the 2 teams, widened to the groups they are tied with). With 'dense' ranking the
+        ranks of all teams below the affected positions can shift by one, so those are renumbered as well
+        (without re-sorting).
+        """
+        self.tie_breakers = tie_breakers or DEFAULT_TIE_BREAKERS
+        self.ranking_method = ranking_method
+        self.__validate_settings()
+        # Tie-breakers up to 'head_to_head' give each team a sort key of its own. The ones from 'head_to_head' onwards
+        # depend on the other teams in a tied group, and are resolved per group
+        if 'head_to_head' in self.tie_breakers:
+            idx_head_to_head = self.tie_breakers.index('head_to_head')
+            self.__key_tie_breakers = self.tie_breakers[:idx_head_to_head]
+            self.__group_tie_breakers = self.tie_breakers[idx_head_to_head:]
+        else:
+            self.__key_tie_breakers = self.tie_breakers
+            self.__group_tie_breakers = []
+        self.records = {} # Team => Dictionary of totals
+        self.head_to_head = {} # (Team, Opponent) => [Points, GoalDifference, GoalsScored] against said opponent
+        self.__sorted_entries = [] # Sorted list of (sort key, team)
+        self.order = [] # Teams in order of standing
+        self.ranks = [] # Rank of each team in `self.order`
+        self.__is_tied_with_previous = [] # Whether each team in `self.order` is level with the team above it
+        return None
+
+    def __validate_settings(self) -> None:
+        invalid_tie_breakers = [tie_breaker for tie_breaker in self.tie_breakers if tie_breaker not in TIE_BREAKERS]
+        if invalid_tie_breakers:
+            raise ValueError(f"Expected `tie_breakers` to be a subset of {TIE_BREAKERS}, but got {invalid_tie_breakers}")
+        if self.ranking_method not in RANKING_METHODS:
+            raise ValueError(f"Expected `ranking_method` to be in {RANKING_METHODS}, but got '{self.ranking_method}'")
+        return None
+
+    @classmethod
+    def from_match_facts(
+            cls,
+            data: pd.DataFrame,
+            tie_breakers: Optional[List[str]] = None,
+            ranking_method: Optional[str] = 'competition',
+        ) -> 'LeagueTable':
+        """Builds league table from DataFrame having MatchFacts data (ranks once, after adding all matches)"""
+        league_table = cls(tie_breakers=tie_breakers, ranking_method=ranking_method)
+        columns = ['HomeTeam', 'AwayTeam', 'HomeGoals', 'AwayGoals']
+        for home_team, away_team, home_goals, away_goals in data.loc[:, columns].itertuples(index=False, name=None):
+            league_table.__update_records(
+                home_team=home_team,
+                away_team=away_team,
+                home_goals=int(home_goals),
+                away_goals=int(away_goals),
+            )
+        league_table.__sorted_entries = sorted(
+            (league_table.__get_sort_key(team=team), team) for team in league_table.records
+        )
+        league_table.__rerank(start=0, end=len(league_table.__sorted_entries) - 1)
+        return league_table
+
+    def __update_records(
+            self,
+            home_team: str,
+            away_team: str,
+            home_goals: int,
+            away_goals: int,
+        ) -> None:
+        for team, goals_scored, goals_allowed, opponent in [
+                (home_team, home_goals, away_goals, away_team),
+                (away_team, away_goals, home_goals, home_team),
+            ]:
+            if team not in self.records:
+                self.records[team] = {
+                    'GamesPlayed': 0, 'Points': 0, 'GoalDifference': 0, 'Wins': 0, 'Losses': 0, 'Draws': 0,
+                    'GoalsScored': 0, 'GoalsAllowed': 0,
+                }
+            record = self.records[team]
+            is_win, is_loss = goals_scored > goals_allowed, goals_scored < goals_allowed
+            points = 3 if is_win else (0 if is_loss else 1)
+            record['GamesPlayed'] += 1
+            record['Points'] += points
+            record['GoalDifference'] += goals_scored - goals_allowed
+            record['Wins'] += int(is_win)
+            record['Losses'] += int(is_loss)
+            record['Draws'] += int(not is_win and not is_loss)
+            record['GoalsScored'] += goals_scored
+            record['GoalsAllowed'] += goals_allowed
+            head_to_head = self.head_to_head.setdefault((team, opponent), [0, 0, 0])
+            head_to_head[0] += points
+            head_to_head[1] += goals_scored - goals_allowed
+            head_to_head[2] += goals_scored
+        return None
+
+    def __get_value(self, team: str, tie_breaker: str) -> Union[int, float]:
+        record = self.records[team]
+        games_played = record['GamesPlayed'] or 1
+        if tie_breaker == 'points':
+            return record['Points']
+        if tie_breaker == 'ppg':
+            return record['Points'] / games_played
+        if tie_breaker == 'goal_difference':
+            return record['GoalDifference']
+        if tie_breaker == 'gdpg':
+            return record['GoalDifference'] / games_played
+        if tie_breaker == 'goals_scored':
+            return record['GoalsScored']
+        if tie_breaker == 'wins':
+            return record['Wins']
+        raise ValueError(f"Tie-breaker '{tie_breaker}' has no value of its own")
+
+    def __get_sort_key(self, team: str) -> Tuple[Union[int, float], ...]:
+        """Returns sort key of team (values are negated, so that sorting in ascending order puts the best team first)"""
+        return tuple(-self.__get_value(team=team, tie_breaker=tie_breaker) for tie_breaker in self.__key_tie_breakers)
+
+    def __get_group_sort_key(self, team: str, group: List[str]) -> Tuple[Union[int, float], ...]:
+        """Returns sort key of team within a group of teams that are level on all sort keys"""
+        key = []
+        for tie_breaker in self.__group_tie_breakers:
+            if tie_breaker == 'head_to_head':
+                totals = [0, 0, 0]
+                for opponent in group:
+                    for idx, value in enumerate(self.head_to_head.get((team, opponent), [0, 0, 0])):
+                        totals[idx] += value
+                key.extend(-total for total in totals)
+            else:
+                key.append(-self.__get_value(team=team, tie_breaker=tie_breaker))
+        return tuple(key)
+
+    def __get_group_bounds(self, position: int) -> Tuple[int, int]:
+        """Returns first and last positions of the entries having the same sort key as the entry at `position`"""
+        key = self.__sorted_entries[position][0]
+        start = bisect.bisect_left(self.__sorted_entries, (key,))
+        end = bisect.bisect_left(self.__sorted_entries, (key, chr(0x10FFFF))) - 1
+        return start, end
+
+    def __rerank(self, start: int, end: int) -> None:
+        """Recomputes order and ranks of positions [start, end], which must cover whole groups of tied sort keys"""
+        num_new_positions = len(self.__sorted_entries) - len(self.order)
+        if num_new_positions > 0:
+            self.order.extend([None] * num_new_positions)
+            self.ranks.extend([None] * num_new_positions)
+            self.__is_tied_with_previous.extend([False] * num_new_positions)
+        position = start
+        while position <= end:
+            _, group_end = self.__get_group_bounds(position=position)
+            group = [team for _, team in self.__sorted_entries[position : group_end + 1]]
+            if self.__group_tie_breakers and len(group) > 1:
+                keys_and_teams = sorted((self.__get_group_sort_key(team=team, group=group), team) for team in group)
+            else:
+                keys_and_teams = [((), team) for team in group]
+            for idx, (key, team) in enumerate(keys_and_teams):
+                self.order[position] = team
+                self.__is_tied_with_previous[position] = (idx > 0 and key == keys_and_teams[idx - 1][0])
+                self.ranks[position] = self.__get_rank_at(position=position)
+                position += 1
+        if self.ranking_method == 'dense':
+            # Dense ranks below the re-ranked positions depend on the number of distinct groups above them, so they
+            # are renumbered until they no longer change
+            for position in range(end + 1, len(self.order)):
+                rank = self.__get_rank_at(position=position)
+                if rank == self.ranks[position]:
+                    break
+                self.ranks[position] = rank
+        return None
+
+    def __get_rank_at(self, position: int) -> int:
+        """Returns rank at `position`, given the ranks of the positions above it"""
+        if position == 0:
+            return 1
+        if self.__is_tied_with_previous[position]:
+            return self.ranks[position - 1]
+        if self.ranking_method == 'dense':
+            return self.ranks[position - 1] + 1
+        return position + 1
+
+    def add_match(
+            self,
+            home_team: str,
+            away_team: str,
+            home_goals: int,
+            away_goals: int,
+        ) -> Tuple[int, int]:
+        """
+        Adds result of a match and re-ranks only the affected positions.
+        Returns the first and last (0-indexed) positions that were re-ranked.
+        """
+        teams = [home_team, away_team]
+        has_new_team = any(team not in self.records for team in teams)
+        # Positions (and bounds of tied groups) of both teams, before and after the match. Positions outside the span
+        # of these keep the same team
+        affected_positions = []
+        for team in teams:
+            if team in self.records:
+                position = bisect.bisect_left(self.__sorted_entries, (self.__get_sort_key(team=team), team))
+                affected_positions.extend(self.__get_group_bounds(position=position))
+        for team in teams:
+            if team in self.records:
+                position = bisect.bisect_left(self.__sorted_entries, (self.__get_sort_key(team=team), team))
+                self.__sorted_entries.pop(position)
+        self.__update_records(home_team=home_team, away_team=away_team, home_goals=home_goals, away_goals=away_goals)
+        for team in teams:
+            bisect.insort(self.__sorted_entries, (self.__get_sort_key(team=team), team))
+        for team in teams:
+            position = bisect.bisect_left(self.__sorted_entries, (self.__get_sort_key(team=team), team))
+            affected_positions.extend(self.__get_group_bounds(position=position))
+        last_position = len(self.__sorted_entries) - 1
+        start = self.__get_group_bounds(position=min(affected_positions))[0]
+        if has_new_team:
+            # Every team below a new team moves down by one position
+            end = last_position
+        else:
+            end = self.__get_group_bounds(position=min(max(affected_positions), last_position))[1]
+        self.__rerank(start=start, end=end)
+        return start, end
+
+    def get_rank(self, team: str) -> int:
+        return self.ranks[self.order.index(team)]
+
+    def as_dataframe(self) -> pd.DataFrame:
+        """Returns standings as DataFrame having the columns ['Rank', 'Team'] followed by the totals of each team"""
+        rows = []
+        for rank, team in zip(self.ranks, self.order):
+            row = {'Rank': rank, 'Team': team}
+            row.update(self.records[team])
+            rows.append(row)
+        df_standings = pd.DataFrame(data=rows)
+        return df_standings
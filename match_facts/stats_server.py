@@ -0,0 +1,385 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import traceback
+import numpy as np
+import pandas as pd
+from partial_aggregates import RESULT_COUNT_COLUMNS, SCORELINE_TOTAL_COLUMNS, PartialAggregate
+from partitions import ParticipantPartitions
+from pipeline import PARTICIPANT_TYPE_SETTINGS, PARTICIPANT_TYPES
+from time_buckets import MATCH_FACTS, RESULT_SUFFIXES, get_participant_rows
+from validators import validate_match_facts
+
+TOTAL_COLUMNS = PartialAggregate.get_total_columns()
+RESULT_CHARACTERS = np.array(['L', 'D', 'W']) # By result + 1 (-1 for a loss, 0 for a draw, 1 for a win)
+
+
+class QueryError(Exception):
+    def __init__(self, message: str, status_code: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StatsIndex:
+
+    def __init__(self, src_filepath: str) -> None:
+        """
+        Loads MatchFacts from the CSV file at `src_filepath` once, and keeps the following in memory:
+            - Scoreline stats and MatchFacts stats tables by participant type (indexed by participant)
+            - Participant index i.e; row positions of the matches played by each participant (by participant type)
+            - Cumulative totals (see `partial_aggregates.PartialAggregate`) of the matches played by each participant,
+            in ascending order of timestamp (by participant type), so that the stats over a time window are the
+            difference of 2 prefix sums
+        """
+        self.src_filepath = src_filepath
+        self.modified_time = os.path.getmtime(src_filepath)
+        df_match_facts = pd.read_csv(src_filepath)
+        validate_match_facts(df_match_facts=df_match_facts)
+        self.df_match_facts = df_match_facts.sort_values(by='Timestamp', ascending=True, ignore_index=True)
+        self.home_participants = {}
+        self.away_participants = {}
+        self.participant_index = {}
+        self.scoreline_stats = {}
+        self.match_facts_stats = {}
+        self.cumulative_totals = {}
+        for participant_type in PARTICIPANT_TYPES:
+            settings = PARTICIPANT_TYPE_SETTINGS[participant_type]
+            home_participants, away_participants = self.__get_participant_columns(participant_type=participant_type)
+            self.home_participants[participant_type] = home_participants
+            self.away_participants[participant_type] = away_participants
+            self.participant_index[participant_type] = self.__get_participant_index(
+                home_participants=home_participants,
+                away_participants=away_participants,
+            )
+            partitions = ParticipantPartitions(df_match_facts=self.df_match_facts, participant_type=participant_type)
+            self.scoreline_stats[participant_type] = settings['scoreline_stats_func'](
+                data=self.df_match_facts,
+                partitions=partitions,
+            ).set_index('Team', drop=False)
+            self.match_facts_stats[participant_type] = settings['match_facts_stats_func'](
+                data=self.df_match_facts,
+                partitions=partitions,
+            ).set_index('Team', drop=False)
+            self.cumulative_totals[participant_type] = self.__get_cumulative_totals(participant_type=participant_type)
+        return None
+
+    def __get_participant_columns(self, participant_type: str) -> Tuple[np.ndarray, np.ndarray]:
+        df_mf = self.df_match_facts
+        if participant_type == 'team':
+            return df_mf['HomeTeam'].values, df_mf['AwayTeam'].values
+        if participant_type == 'player':
+            return df_mf['HomePlayer'].values, df_mf['AwayPlayer'].values
+        return (
+            (df_mf['HomePlayer'] + '|' + df_mf['HomeTeam']).values,
+            (df_mf['AwayPlayer'] + '|' + df_mf['AwayTeam']).values,
+        )
+
+    def __get_participant_index(
+            self,
+            home_participants: np.ndarray,
+            away_participants: np.ndarray,
+        ) -> Dict[str, np.ndarray]:
+        """Returns dictionary having keys = participant, and values = sorted row positions of matches played"""
+        positions = np.arange(len(home_participants))
+        df_positions = pd.DataFrame(data={
+            'Participant': np.concatenate([home_participants, away_participants]),
+            'Position': np.concatenate([positions, positions]),
+        })
+        participant_index = {
+            participant: np.sort(df_group['Position'].values)
+            for participant, df_group in df_positions.groupby('Participant', sort=True)
+        }
+        return participant_index
+
+    def __get_cumulative_totals(self, participant_type: str) -> Dict[str, Tuple[np.ndarray, np.ndarray, str]]:
+        """
+        Returns dictionary having keys = participant, and values = tuple of (timestamps of the matches played, cumulative
+        totals, results-string). Row `i` of the cumulative totals has the totals of the first `i` matches played (row 0
+        is all zeros), so the totals of the matches [i, j) are `cumulative_totals[j] - cumulative_totals[i]`.
+        """
+        df_rows = get_participant_rows(data=self.df_match_facts, participant_type=participant_type)
+        # Rows are in the order of the matches, with the home side before the away side
+        row_totals = PartialAggregate.get_row_totals(df_rows=df_rows).loc[:, TOTAL_COLUMNS].to_numpy(dtype=float)
+        row_totals = np.nan_to_num(row_totals).reshape(len(self.df_match_facts), 2, len(TOTAL_COLUMNS))
+        row_results = RESULT_CHARACTERS[df_rows['Result'].to_numpy(dtype=int) + 1].reshape(len(self.df_match_facts), 2)
+        timestamps = self.df_match_facts['Timestamp'].values
+        home_participants = self.home_participants[participant_type]
+        cumulative_totals = {}
+        for participant, positions in self.participant_index[participant_type].items():
+            sides = (home_participants[positions] != participant).astype(int) # 0 for home, 1 for away
+            totals = np.zeros(shape=(len(positions) + 1, len(TOTAL_COLUMNS)))
+            np.cumsum(row_totals[positions, sides], axis=0, out=totals[1:])
+            cumulative_totals[participant] = (timestamps[positions], totals, ''.join(row_results[positions, sides]))
+        return cumulative_totals
+
+    def get_participants(self, participant_type: str) -> List[str]:
+        return list(self.participant_index[participant_type].keys())
+
+    def get_positions(self, participant_type: str, participant: str) -> np.ndarray:
+        positions = self.participant_index[participant_type].get(participant)
+        if positions is None:
+            raise QueryError(f"Unknown {participant_type} '{participant}'", status_code=404)
+        return positions
+
+    def filter_by_time_window(
+            self,
+            positions: np.ndarray,
+            start: Optional[int] = None,
+            end: Optional[int] = None,
+        ) -> np.ndarray:
+        """Keeps only the positions of matches having `start` <= Timestamp <= `end` (both inclusive)"""
+        timestamps = self.df_match_facts['Timestamp'].values[positions]
+        is_in_window = np.ones(len(positions), dtype=bool)
+        if start is not None:
+            is_in_window &= (timestamps >= start)
+        if end is not None:
+            is_in_window &= (timestamps <= end)
+        return positions[is_in_window]
+
+    def __get_stats_from_totals(self, participant: str, totals: np.ndarray, results_string: str) -> Dict[str, Any]:
+        """
+        Returns scoreline stats and MatchFacts stats of `participant` from the totals of some of its matches. Same
+        values as `PartialAggregate.get_scoreline_stats`/`get_match_facts_stats`, but computed without DataFrames, as
+        they are for one participant only.
+        """
+        dict_totals = dict(zip(TOTAL_COLUMNS, totals.tolist()))
+        counts = {column: int(round(dict_totals[column])) for column in SCORELINE_TOTAL_COLUMNS}
+        games_played = counts['GamesPlayed']
+        scoreline_stats = {
+            'Team': participant,
+            'GamesPlayed': games_played,
+            'Points': 3 * counts['Wins'] + counts['Draws'],
+            'GoalDifference': counts['GoalsScored'] - counts['GoalsAllowed'],
+            **{column: counts[column] for column in SCORELINE_TOTAL_COLUMNS[1:]},
+            'ResultsString': results_string,
+        }
+        averages = {f"Avg{match_fact}": dict_totals[f"Sum{match_fact}"] / games_played for match_fact in MATCH_FACTS}
+        for match_fact in MATCH_FACTS:
+            for result, suffix in RESULT_SUFFIXES.items():
+                result_count = counts[RESULT_COUNT_COLUMNS[result]]
+                averages[f"Avg{match_fact}{suffix}"] = dict_totals[f"Sum{match_fact}{suffix}"] / result_count if result_count else None
+        match_facts_stats = {
+            'Team': participant,
+            'GamesPlayed': games_played,
+            **{key: None if value is None else float(np.round(value, 2)) for key, value in averages.items()},
+        }
+        return {'scoreline_stats': scoreline_stats, 'match_facts_stats': match_facts_stats}
+
+    def get_stats(
+            self,
+            participant_type: str,
+            participant: str,
+            start: Optional[int] = None,
+            end: Optional[int] = None,
+        ) -> Dict[str, Any]:
+        """
+        Returns scoreline stats and MatchFacts stats of a participant. Uses the precomputed tables, unless a time
+        window is given (in which case the stats are computed from the cumulative totals at both ends of the window)
+        """
+        self.get_positions(participant_type=participant_type, participant=participant) # Raises if unknown
+        if start is None and end is None:
+            return {
+                'scoreline_stats': to_records(data=self.scoreline_stats[participant_type].loc[[participant]])[0],
+                'match_facts_stats': to_records(data=self.match_facts_stats[participant_type].loc[[participant]])[0],
+            }
+        timestamps, cumulative_totals, results_string = self.cumulative_totals[participant_type][participant]
+        window_start = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        window_end = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        if window_start >= window_end:
+            return {'scoreline_stats': None, 'match_facts_stats': None}
+        return self.__get_stats_from_totals(
+            participant=participant,
+            totals=cumulative_totals[window_end] - cumulative_totals[window_start],
+            results_string=results_string[window_start:window_end],
+        )
+
+    def get_matchup_stats(
+            self,
+            participant_type: str,
+            participants: List[str],
+            start: Optional[int] = None,
+            end: Optional[int] = None,
+        ) -> Dict[str, Any]:
+        """Returns stats of both participants over the matches played between them (optionally within a time window)"""
+        participant1, participant2 = participants
+        positions1 = self.get_positions(participant_type=participant_type, participant=participant1)
+        positions2 = self.get_positions(participant_type=participant_type, participant=participant2)
+        positions = np.intersect1d(positions1, positions2, assume_unique=True)
+        positions = self.filter_by_time_window(positions=positions, start=start, end=end)
+        dict_matchup_stats = {'games_played': int(len(positions))}
+        for participant, participant_positions in zip(participants, [positions1, positions2]):
+            if len(positions) == 0:
+                dict_matchup_stats[participant] = {'scoreline_stats': None, 'match_facts_stats': None}
+                continue
+            _, cumulative_totals, results_string = self.cumulative_totals[participant_type][participant]
+            # Indices of the matchups among the participant's matches. The totals of match `i` are the difference of
+            # the cumulative totals at `i + 1` and `i`
+            indices = np.searchsorted(participant_positions, positions)
+            dict_matchup_stats[participant] = self.__get_stats_from_totals(
+                participant=participant,
+                totals=(cumulative_totals[indices + 1] - cumulative_totals[indices]).sum(axis=0),
+                results_string=''.join(results_string[index] for index in indices),
+            )
+        return dict_matchup_stats
+
+
+def to_records(data: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Converts DataFrame to list of JSON-serializable records (NaNs become None)"""
+    return json.loads(data.to_json(orient='records'))
+
+
+class StatsServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True # `http.server.ThreadingHTTPServer` (the same) needs Python 3.7+
+
+    def __init__(
+            self,
+            src_filepath: str,
+            host: Optional[str] = '127.0.0.1',
+            port: Optional[int] = 8000,
+            reload_interval_in_secs: Optional[float] = 2,
+        ) -> None:
+        """
+        HTTP/JSON server answering stats queries from a `StatsIndex` kept in memory.
+        Reloads the index in a background thread when the MatchFacts file changes (checked every
+        `reload_interval_in_secs` seconds). Queries keep being answered by the old index while the new one is built.
+
+        Endpoints (all GET, all query parameters are strings):
+            - /participants?type=team
+            - /stats?type=team&name=Liverpool[&start=20210101000000][&end=20211231235959]
+            - /matchup?type=team&name=Liverpool&name=Inter[&start=...][&end=...]
+        `type` is one of ['team', 'player', 'combo'], and combos are named as "Player|Team".
+        """
+        self.stats_index = StatsIndex(src_filepath=src_filepath)
+        self.reload_interval_in_secs = reload_interval_in_secs
+        self.__stop_reloading = threading.Event()
+        super().__init__((host, port), StatsRequestHandler)
+        self.reloader_thread = threading.Thread(target=self.__reload_when_modified, daemon=True)
+        self.reloader_thread.start()
+        return None
+
+    def __reload_when_modified(self) -> None:
+        while not self.__stop_reloading.wait(timeout=self.reload_interval_in_secs):
+            src_filepath = self.stats_index.src_filepath
+            try:
+                if os.path.getmtime(src_filepath) == self.stats_index.modified_time:
+                    continue
+                self.stats_index = StatsIndex(src_filepath=src_filepath)
+                print(f"Reloaded MatchFacts from '{src_filepath}'")
+            except Exception as error:
+                # Keep serving the old index if the file is missing/half-written/invalid
+                print(f"Could not reload MatchFacts from '{src_filepath}': {error!r}")
+        return None
+
+    def server_close(self) -> None:
+        self.__stop_reloading.set()
+        super().server_close()
+        return None
+
+
+class StatsRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query_params = parse_qs(url.query)
+        routes = {
+            '/participants': self.__get_participants,
+            '/stats': self.__get_stats,
+            '/matchup': self.__get_matchup,
+        }
+        try:
+            if url.path not in routes:
+                raise QueryError(f"Unknown endpoint '{url.path}'", status_code=404)
+            # Use one index for the whole request, even if a reload swaps it in the meantime
+            response = routes[url.path](stats_index=self.server.stats_index, query_params=query_params)
+            self.__send_json(response=response, status_code=200)
+        except QueryError as error:
+            self.__send_json(response={'error': str(error)}, status_code=error.status_code)
+        except Exception as error:
+            self.log_error("Error handling %s: %r", self.path, error)
+            traceback.print_exc()
+            self.__send_json(response={'error': f"Internal server error ({type(error).__name__})"}, status_code=500)
+        return None
+
+    def __send_json(self, response: Any, status_code: int) -> None:
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return None
+
+    def __get_param(self, query_params: Dict[str, List[str]], name: str, required: bool) -> Optional[str]:
+        values = query_params.get(name)
+        if not values:
+            if required:
+                raise QueryError(f"Missing query parameter '{name}'", status_code=400)
+            return None
+        return values[0]
+
+    def __get_participant_type(self, query_params: Dict[str, List[str]]) -> str:
+        participant_type = self.__get_param(query_params=query_params, name='type', required=True)
+        if participant_type not in PARTICIPANT_TYPES:
+            raise QueryError(f"Expected `type` to be in {PARTICIPANT_TYPES}, but got '{participant_type}'", status_code=400)
+        return participant_type
+
+    def __get_time_window(self, query_params: Dict[str, List[str]]) -> Tuple[Optional[int], Optional[int]]:
+        time_window = []
+        for name in ['start', 'end']:
+            value = self.__get_param(query_params=query_params, name=name, required=False)
+            if value is not None and not value.isdigit():
+                raise QueryError(f"Expected `{name}` to be a timestamp like 20210606190918, but got '{value}'", status_code=400)
+            time_window.append(int(value) if value is not None else None)
+        return tuple(time_window)
+
+    def __get_participants(self, stats_index: StatsIndex, query_params: Dict[str, List[str]]) -> List[str]:
+        participant_type = self.__get_participant_type(query_params=query_params)
+        return stats_index.get_participants(participant_type=participant_type)
+
+    def __get_stats(self, stats_index: StatsIndex, query_params: Dict[str, List[str]]) -> Dict[str, Any]:
+        participant_type = self.__get_participant_type(query_params=query_params)
+        participant = self.__get_param(query_params=query_params, name='name', required=True)
+        start, end = self.__get_time_window(query_params=query_params)
+        return stats_index.get_stats(participant_type=participant_type, participant=participant, start=start, end=end)
+
+    def __get_matchup(self, stats_index: StatsIndex, query_params: Dict[str, List[str]]) -> Dict[str, Any]:
+        participant_type = self.__get_participant_type(query_params=query_params)
+        participants = query_params.get('name', [])
+        if len(participants) != 2 or participants[0] == participants[1]:
+            raise QueryError("Expected query parameter 'name' to be given twice, with 2 different names", status_code=400)
+        start, end = self.__get_time_window(query_params=query_params)
+        return stats_index.get_matchup_stats(
+            participant_type=participant_type,
+            participants=participants,
+            start=start,
+            end=end,
+        )
+
+
+def serve(
+        src_filepath: str,
+        host: Optional[str] = '127.0.0.1',
+        port: Optional[int] = 8000,
+    ) -> None:
+    server = StatsServer(src_filepath=src_filepath, host=host, port=port)
+    print(f"Serving stats from '{src_filepath}' at http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return None
+
+
+if __name__ == "__main__":
+    # Usage: python stats_server.py <filepath-to-match-facts-csv> [<port>]
+    serve(
+        src_filepath=sys.argv[1],
+        port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000,
+    )
@@ -0,0 +1,98 @@
+import os
+import random
+import sys
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+import dedup_index
+from dedup_index import INITIAL_CAPACITY, MatchDedupIndex, get_match_keys
+from fake_data_generator import generate_fake_match_facts
+
+
+def get_random_keys(rng: np.random.Generator, how_many: int, max_key: int) -> np.ndarray:
+    """Returns random keys (with repeats, when `max_key` is small)"""
+    return rng.integers(low=1, high=max_key, size=how_many, dtype=np.uint64)
+
+
+def test_add_and_contains_against_set() -> None:
+    """Baseline: Python set of the keys"""
+    rng = np.random.default_rng(seed=7)
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = os.path.join(folder, 'index.npy')
+        keys_added = set()
+        for batch_number in range(20):
+            index = MatchDedupIndex(filepath=filepath) # Reloaded every batch, so saved slots are read back
+            keys = get_random_keys(rng=rng, how_many=int(rng.integers(1, 400)), max_key=5000)
+            expected_is_new = []
+            seen_in_batch = set()
+            for key in keys.tolist():
+                expected_is_new.append(key not in keys_added and key not in seen_in_batch)
+                seen_in_batch.add(key)
+            assert index.add(keys=keys).tolist() == expected_is_new
+            keys_added |= seen_in_batch
+            index.save()
+            probes = get_random_keys(rng=rng, how_many=500, max_key=5000)
+            assert index.contains(keys=probes).tolist() == [key in keys_added for key in probes.tolist()]
+            assert len(index) == len(keys_added)
+        assert len(MatchDedupIndex(filepath=filepath).slots) > INITIAL_CAPACITY # Resized along the way
+    return None
+
+
+def test_filter_new_matches_against_drop_duplicates() -> None:
+    """Baseline: `DataFrame.drop_duplicates` on the identifying columns"""
+    random.seed(11)
+    df_match_facts = generate_fake_match_facts(num_records=200)
+    df_data = pd.concat(objs=[df_match_facts.iloc[:120], df_match_facts.iloc[80:], df_match_facts.iloc[:5]], ignore_index=True)
+    index = MatchDedupIndex()
+    df_new, df_duplicates = index.filter_new_matches(data=df_data.iloc[:120])
+    df_new_2, df_duplicates_2 = index.filter_new_matches(data=df_data.iloc[120:])
+    df_expected = df_data.drop_duplicates(subset=dedup_index.MATCH_KEY_COLUMNS)
+    pd.testing.assert_frame_equal(pd.concat(objs=[df_new, df_new_2]), df_expected)
+    assert len(df_duplicates) + len(df_duplicates_2) == len(df_data) - len(df_expected)
+    assert len(index) == len(np.unique(get_match_keys(data=df_data)))
+    return None
+
+
+def test_torn_in_place_save_is_completed() -> None:
+    """The in-place save is cut short after the journal was written, leaving old slots with the new number of keys"""
+    rng = np.random.default_rng(seed=3)
+    keys_before = np.unique(get_random_keys(rng=rng, how_many=200, max_key=2**63))
+    keys_after = np.unique(get_random_keys(rng=rng, how_many=50, max_key=2**63))
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = os.path.join(folder, 'index.npy')
+        index = MatchDedupIndex(filepath=filepath)
+        index.add(keys=keys_before)
+        index.save()
+        table_before = np.load(filepath)
+        index = MatchDedupIndex(filepath=filepath)
+        index.add(keys=keys_after)
+        index.generation = 1
+        with mock.patch.object(dedup_index.os, 'remove', side_effect=RuntimeError("Simulated crash")):
+            try:
+                index.save()
+            except RuntimeError:
+                pass
+        assert os.path.isfile(f"{filepath}.journal")
+        # Torn write: the trailer reached the disk, but none of the slots did
+        table = np.load(filepath, mmap_mode='r+')
+        table[:-2] = table_before[:-2]
+        table.flush()
+        del table
+
+        index = MatchDedupIndex(filepath=filepath)
+        assert not os.path.isfile(f"{filepath}.journal")
+        assert (index.generation, len(index)) == (1, len(keys_before) + len(keys_after))
+        assert index.contains(keys=np.concatenate([keys_before, keys_after])).all()
+        assert int(np.count_nonzero(index.slots)) == len(index)
+    return None
+
+
+if __name__ == "__main__":
+    test_add_and_contains_against_set()
+    test_filter_new_matches_against_drop_duplicates()
+    test_torn_in_place_save_is_completed()
+    print("All tests passed")
@@ -0,0 +1,139 @@
+import os
+import random
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from elo import PARTICIPANT_TYPES, EloRatings, get_goal_difference_multiplier
+from fake_data_generator import generate_fake_match_facts
+
+
+def get_expected_ratings(
+        data: pd.DataFrame,
+        participant_type: str,
+        k_factor: float,
+        home_advantage: float,
+        use_goal_difference: bool,
+    ) -> dict:
+    """
+    Baseline: the textbook Elo update, applied match by match to a dictionary of ratings.
+    Returns dictionary having keys = participant, and values = list of ratings after each of their matches.
+    """
+    ratings = {}
+    for row in data.sort_values(by='Timestamp', kind='mergesort').itertuples(index=False):
+        if participant_type == 'team':
+            home, away = row.HomeTeam, row.AwayTeam
+        elif participant_type == 'player':
+            home, away = row.HomePlayer, row.AwayPlayer
+        else:
+            home, away = f"{row.HomePlayer}|{row.HomeTeam}", f"{row.AwayPlayer}|{row.AwayTeam}"
+        home_rating = ratings.setdefault(home, [1500.0])[-1]
+        away_rating = ratings.setdefault(away, [1500.0])[-1]
+        if row.HomeGoals > row.AwayGoals:
+            home_score = 1.0
+        elif row.HomeGoals < row.AwayGoals:
+            home_score = 0.0
+        else:
+            home_score = 0.5
+        goal_difference = abs(row.HomeGoals - row.AwayGoals)
+        multiplier = 1.0
+        if use_goal_difference and goal_difference == 2:
+            multiplier = 1.5
+        elif use_goal_difference and goal_difference > 2:
+            multiplier = (11 + goal_difference) / 8
+        expected_home_score = 1 / (1 + 10 ** ((away_rating - home_rating - home_advantage) / 400))
+        change = k_factor * multiplier * (home_score - expected_home_score)
+        ratings[home].append(home_rating + change)
+        ratings[away].append(away_rating - change)
+    return {participant: ratings_after[1:] for participant, ratings_after in ratings.items()}
+
+
+def assert_ratings_equal(elo: EloRatings, dict_expected: dict, participant_type: str) -> None:
+    df_ratings = elo.get_ratings(participant_type=participant_type)
+    assert sorted(df_ratings['Participant']) == sorted(dict_expected)
+    assert df_ratings['Rank'].tolist() == list(range(1, len(df_ratings) + 1))
+    assert df_ratings['Rating'].is_monotonic_decreasing
+    for row in df_ratings.itertuples(index=False):
+        expected_ratings = dict_expected[row.Participant]
+        assert abs(row.Rating - expected_ratings[-1]) <= 0.005 + 1e-9, (participant_type, row.Participant)
+        assert row.GamesPlayed == len(expected_ratings)
+    return None
+
+
+def test_goal_difference_multiplier() -> None:
+    multiplier = get_goal_difference_multiplier(goal_difference=np.array([0, 1, -1, 2, -2, 3, -5, 10]))
+    assert multiplier.tolist() == [1.0, 1.0, 1.0, 1.5, 1.5, 14 / 8, 16 / 8, 21 / 8]
+    return None
+
+
+def test_from_match_facts_against_direct_computation() -> None:
+    random.seed(21)
+    df_match_facts = generate_fake_match_facts(num_records=400)
+    for k_factor, home_advantage, use_goal_difference in [(20, 0, True), (32, 65, False)]:
+        elo = EloRatings.from_match_facts(
+            data=df_match_facts,
+            k_factor=k_factor,
+            home_advantage=home_advantage,
+            use_goal_difference=use_goal_difference,
+        )
+        for participant_type in PARTICIPANT_TYPES:
+            dict_expected = get_expected_ratings(
+                data=df_match_facts,
+                participant_type=participant_type,
+                k_factor=k_factor,
+                home_advantage=home_advantage,
+                use_goal_difference=use_goal_difference,
+            )
+            assert_ratings_equal(elo=elo, dict_expected=dict_expected, participant_type=participant_type)
+            for participant in list(dict_expected)[:5]:
+                df_trajectory = elo.get_trajectory(participant_type=participant_type, participant=participant)
+                assert df_trajectory['Timestamp'].is_monotonic_increasing
+                assert np.allclose(df_trajectory['Rating'], dict_expected[participant], atol=1e-3) # Stored as float32
+    return None
+
+
+def test_add_match_against_from_match_facts() -> None:
+    """Adding matches one at a time gives the same ratings and trajectories as rating the whole history at once"""
+    random.seed(22)
+    df_match_facts = generate_fake_match_facts(num_records=300).sort_values(by='Timestamp', kind='mergesort')
+    elo_full = EloRatings.from_match_facts(data=df_match_facts, home_advantage=50)
+    elo = EloRatings(home_advantage=50)
+    for row in df_match_facts.itertuples(index=False):
+        elo.add_match(
+            timestamp=row.Timestamp,
+            home_player=row.HomePlayer,
+            away_player=row.AwayPlayer,
+            home_team=row.HomeTeam,
+            away_team=row.AwayTeam,
+            home_goals=row.HomeGoals,
+            away_goals=row.AwayGoals,
+        )
+    for participant_type in PARTICIPANT_TYPES:
+        df_ratings = elo.get_ratings(participant_type=participant_type)
+        df_ratings_full = elo_full.get_ratings(participant_type=participant_type)
+        pd.testing.assert_frame_equal(df_ratings, df_ratings_full)
+        participant = df_ratings['Participant'].iloc[0]
+        pd.testing.assert_frame_equal(
+            elo.get_trajectory(participant_type=participant_type, participant=participant),
+            elo_full.get_trajectory(participant_type=participant_type, participant=participant),
+        )
+    return None
+
+
+def test_unknown_participant() -> None:
+    elo = EloRatings()
+    try:
+        elo.get_trajectory(participant_type='team', participant='Nobody')
+    except ValueError:
+        return None
+    raise AssertionError("Expected ValueError for an unknown participant")
+
+
+if __name__ == "__main__":
+    test_goal_difference_multiplier()
+    test_from_match_facts_against_direct_computation()
+    test_add_match_against_from_match_facts()
+    test_unknown_participant()
+    print("All tests passed")
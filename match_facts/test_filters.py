@@ -0,0 +1,123 @@
+import os
+import random
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from fake_data_generator import generate_fake_match_facts
+import filters
+from filters import RESULTS, MatchFactsQuery
+
+
+def get_match_facts_with_shuffled_index(num_records: int, seed: int) -> pd.DataFrame:
+    """Index labels are shuffled, to check that the labels (not positions) of the original rows are kept"""
+    random.seed(seed)
+    df_match_facts = generate_fake_match_facts(num_records=num_records)
+    df_match_facts.index = random.sample(range(10 * num_records), num_records)
+    return df_match_facts
+
+
+def get_result_mask(data: pd.DataFrame, home_column: str, away_column: str, participant: str, result: str) -> pd.Series:
+    """Baseline: result of the participant in every match, computed with pandas"""
+    home_goal_margin = data['HomeGoals'] - data['AwayGoals']
+    goal_margin = home_goal_margin.where(data[home_column] == participant, -home_goal_margin)
+    is_playing = (data[home_column] == participant) | (data[away_column] == participant)
+    if result == 'win':
+        return is_playing & (goal_margin > 0)
+    if result == 'loss':
+        return is_playing & (goal_margin < 0)
+    return is_playing & (goal_margin == 0)
+
+
+def test_chained_predicates_against_boolean_masks() -> None:
+    """Baseline: one boolean mask over all rows, combining the conditions of the chained predicates"""
+    df_mf = get_match_facts_with_shuffled_index(num_records=800, seed=51)
+    teams = sorted(set(df_mf['HomeTeam']))[:5]
+    players = sorted(set(df_mf['HomePlayer']))[:3]
+    for team in teams:
+        for result in RESULTS:
+            for start_timestamp, end_timestamp in [(None, None), (20050101000000, None), (20030101000000, 20150101000000)]:
+                query = MatchFactsQuery(df_match_facts=df_mf).team_result(team=team, result=result)
+                query = query.date_range(start_timestamp=start_timestamp, end_timestamp=end_timestamp)
+                query = query.where(lambda get: get('HomeGoals') + get('AwayGoals') >= 2)
+                mask = get_result_mask(data=df_mf, home_column='HomeTeam', away_column='AwayTeam', participant=team, result=result)
+                mask &= df_mf['Timestamp'].between(start_timestamp or 0, end_timestamp or 99991231235959)
+                mask &= (df_mf['HomeGoals'] + df_mf['AwayGoals'] >= 2)
+                pd.testing.assert_frame_equal(query.execute(), df_mf[mask])
+                assert query.count() == int(mask.sum())
+    for player in players:
+        for result in RESULTS:
+            query = MatchFactsQuery(df_match_facts=df_mf).player(player=player).player_result(player=player, result=result)
+            mask = get_result_mask(data=df_mf, home_column='HomePlayer', away_column='AwayPlayer', participant=player, result=result)
+            pd.testing.assert_frame_equal(query.execute(), df_mf[mask])
+        team = df_mf.loc[df_mf['HomePlayer'] == player, 'HomeTeam'].iloc[0]
+        query = MatchFactsQuery(df_match_facts=df_mf).player_and_team_combo(player=player, team=team)
+        mask = (
+            ((df_mf['HomePlayer'] == player) & (df_mf['HomeTeam'] == team))
+            | ((df_mf['AwayPlayer'] == player) & (df_mf['AwayTeam'] == team))
+        )
+        pd.testing.assert_frame_equal(query.execute(), df_mf[mask])
+    pd.testing.assert_frame_equal(MatchFactsQuery(df_match_facts=df_mf).execute(), df_mf)
+    return None
+
+
+def test_matchups_against_boolean_masks() -> None:
+    df_mf = get_match_facts_with_shuffled_index(num_records=1500, seed=52)
+    teams = sorted(set(df_mf['HomeTeam']))
+    players = sorted(set(df_mf['HomePlayer']))
+    for team1, team2 in zip(teams[:6], teams[6:12]):
+        mask = (
+            ((df_mf['HomeTeam'] == team1) & (df_mf['AwayTeam'] == team2))
+            | ((df_mf['HomeTeam'] == team2) & (df_mf['AwayTeam'] == team1))
+        )
+        pd.testing.assert_frame_equal(MatchFactsQuery(df_match_facts=df_mf).team_matchup(matchup=[team1, team2]).execute(), df_mf[mask])
+        pd.testing.assert_frame_equal(filters.filter_by_team_matchup(df_match_facts=df_mf, matchup=[team1, team2]), df_mf[mask])
+    for player1, player2 in zip(players[:3], players[3:6]):
+        mask = (
+            ((df_mf['HomePlayer'] == player1) & (df_mf['AwayPlayer'] == player2))
+            | ((df_mf['HomePlayer'] == player2) & (df_mf['AwayPlayer'] == player1))
+        )
+        pd.testing.assert_frame_equal(filters.filter_by_player_matchup(df_match_facts=df_mf, matchup=[player1, player2]), df_mf[mask])
+    return None
+
+
+def test_filter_functions_against_boolean_masks() -> None:
+    df_mf = get_match_facts_with_shuffled_index(num_records=500, seed=53)
+    team = df_mf['HomeTeam'].iloc[0]
+    player = df_mf['AwayPlayer'].iloc[0]
+    is_team = (df_mf['HomeTeam'] == team) | (df_mf['AwayTeam'] == team)
+    is_player = (df_mf['HomePlayer'] == player) | (df_mf['AwayPlayer'] == player)
+    pd.testing.assert_frame_equal(filters.filter_by_team(df_match_facts=df_mf, team=team), df_mf[is_team])
+    pd.testing.assert_frame_equal(filters.filter_by_player(df_match_facts=df_mf, player=player), df_mf[is_player])
+    for result in RESULTS:
+        mask = get_result_mask(data=df_mf, home_column='HomeTeam', away_column='AwayTeam', participant=team, result=result)
+        pd.testing.assert_frame_equal(filters.filter_by_team_result(data=df_mf, team=team, result=result), df_mf[mask])
+        mask = get_result_mask(data=df_mf, home_column='HomePlayer', away_column='AwayPlayer', participant=player, result=result)
+        pd.testing.assert_frame_equal(filters.filter_by_player_result(data=df_mf, player=player, result=result), df_mf[mask])
+    query = MatchFactsQuery(df_match_facts=df_mf).team(team='No such team').where(lambda get: get('NoSuchColumn') > 0)
+    assert query.execute().empty # Predicates after an empty result are skipped
+    return None
+
+
+def test_invalid_arguments() -> None:
+    for add_predicate in [
+            lambda query: query.team_result(team='Inter', result='victory'),
+            lambda query: query.player_result(player='Messi', result='lose'),
+            lambda query: query.team_matchup(matchup=['Inter']),
+            lambda query: query.player_matchup(matchup=['A', 'B', 'C']),
+        ]:
+        try:
+            add_predicate(MatchFactsQuery(df_match_facts=pd.DataFrame()))
+        except ValueError:
+            continue
+        raise AssertionError("Expected ValueError")
+    return None
+
+
+if __name__ == "__main__":
+    test_chained_predicates_against_boolean_masks()
+    test_matchups_against_boolean_masks()
+    test_filter_functions_against_boolean_masks()
+    test_invalid_arguments()
+    print("All tests passed")
@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+import tempfile
+from unittest import mock
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from dedup_index import MATCH_KEY_COLUMNS, MatchDedupIndex
+from fake_data_generator import generate_fake_match_facts
+from match_store import PartitionedMatchStore
+import output_sinks
+
+
+def get_batches() -> list:
+    """Returns 2 batches of fake MatchFacts, the second one repeating a part of the first one"""
+    random.seed(42)
+    df_match_facts = generate_fake_match_facts(num_records=300)
+    df_first = df_match_facts.iloc[:200].reset_index(drop=True)
+    df_second = pd.concat(objs=[df_match_facts.iloc[150:], df_match_facts.iloc[150:160]], ignore_index=True)
+    return [df_first, df_second]
+
+
+def get_expected_matches(batches: list) -> pd.DataFrame:
+    """Baseline: matches of all batches (first occurrence of every match), in ascending order of timestamp"""
+    df_expected = pd.concat(objs=batches, ignore_index=True).drop_duplicates(subset=MATCH_KEY_COLUMNS)
+    return df_expected.sort_values(by='Timestamp', kind='mergesort', ignore_index=True)
+
+
+def assert_store_has(root_folder: str, df_expected: pd.DataFrame) -> None:
+    df_stored = PartitionedMatchStore(root_folder=root_folder).read()
+    pd.testing.assert_frame_equal(df_stored, df_expected.loc[:, df_stored.columns], check_dtype=False)
+    return None
+
+
+def test_append_and_read() -> None:
+    batches = get_batches()
+    with tempfile.TemporaryDirectory() as root_folder:
+        match_store = PartitionedMatchStore(root_folder=root_folder)
+        for df_batch in batches:
+            match_store.append(data=df_batch)
+        assert len(match_store.duplicates) == 60
+        df_expected = get_expected_matches(batches=batches)
+        assert_store_has(root_folder=root_folder, df_expected=df_expected)
+        start_timestamp, end_timestamp = 20050315000000, 20120701000000
+        df_range = PartitionedMatchStore(root_folder=root_folder).read(
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+        )
+        df_expected_range = df_expected[df_expected['Timestamp'].between(start_timestamp, end_timestamp)]
+        pd.testing.assert_frame_equal(
+            df_range, df_expected_range.loc[:, df_range.columns].reset_index(drop=True), check_dtype=False,
+        )
+        assert match_store.get_summary()['num_rows'] == len(df_expected)
+    return None
+
+
+def test_failed_dedup_index_save_is_recovered() -> None:
+    """The append fails after the metadata was written, but before the dedup index was saved"""
+    batches = get_batches()
+    with tempfile.TemporaryDirectory() as root_folder:
+        PartitionedMatchStore(root_folder=root_folder).append(data=batches[0])
+        with mock.patch.object(MatchDedupIndex, 'save', side_effect=RuntimeError("Simulated crash")):
+            try:
+                PartitionedMatchStore(root_folder=root_folder).append(data=batches[1])
+            except RuntimeError:
+                pass
+        df_expected = get_expected_matches(batches=batches)
+        assert_store_has(root_folder=root_folder, df_expected=df_expected) # Nothing lost
+        match_store = PartitionedMatchStore(root_folder=root_folder)
+        assert len(match_store.get_dedup_index()) == len(df_expected) # Rebuilt, as its generation is behind
+        match_store.append(data=batches[1]) # Retry
+        assert len(match_store.duplicates) == len(batches[1])
+        assert_store_has(root_folder=root_folder, df_expected=df_expected)
+    return None
+
+
+def test_failed_partition_write_leaves_store_unchanged() -> None:
+    """The append fails after some of the partitions were written"""
+    batches = get_batches()
+    write_atomically = output_sinks.write_atomically
+    calls = []
+    def write_atomically_then_crash(filepath: str, writer) -> None:
+        calls.append(filepath)
+        if len(calls) == 3:
+            raise RuntimeError("Simulated crash")
+        return write_atomically(filepath=filepath, writer=writer)
+
+    with tempfile.TemporaryDirectory() as root_folder:
+        PartitionedMatchStore(root_folder=root_folder).append(data=batches[0])
+        with mock.patch.object(output_sinks, 'write_atomically', side_effect=write_atomically_then_crash):
+            try:
+                PartitionedMatchStore(root_folder=root_folder).append(data=batches[1])
+            except RuntimeError:
+                pass
+        assert_store_has(root_folder=root_folder, df_expected=get_expected_matches(batches=batches[:1]))
+        PartitionedMatchStore(root_folder=root_folder).append(data=batches[1]) # Retry
+        assert_store_has(root_folder=root_folder, df_expected=get_expected_matches(batches=batches))
+    return None
+
+
+if __name__ == "__main__":
+    test_append_and_read()
+    test_failed_dedup_index_save_is_recovered()
+    test_failed_partition_write_leaves_store_unchanged()
+    print("All tests passed")
@@ -0,0 +1,103 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from normalization import LEADERBOARD_COLUMNS, get_leaderboard, normalize_matrix
+
+
+def get_random_matrix(rng: np.random.Generator, num_rows: int, num_columns: int) -> np.ndarray:
+    """Returns matrix of small integers (so that there are many ties), with some NaNs and a constant column"""
+    matrix = rng.integers(low=0, high=8, size=(num_rows, num_columns)).astype(float)
+    matrix[rng.random(size=matrix.shape) < 0.15] = np.nan
+    matrix[:, -1] = 3.0
+    return matrix
+
+
+def get_expected_percentile_ranks(matrix: np.ndarray) -> np.ndarray:
+    """Baseline: (number of values below + half the number of values equal) / number of values, counted value by value"""
+    expected = np.full(matrix.shape, np.nan)
+    for column in range(matrix.shape[1]):
+        values = [value for value in matrix[:, column] if not np.isnan(value)]
+        for row, value in enumerate(matrix[:, column]):
+            if not np.isnan(value):
+                num_below = sum(other_value < value for other_value in values)
+                num_equal = sum(other_value == value for other_value in values)
+                expected[row, column] = (num_below + 0.5 * num_equal) / len(values)
+    return expected
+
+
+def get_expected_min_max_scaled(matrix: np.ndarray) -> np.ndarray:
+    """Baseline: pandas (which skips NaNs) min/max of every column"""
+    df = pd.DataFrame(data=matrix)
+    ranges = df.max() - df.min()
+    df_expected = (df - df.min()) / ranges
+    df_expected.loc[:, ranges == 0] = df.loc[:, ranges == 0].where(df.isnull(), 0.5)
+    return df_expected.to_numpy()
+
+
+def test_normalize_matrix_against_direct_computation() -> None:
+    rng = np.random.default_rng(seed=41)
+    for num_rows, num_columns in [(1, 1), (2, 3), (25, 4), (200, 7)]:
+        matrix = get_random_matrix(rng=rng, num_rows=num_rows, num_columns=num_columns)
+        lower_is_better = [column % 2 == 1 for column in range(num_columns)]
+        for method, expected in [
+                ('percentile', get_expected_percentile_ranks(matrix=matrix)),
+                ('min-max', get_expected_min_max_scaled(matrix=matrix)),
+            ]:
+            actual = normalize_matrix(matrix=matrix, method=method)
+            assert np.allclose(actual, expected * 100, equal_nan=True), method
+            actual = normalize_matrix(matrix=matrix, method=method, lower_is_better=lower_is_better, scale=1)
+            expected_flipped = np.where(lower_is_better, 1 - expected, expected)
+            assert np.allclose(actual, expected_flipped, equal_nan=True), method
+    matrix = np.full((3, 2), np.nan) # Columns having only NaNs stay NaN
+    assert np.isnan(normalize_matrix(matrix=matrix, method='percentile')).all()
+    assert np.isnan(normalize_matrix(matrix=matrix, method='min-max')).all()
+    return None
+
+
+def test_invalid_arguments() -> None:
+    for kwargs in [
+            {'matrix': np.zeros((2, 2)), 'method': 'z-score'},
+            {'matrix': np.zeros(4)},
+            {'matrix': np.zeros((2, 2)), 'lower_is_better': [True]},
+        ]:
+        try:
+            normalize_matrix(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for {kwargs}")
+    return None
+
+
+def test_leaderboard_against_direct_computation() -> None:
+    """Baseline: mean of the percentile ranks (flipped for fouls) of every team, ranked with ties sharing a rank"""
+    rng = np.random.default_rng(seed=42)
+    matrix = get_random_matrix(rng=rng, num_rows=30, num_columns=len(LEADERBOARD_COLUMNS))
+    df_match_facts_stats = pd.DataFrame(data=matrix, columns=LEADERBOARD_COLUMNS)
+    df_match_facts_stats.insert(loc=0, column='Team', value=[f"Team {number:02d}" for number in range(30)])
+    df_match_facts_stats.insert(loc=1, column='GamesPlayed', value=10)
+    df_leaderboard = get_leaderboard(df_match_facts_stats=df_match_facts_stats)
+
+    expected = get_expected_percentile_ranks(matrix=matrix) * 100
+    is_fouls = [column == 'AvgFouls' for column in LEADERBOARD_COLUMNS]
+    expected = np.round(np.where(is_fouls, 100 - expected, expected), 2)
+    df_expected = pd.DataFrame(data=expected, columns=LEADERBOARD_COLUMNS)
+    df_expected.insert(loc=0, column='Team', value=df_match_facts_stats['Team'])
+    df_expected['OverallScore'] = np.round(np.nanmean(expected, axis=1), 2)
+    df_leaderboard = df_leaderboard.set_index('Team').loc[df_expected['Team']].reset_index()
+    assert np.allclose(df_leaderboard[LEADERBOARD_COLUMNS], df_expected[LEADERBOARD_COLUMNS], equal_nan=True)
+    assert np.allclose(df_leaderboard['OverallScore'], df_expected['OverallScore'])
+    overall_scores = df_expected['OverallScore'].tolist()
+    expected_ranks = [1 + sum(other_score > score for other_score in overall_scores) for score in overall_scores]
+    assert df_leaderboard['Rank'].tolist() == expected_ranks
+    return None
+
+
+if __name__ == "__main__":
+    test_normalize_matrix_against_direct_computation()
+    test_invalid_arguments()
+    test_leaderboard_against_direct_computation()
+    print("All tests passed")
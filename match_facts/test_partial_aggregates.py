@@ -0,0 +1,122 @@
+import functools
+import os
+import random
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from fake_data_generator import generate_fake_match_facts
+from match_facts_stats import get_match_facts_stats_by_player, get_match_facts_stats_by_team
+from partial_aggregates import PartialAggregate, aggregate_files, aggregate_match_facts
+from scoreline_stats import get_scoreline_stats_by_player, get_scoreline_stats_by_team
+from time_buckets import MATCH_FACTS, PARTICIPANT_TYPES
+
+
+def assert_totals_equal(actual: PartialAggregate, expected: PartialAggregate) -> None:
+    pd.testing.assert_frame_equal(actual.totals, expected.totals, check_dtype=False)
+    return None
+
+
+def assert_frames_close(df_actual: pd.DataFrame, df_expected: pd.DataFrame) -> None:
+    """Floats may differ by 0.01, as averages are rounded after being summed in a different order"""
+    assert df_actual.columns.tolist() == df_expected.columns.tolist()
+    for column in df_expected.columns:
+        if pd.api.types.is_float_dtype(df_expected[column]):
+            difference = (df_actual[column] - df_expected[column]).abs()
+            assert (difference.fillna(0) <= 0.0100001).all(), column
+            assert df_actual[column].isnull().equals(df_expected[column].isnull()), column
+        else:
+            assert df_actual[column].tolist() == df_expected[column].tolist(), column
+    return None
+
+
+def test_merged_chunks_equal_single_aggregate() -> None:
+    """Merging the aggregates of chunks (in any order and grouping) gives the aggregate of all matches"""
+    random.seed(31)
+    df_match_facts = generate_fake_match_facts(num_records=500)
+    chunks = [df_match_facts.iloc[start:start + 70] for start in range(0, len(df_match_facts), 70)]
+    for participant_type in PARTICIPANT_TYPES:
+        expected = PartialAggregate.from_match_facts(data=df_match_facts, participant_type=participant_type)
+        aggregates = [PartialAggregate.from_match_facts(data=chunk, participant_type=participant_type) for chunk in chunks]
+        assert_totals_equal(actual=functools.reduce(PartialAggregate.merge, aggregates), expected=expected)
+        assert_totals_equal(actual=functools.reduce(PartialAggregate.merge, aggregates[::-1]), expected=expected)
+        merged_in_halves = sum(aggregates[1:4], aggregates[0]) + sum(aggregates[5:], aggregates[4])
+        assert_totals_equal(actual=merged_in_halves, expected=expected)
+        assert_totals_equal(actual=PartialAggregate() + expected, expected=expected)
+    return None
+
+
+def test_stats_against_stats_functions() -> None:
+    """Baseline: the scoreline/MatchFacts stats functions, run on all matches"""
+    random.seed(32)
+    df_match_facts = generate_fake_match_facts(num_records=400)
+    for participant_type, get_scoreline_stats, get_match_facts_stats in [
+            ('team', get_scoreline_stats_by_team, get_match_facts_stats_by_team),
+            ('player', get_scoreline_stats_by_player, get_match_facts_stats_by_player),
+        ]:
+        partial_aggregate = PartialAggregate.from_match_facts(data=df_match_facts, participant_type=participant_type)
+        df_expected = get_scoreline_stats(data=df_match_facts).drop(labels=['ResultsString'], axis=1)
+        df_actual = partial_aggregate.get_scoreline_stats()
+        sort_by = ['Rank', 'Team']
+        pd.testing.assert_frame_equal(
+            df_actual.sort_values(by=sort_by, ignore_index=True),
+            df_expected.sort_values(by=sort_by, ignore_index=True),
+            check_dtype=False,
+        )
+        assert_frames_close(
+            df_actual=partial_aggregate.get_match_facts_stats(),
+            df_expected=get_match_facts_stats(data=df_match_facts),
+        )
+    return None
+
+
+def test_standard_deviations_against_numpy() -> None:
+    random.seed(33)
+    df_match_facts = generate_fake_match_facts(num_records=200)
+    df_stats = PartialAggregate.from_match_facts(data=df_match_facts).get_match_facts_stats(include_standard_deviations=True)
+    for team in df_stats['Team'].iloc[:10]:
+        is_home = (df_match_facts['HomeTeam'] == team)
+        is_away = (df_match_facts['AwayTeam'] == team)
+        for match_fact in MATCH_FACTS:
+            values = np.concatenate([
+                df_match_facts.loc[is_home, f"Home{match_fact}"].values,
+                df_match_facts.loc[is_away, f"Away{match_fact}"].values,
+            ]).astype(float)
+            actual = df_stats.loc[df_stats['Team'] == team, f"Std{match_fact}"].iloc[0]
+            assert abs(actual - np.round(np.std(values), 2)) <= 0.0100001, (team, match_fact)
+    return None
+
+
+def test_aggregate_files_and_chunks_against_single_aggregate() -> None:
+    """Baseline: PartialAggregate of all matches at once"""
+    random.seed(34)
+    df_match_facts = generate_fake_match_facts(num_records=600)
+    dict_expected = {
+        participant_type: PartialAggregate.from_match_facts(data=df_match_facts, participant_type=participant_type)
+        for participant_type in PARTICIPANT_TYPES
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        src_filepaths = []
+        for number, start in enumerate(range(0, len(df_match_facts), 250)):
+            src_filepath = os.path.join(folder, f"MatchFacts-{number}.csv")
+            df_match_facts.iloc[start:start + 250].to_csv(src_filepath, index=False)
+            src_filepaths.append(src_filepath)
+        for max_workers in [1, 2]:
+            dict_actual = aggregate_files(src_filepaths=src_filepaths, max_workers=max_workers)
+            for participant_type in PARTICIPANT_TYPES:
+                assert_totals_equal(actual=dict_actual[participant_type], expected=dict_expected[participant_type])
+    dict_actual = aggregate_match_facts(df_match_facts=df_match_facts, max_workers=2, chunk_size=170)
+    for participant_type in PARTICIPANT_TYPES:
+        assert_totals_equal(actual=dict_actual[participant_type], expected=dict_expected[participant_type])
+    return None
+
+
+if __name__ == "__main__":
+    test_merged_chunks_equal_single_aggregate()
+    test_stats_against_stats_functions()
+    test_standard_deviations_against_numpy()
+    test_aggregate_files_and_chunks_against_single_aggregate()
+    print("All tests passed")
@@ -0,0 +1,80 @@
+import os
+import random
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from fake_data_generator import generate_fake_match_facts
+from partitions import PARTICIPANT_TYPES, ParticipantPartitions, get_participant_frame
+
+
+def get_match_facts_with_edge_cases(num_records: int, seed: int) -> pd.DataFrame:
+    """Has shuffled index labels, a match of a team against itself, and a match having a missing team"""
+    random.seed(seed)
+    df_match_facts = generate_fake_match_facts(num_records=num_records)
+    df_match_facts.index = random.sample(range(10 * num_records), num_records)
+    df_match_facts.iloc[3, df_match_facts.columns.get_loc('AwayTeam')] = df_match_facts['HomeTeam'].iloc[3]
+    df_match_facts.iloc[7, df_match_facts.columns.get_loc('HomeTeam')] = np.nan
+    return df_match_facts
+
+
+def get_expected_participants(data: pd.DataFrame, participant_type: str) -> pd.DataFrame:
+    """Baseline: the participants of every match, built row by row"""
+    rows = []
+    for row in data.itertuples(index=False):
+        if participant_type == 'team':
+            rows.append((row.HomeTeam, row.AwayTeam))
+        elif participant_type == 'player':
+            rows.append((row.HomePlayer, row.AwayPlayer))
+        else:
+            rows.append((f"{row.HomePlayer}|{row.HomeTeam}", f"{row.AwayPlayer}|{row.AwayTeam}"))
+    return pd.DataFrame(data=rows, columns=['HomeTeam', 'AwayTeam'], index=data.index)
+
+
+def test_participant_frame_against_direct_computation() -> None:
+    random.seed(61)
+    df_match_facts = generate_fake_match_facts(num_records=100)
+    df_original = df_match_facts.copy()
+    for participant_type in PARTICIPANT_TYPES:
+        df_participants = get_participant_frame(data=df_match_facts, participant_type=participant_type)
+        df_expected = get_expected_participants(data=df_match_facts, participant_type=participant_type)
+        pd.testing.assert_frame_equal(df_participants.loc[:, ['HomeTeam', 'AwayTeam']], df_expected)
+        other_columns = [column for column in df_match_facts.columns if column not in ['HomeTeam', 'AwayTeam']]
+        pd.testing.assert_frame_equal(df_participants.loc[:, other_columns], df_match_facts.loc[:, other_columns])
+    pd.testing.assert_frame_equal(df_match_facts, df_original) # Input is not modified
+    try:
+        get_participant_frame(data=df_match_facts, participant_type='club')
+    except ValueError:
+        return None
+    raise AssertionError("Expected ValueError for an invalid `participant_type`")
+
+
+def test_partitions_against_boolean_masks() -> None:
+    """Baseline: for every participant, the rows in which they play home or away (in the original order)"""
+    df_match_facts = get_match_facts_with_edge_cases(num_records=400, seed=62)
+    for participant_type in PARTICIPANT_TYPES:
+        partitions = ParticipantPartitions(df_match_facts=df_match_facts, participant_type=participant_type)
+        df_participants = get_participant_frame(data=df_match_facts, participant_type=participant_type)
+        expected_participants = sorted(set(df_participants['HomeTeam'].dropna()) | set(df_participants['AwayTeam'].dropna()))
+        assert partitions.participants == expected_participants
+        assert list(partitions) == expected_participants and len(partitions) == len(expected_participants)
+        num_rows = 0
+        for participant, df_rows in partitions.items():
+            is_playing = (df_participants['HomeTeam'] == participant) | (df_participants['AwayTeam'] == participant)
+            pd.testing.assert_frame_equal(df_rows, df_participants[is_playing])
+            assert partitions.get_positions(participant=participant).tolist() == np.flatnonzero(is_playing).tolist()
+            assert partitions.get_rows(participant=participant) is df_rows # Cached
+            num_rows += len(df_rows)
+        # The match of a team against itself is counted once, and the missing team (or its combo) is never counted
+        num_rows_skipped = {'team': 2, 'player': 0, 'combo': 1}[participant_type]
+        assert num_rows == 2 * len(df_match_facts) - num_rows_skipped
+        assert partitions.get_rows(participant='Nobody').empty
+    return None
+
+
+if __name__ == "__main__":
+    test_participant_frame_against_direct_computation()
+    test_partitions_against_boolean_masks()
+    print("All tests passed")
@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from dedup_index import MATCH_KEY_COLUMNS
+from errors import InvalidMatchFactsError
+from fake_data_generator import generate_fake_match_facts
+from filters import filter_by_player_and_team_combo, filter_by_team
+from scoreline_stats import get_scoreline_stats_by_team
+from sqlite_store import SQLiteMatchStore, is_sqlite_store
+from validators import EXPECTED_COLUMNS
+
+
+def get_match_facts(num_records: int, seed: int) -> pd.DataFrame:
+    random.seed(seed)
+    df_match_facts = generate_fake_match_facts(num_records=num_records)
+    return df_match_facts.loc[:, EXPECTED_COLUMNS].drop_duplicates(subset=MATCH_KEY_COLUMNS, ignore_index=True)
+
+
+def test_append_and_read_against_pandas() -> None:
+    """Baseline: the same filters, applied to the DataFrame with boolean masks (rows in the order they were appended)"""
+    df_match_facts = get_match_facts(num_records=600, seed=71)
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = os.path.join(folder, 'matches.sqlite')
+        with SQLiteMatchStore(filepath=filepath) as match_store:
+            assert match_store.append(data=df_match_facts.iloc[:400]) == 400
+        with SQLiteMatchStore(filepath=filepath) as match_store: # Reopened, so the rows are read back from disk
+            assert match_store.append(data=df_match_facts.iloc[300:]) == len(df_match_facts) - 400
+            assert len(match_store) == len(df_match_facts)
+            pd.testing.assert_frame_equal(match_store.read(), df_match_facts)
+            team = df_match_facts['HomeTeam'].iloc[0]
+            player = df_match_facts['AwayPlayer'].iloc[0]
+            combo = (df_match_facts['HomePlayer'].iloc[1], df_match_facts['HomeTeam'].iloc[1])
+            is_team = (df_match_facts['HomeTeam'] == team) | (df_match_facts['AwayTeam'] == team)
+            is_player = (df_match_facts['HomePlayer'] == player) | (df_match_facts['AwayPlayer'] == player)
+            for start_timestamp, end_timestamp in [(None, None), (20060101000000, None), (20020101000000, 20130630235959)]:
+                is_in_range = df_match_facts['Timestamp'].between(start_timestamp or 0, end_timestamp or 99991231235959)
+                for kwargs, mask in [
+                        ({'team': team}, is_team),
+                        ({'player': player}, is_player),
+                        ({'team': team, 'player': player}, is_team & is_player),
+                        ({}, is_in_range),
+                    ]:
+                    df_actual = match_store.read(start_timestamp=start_timestamp, end_timestamp=end_timestamp, **kwargs)
+                    df_expected = df_match_facts[mask & is_in_range].reset_index(drop=True)
+                    pd.testing.assert_frame_equal(df_actual, df_expected)
+            chunks = list(match_store.iter_chunks(team=team, chunk_size=7))
+            assert all(len(chunk) <= 7 for chunk in chunks)
+            pd.testing.assert_frame_equal(pd.concat(objs=chunks, ignore_index=True), match_store.read(team=team))
+            # The filter and stats functions give the same results for the store and the DataFrame
+            pd.testing.assert_frame_equal(
+                filter_by_team(df_match_facts=match_store, team=team),
+                filter_by_team(df_match_facts=df_match_facts, team=team).reset_index(drop=True),
+            )
+            pd.testing.assert_frame_equal(
+                filter_by_player_and_team_combo(df_match_facts=match_store, player=combo[0], team=combo[1]),
+                filter_by_player_and_team_combo(df_match_facts=df_match_facts, player=combo[0], team=combo[1]).reset_index(drop=True),
+            )
+            pd.testing.assert_frame_equal(get_scoreline_stats_by_team(data=match_store), get_scoreline_stats_by_team(data=df_match_facts))
+            assert match_store.get_summary() == {
+                'num_rows': len(df_match_facts),
+                'min_timestamp': int(df_match_facts['Timestamp'].min()),
+                'max_timestamp': int(df_match_facts['Timestamp'].max()),
+            }
+            assert match_store.read(team='No such team').empty
+    return None
+
+
+def test_duplicates_against_drop_duplicates() -> None:
+    """Baseline: `DataFrame.drop_duplicates` on the identifying columns"""
+    df_match_facts = get_match_facts(num_records=200, seed=72)
+    df_data = pd.concat(objs=[df_match_facts.iloc[:150], df_match_facts.iloc[100:], df_match_facts.iloc[:10]], ignore_index=True)
+    with tempfile.TemporaryDirectory() as folder:
+        with SQLiteMatchStore(filepath=os.path.join(folder, 'matches.db')) as match_store:
+            assert match_store.append(data=df_data.iloc[:100]) == 100
+            try:
+                match_store.append(data=df_data.iloc[90:], on_duplicate='raise')
+            except InvalidMatchFactsError:
+                pass
+            else:
+                raise AssertionError("Expected InvalidMatchFactsError for duplicate matches")
+            assert len(match_store) == 100 # Nothing was inserted
+            match_store.append(data=df_data.iloc[100:], on_duplicate='drop')
+            pd.testing.assert_frame_equal(match_store.read(), df_data.drop_duplicates(subset=MATCH_KEY_COLUMNS, ignore_index=True))
+            assert match_store.append(data=df_data.iloc[:0]) == 0
+    return None
+
+
+def test_is_sqlite_store() -> None:
+    assert is_sqlite_store(path='data/matches.sqlite') and is_sqlite_store(path='MATCHES.DB')
+    assert not is_sqlite_store(path='data/MatchFacts.csv') and not is_sqlite_store(path='data/matches')
+    return None
+
+
+if __name__ == "__main__":
+    test_append_and_read_against_pandas()
+    test_duplicates_against_drop_duplicates()
+    test_is_sqlite_store()
+    print("All tests passed")
@@ -0,0 +1,94 @@
+import os
+import random
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from standings import LeagueTable
+
+TEAMS = ['Bayern', 'Chelsea', 'Inter', 'Juventus', 'Liverpool', 'PSG', 'Roma', 'Sevilla']
+
+
+def get_random_matches(num_matches: int, seed: int) -> pd.DataFrame:
+    """Returns MatchFacts-like DataFrame of random results (few teams and goals, so that there are many ties)"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(num_matches):
+        home_team, away_team = rng.sample(TEAMS, 2)
+        rows.append({'HomeTeam': home_team, 'AwayTeam': away_team, 'HomeGoals': rng.randint(0, 3), 'AwayGoals': rng.randint(0, 3)})
+    return pd.DataFrame(data=rows)
+
+
+def get_expected_ranks(data: pd.DataFrame, ranking_method: str) -> dict:
+    """
+    Baseline: totals computed with pandas, and ranks counted directly from the sort keys of all teams
+    (tie-breakers: points, goal difference, goals scored)
+    """
+    df_rows = pd.concat(objs=[
+        pd.DataFrame(data={'Team': data['HomeTeam'], 'GS': data['HomeGoals'], 'GA': data['AwayGoals']}),
+        pd.DataFrame(data={'Team': data['AwayTeam'], 'GS': data['AwayGoals'], 'GA': data['HomeGoals']}),
+    ])
+    df_rows['Points'] = (df_rows['GS'] > df_rows['GA']) * 3 + (df_rows['GS'] == df_rows['GA'])
+    df_totals = df_rows.groupby(by='Team').sum()
+    keys = {team: (row['Points'], row['GS'] - row['GA'], row['GS']) for team, row in df_totals.iterrows()}
+    if ranking_method == 'competition':
+        return {team: 1 + sum(other_key > key for other_key in keys.values()) for team, key in keys.items()}
+    return {team: 1 + len({other_key for other_key in keys.values() if other_key > key}) for team, key in keys.items()}
+
+
+def test_incremental_table_matches_full_rebuild() -> None:
+    """After every match, the incrementally updated table equals the table rebuilt from all matches so far"""
+    df_matches = get_random_matches(num_matches=120, seed=1)
+    for tie_breakers in [None, ['points', 'goal_difference', 'goals_scored'], ['ppg', 'head_to_head', 'wins']]:
+        for ranking_method in ['competition', 'dense']:
+            league_table = LeagueTable(tie_breakers=tie_breakers, ranking_method=ranking_method)
+            for num_matches, row in enumerate(df_matches.itertuples(index=False), start=1):
+                league_table.add_match(
+                    home_team=row.HomeTeam,
+                    away_team=row.AwayTeam,
+                    home_goals=row.HomeGoals,
+                    away_goals=row.AwayGoals,
+                )
+                df_rebuilt = LeagueTable.from_match_facts(
+                    data=df_matches.iloc[:num_matches],
+                    tie_breakers=tie_breakers,
+                    ranking_method=ranking_method,
+                ).as_dataframe()
+                pd.testing.assert_frame_equal(league_table.as_dataframe(), df_rebuilt)
+    return None
+
+
+def test_ranks_against_direct_computation() -> None:
+    df_matches = get_random_matches(num_matches=60, seed=2)
+    for ranking_method in ['competition', 'dense']:
+        league_table = LeagueTable.from_match_facts(
+            data=df_matches,
+            tie_breakers=['points', 'goal_difference', 'goals_scored'],
+            ranking_method=ranking_method,
+        )
+        expected_ranks = get_expected_ranks(data=df_matches, ranking_method=ranking_method)
+        assert {team: league_table.get_rank(team=team) for team in expected_ranks} == expected_ranks
+    return None
+
+
+def test_head_to_head_breaks_tie() -> None:
+    """Inter and Chelsea are level on points, goal difference and goals scored, but Inter won their match"""
+    df_matches = pd.DataFrame(data=[
+        {'HomeTeam': 'Chelsea', 'AwayTeam': 'Inter', 'HomeGoals': 0, 'AwayGoals': 1},
+        {'HomeTeam': 'Roma', 'AwayTeam': 'Inter', 'HomeGoals': 2, 'AwayGoals': 1},
+        {'HomeTeam': 'Chelsea', 'AwayTeam': 'Roma', 'HomeGoals': 2, 'AwayGoals': 1},
+    ])
+    df_standings = LeagueTable.from_match_facts(data=df_matches).as_dataframe()
+    assert df_standings['Team'].tolist() == ['Roma', 'Inter', 'Chelsea'] # Roma scored the most goals
+    assert df_standings['Rank'].tolist() == [1, 2, 3]
+    df_standings = LeagueTable.from_match_facts(data=df_matches, tie_breakers=['points', 'goal_difference']).as_dataframe()
+    assert df_standings['Rank'].tolist() == [1, 1, 1]
+    return None
+
+
+if __name__ == "__main__":
+    test_incremental_table_matches_full_rebuild()
+    test_ranks_against_direct_computation()
+    test_head_to_head_breaks_tie()
+    print("All tests passed")
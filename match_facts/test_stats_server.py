@@ -0,0 +1,85 @@
+import os
+import random
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # The modules use flat imports
+
+from fake_data_generator import generate_fake_match_facts
+from match_facts_stats import get_match_facts_stats_by_team
+from scoreline_stats import get_scoreline_stats_by_team
+from stats_server import StatsIndex, to_records
+
+
+def assert_stats_equal(actual: dict, df_expected: pd.DataFrame, team: str) -> None:
+    """Floats may differ by 0.01, as averages are rounded after being summed in a different order"""
+    dict_expected = to_records(data=df_expected[df_expected['Team'] == team])[0]
+    assert list(actual) == list(dict_expected), (list(actual), list(dict_expected))
+    for key, expected_value in dict_expected.items():
+        if isinstance(expected_value, float):
+            assert abs(actual[key] - expected_value) <= 0.0100001, (team, key, actual[key], expected_value)
+        else:
+            assert actual[key] == expected_value, (team, key, actual[key], expected_value)
+    return None
+
+
+def get_stats_index(df_match_facts: pd.DataFrame, folder: str) -> StatsIndex:
+    filepath = os.path.join(folder, 'MatchFacts.csv')
+    df_match_facts.to_csv(filepath, index=False)
+    return StatsIndex(src_filepath=filepath)
+
+
+def test_time_window_stats_against_stats_functions() -> None:
+    """Baseline: the stats functions, run on the team's matches within the window"""
+    random.seed(5)
+    df_match_facts = generate_fake_match_facts(num_records=300)
+    with tempfile.TemporaryDirectory() as folder:
+        stats_index = get_stats_index(df_match_facts=df_match_facts, folder=folder)
+    for team in stats_index.get_participants(participant_type='team')[:8]:
+        for start, end in [(20050101000000, None), (None, 20120101000000), (20080315000000, 20161231235959)]:
+            stats = stats_index.get_stats(participant_type='team', participant=team, start=start, end=end)
+            df_window = df_match_facts[
+                ((df_match_facts['HomeTeam'] == team) | (df_match_facts['AwayTeam'] == team))
+                & df_match_facts['Timestamp'].between(start or 0, end or np.iinfo('int64').max)
+            ]
+            if df_window.empty:
+                assert stats == {'scoreline_stats': None, 'match_facts_stats': None}
+                continue
+            df_scoreline_stats = get_scoreline_stats_by_team(data=df_window).drop(labels=['Rank'], axis=1)
+            assert_stats_equal(actual=stats['scoreline_stats'], df_expected=df_scoreline_stats, team=team)
+            assert_stats_equal(actual=stats['match_facts_stats'], df_expected=get_match_facts_stats_by_team(data=df_window), team=team)
+    assert stats_index.get_stats(participant_type='team', participant=team, start=30000101000000)['scoreline_stats'] is None
+    return None
+
+
+def test_matchup_stats_against_stats_functions() -> None:
+    """Baseline: the stats functions, run on the matches between both teams"""
+    random.seed(6)
+    df_match_facts = generate_fake_match_facts(num_records=1000)
+    with tempfile.TemporaryDirectory() as folder:
+        stats_index = get_stats_index(df_match_facts=df_match_facts, folder=folder)
+    teams = stats_index.get_participants(participant_type='team')
+    for team1, team2 in zip(teams[:6], teams[6:12]):
+        matchup_stats = stats_index.get_matchup_stats(participant_type='team', participants=[team1, team2], start=20040101000000)
+        is_matchup = (
+            ((df_match_facts['HomeTeam'] == team1) & (df_match_facts['AwayTeam'] == team2))
+            | ((df_match_facts['HomeTeam'] == team2) & (df_match_facts['AwayTeam'] == team1))
+        )
+        df_matchups = df_match_facts[is_matchup & (df_match_facts['Timestamp'] >= 20040101000000)]
+        assert matchup_stats['games_played'] == len(df_matchups)
+        if df_matchups.empty:
+            continue
+        df_scoreline_stats = get_scoreline_stats_by_team(data=df_matchups).drop(labels=['Rank'], axis=1)
+        df_mfs = get_match_facts_stats_by_team(data=df_matchups)
+        for team in [team1, team2]:
+            assert_stats_equal(actual=matchup_stats[team]['scoreline_stats'], df_expected=df_scoreline_stats, team=team)
+            assert_stats_equal(actual=matchup_stats[team]['match_facts_stats'], df_expected=df_mfs, team=team)
+    return None
+
+
+if __name__ == "__main__":
+    test_time_window_stats_against_stats_functions()
+    test_matchup_stats_against_stats_functions()
+    print("All tests passed")
@@ -0,0 +1,170 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+import config
+import utils
+
+TIME_PERIODS = ['month', 'season', 'year']
+PARTICIPANT_TYPES = ['team', 'player', 'combo']
+MATCH_FACTS = ['Possession', 'Shots', 'ShotsOnTarget', 'ShotAccuracy', 'PassAccuracy', 'Tackles', 'Fouls']
+RESULT_SUFFIXES = {1: 'WhileWinning', -1: 'WhileLosing', 0: 'WhileDrawing'}
+
+
+def __validate_choice(name: str, value: str, valid_values: list) -> None:
+    if value not in valid_values:
+        raise ValueError(f"Expected `{name}` to be in {valid_values}, but got '{value}'")
+    return None
+
+
+def get_time_index(data: pd.DataFrame) -> pd.DatetimeIndex:
+    """Expects MatchFacts DataFrame. Returns DatetimeIndex (parsed from the 'Timestamp' column) aligned with its rows"""
+    datetimes = utils.timestamps_to_datetimes(timestamps=data['Timestamp'])
+    time_index = pd.DatetimeIndex(data=datetimes.values, name='Datetime')
+    return time_index
+
+
+def get_period_labels(time_index: pd.DatetimeIndex, time_period: str) -> np.ndarray:
+    """
+    Returns label of the time period that each datetime falls in. Labels sort in chronological order.
+    Options for `time_period`: ['month', 'season', 'year']
+    Examples of labels: month => '2021-06', season => '2020-21', year => '2021'.
+    Seasons start in the month `config.SEASON_START_MONTH`.
+    """
+    __validate_choice(name='time_period', value=time_period, valid_values=TIME_PERIODS)
+    years = pd.Series(data=time_index.year)
+    months = pd.Series(data=time_index.month)
+    if time_period == 'month':
+        labels = years.astype(str) + '-' + months.astype(str).str.zfill(2)
+    elif time_period == 'season':
+        start_years = years - (months < config.SEASON_START_MONTH).astype(int)
+        labels = start_years.astype(str) + '-' + ((start_years + 1) % 100).astype(str).str.zfill(2)
+    else:
+        labels = years.astype(str)
+    return labels.values
+
+
+def get_participant_rows(
+        data: pd.DataFrame,
+        participant_type: Optional[str] = 'team',
+        time_period: Optional[str] = None,
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame. Returns DataFrame having one row per participant per match (in ascending order of
+    timestamp), with the columns ['Period', 'Team', 'GoalsScored', 'GoalsAllowed'] + MATCH_FACTS + ['Result'].
+    The 'Period' column is only added if `time_period` is given. 'Result' is 1 for a win, -1 for a loss and 0 for a draw
+    """
+    __validate_choice(name='participant_type', value=participant_type, valid_values=PARTICIPANT_TYPES)
+    df_mf = data.sort_values(by='Timestamp', ascending=True, kind='mergesort', ignore_index=True)
+    if time_period:
+        periods = get_period_labels(time_index=get_time_index(data=df_mf), time_period=time_period)
+    if participant_type == 'team':
+        home_participants, away_participants = df_mf['HomeTeam'], df_mf['AwayTeam']
+    elif participant_type == 'player':
+        home_participants, away_participants = df_mf['HomePlayer'], df_mf['AwayPlayer']
+    else:
+        home_participants = df_mf['HomePlayer'] + '|' + df_mf['HomeTeam']
+        away_participants = df_mf['AwayPlayer'] + '|' + df_mf['AwayTeam']
+    dataframes = []
+    for side, other_side, participants in [('Home', 'Away', home_participants), ('Away', 'Home', away_participants)]:
+        df_side = pd.DataFrame(data={
+            'Order': np.arange(len(df_mf)),
+            'Team': participants.values,
+            'GoalsScored': df_mf[f'{side}Goals'].values,
+            'GoalsAllowed': df_mf[f'{other_side}Goals'].values,
+        })
+        if time_period:
+            df_side.insert(loc=1, column='Period', value=periods)
+        for match_fact in MATCH_FACTS:
+            df_side[match_fact] = df_mf[f'{side}{match_fact}'].values
+        dataframes.append(df_side)
+    df_rows = pd.concat(objs=dataframes, ignore_index=True)
+    df_rows.sort_values(by='Order', kind='mergesort', ignore_index=True, inplace=True)
+    df_rows.drop(labels=['Order'], axis=1, inplace=True)
+    df_rows['Result'] = np.sign(df_rows['GoalsScored'] - df_rows['GoalsAllowed'])
+    return df_rows
+
+
+def get_scoreline_stats_by_period(
+        data: pd.DataFrame,
+        time_period: str,
+        participant_type: Optional[str] = 'team',
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame. Returns DataFrame of scoreline related stats by participant, for every time period
+    (same columns as `scoreline_stats.get_scoreline_stats_by_team`, with a 'Period' column in front).
+    All periods are computed in one grouped pass, and ranks are computed within each period.
+    Options for `time_period`: ['month', 'season', 'year']. Options for `participant_type`: ['team', 'player', 'combo']
+    """
+    df_rows = get_participant_rows(data=data, participant_type=participant_type, time_period=time_period)
+    goal_margin = df_rows['GoalsScored'] - df_rows['GoalsAllowed']
+    df_rows['Wins'] = (df_rows['Result'] == 1).astype(int)
+    df_rows['Losses'] = (df_rows['Result'] == -1).astype(int)
+    df_rows['Draws'] = (df_rows['Result'] == 0).astype(int)
+    df_rows['CleanSheets'] = (df_rows['GoalsAllowed'] == 0).astype(int)
+    df_rows['CleanSheetsAgainst'] = (df_rows['GoalsScored'] == 0).astype(int)
+    df_rows['BigWins'] = (goal_margin >= config.BIG_RESULT_GOAL_MARGIN).astype(int)
+    df_rows['BigLosses'] = (goal_margin <= -config.BIG_RESULT_GOAL_MARGIN).astype(int)
+    df_rows['ResultCharacter'] = df_rows['Result'].map({1: 'W', -1: 'L', 0: 'D'})
+    df_stats = df_rows.groupby(by=['Period', 'Team'], sort=True).agg(
+        GamesPlayed=('Result', 'size'),
+        Wins=('Wins', 'sum'),
+        Losses=('Losses', 'sum'),
+        Draws=('Draws', 'sum'),
+        GoalsScored=('GoalsScored', 'sum'),
+        GoalsAllowed=('GoalsAllowed', 'sum'),
+        CleanSheets=('CleanSheets', 'sum'),
+        CleanSheetsAgainst=('CleanSheetsAgainst', 'sum'),
+        BigWins=('BigWins', 'sum'),
+        BigLosses=('BigLosses', 'sum'),
+        ResultsString=('ResultCharacter', ''.join),
+    ).reset_index()
+    df_stats['Points'] = 3 * df_stats['Wins'] + df_stats['Draws']
+    df_stats['GoalDifference'] = df_stats['GoalsScored'] - df_stats['GoalsAllowed']
+
+    # Competition ranking (by PPG, then GDPG) within each period
+    df_stats['PPG'] = df_stats['Points'] / df_stats['GamesPlayed']
+    df_stats['GDPG'] = df_stats['GoalDifference'] / df_stats['GamesPlayed']
+    df_stats.sort_values(
+        by=['Period', 'PPG', 'GDPG', 'Team'],
+        ascending=[True, False, False, True],
+        ignore_index=True,
+        inplace=True,
+    )
+    positions = df_stats.groupby(by='Period').cumcount() + 1
+    values = df_stats.loc[:, ['Period', 'PPG', 'GDPG']]
+    is_new_group = values.ne(values.shift()).any(axis=1)
+    df_stats['Rank'] = positions.where(is_new_group, 0).groupby(df_stats['Period']).cummax()
+    column_order = [
+        'Period', 'Rank', 'Team', 'GamesPlayed', 'Points', 'GoalDifference', 'Wins', 'Losses', 'Draws', 'GoalsScored',
+        'GoalsAllowed', 'CleanSheets', 'CleanSheetsAgainst', 'BigWins', 'BigLosses', 'ResultsString',
+    ]
+    df_stats = df_stats.loc[:, column_order]
+    return df_stats
+
+
+def get_match_facts_stats_by_period(
+        data: pd.DataFrame,
+        time_period: str,
+        participant_type: Optional[str] = 'team',
+    ) -> pd.DataFrame:
+    """
+    Expects MatchFacts DataFrame. Returns DataFrame of MatchFacts related stats by participant, for every time period
+    (same columns as `match_facts_stats.get_match_facts_stats_by_team`, with a 'Period' column in front).
+    All periods are computed in one grouped pass.
+    Options for `time_period`: ['month', 'season', 'year']. Options for `participant_type`: ['team', 'player', 'combo']
+    """
+    df_rows = get_participant_rows(data=data, participant_type=participant_type, time_period=time_period)
+    grouped = df_rows.groupby(by=['Period', 'Team'], sort=True)
+    df_stats = grouped[MATCH_FACTS].mean()
+    df_stats.columns = [f"Avg{match_fact}" for match_fact in MATCH_FACTS]
+    df_stats.insert(loc=0, column='GamesPlayed', value=grouped.size())
+    df_stats_by_result = df_rows.groupby(by=['Period', 'Team', 'Result'], sort=True)[MATCH_FACTS].mean().unstack(level='Result')
+    for match_fact in MATCH_FACTS:
+        for result, suffix in RESULT_SUFFIXES.items():
+            column = (match_fact, result)
+            if column in df_stats_by_result.columns:
+                df_stats[f"Avg{match_fact}{suffix}"] = df_stats_by_result[column]
+            else:
+                df_stats[f"Avg{match_fact}{suffix}"] = np.nan
+    df_stats = df_stats.reset_index().round(2)
+    return df_stats
@@ -1,33 +1,37 @@
-from typing import Dict, List, NamedTuple, Union
+from typing import Dict, List, NamedTuple, Optional, Union
 import datetime
 import random
+import re
 import numpy as np
 import pandas as pd
 from randomtimestamp import randomtimestamp
+import normalization
 
 
 def normalize_array(array: List[Union[int, float]]) -> List[Union[int, float]]:
     """
-    Normalizes values in array to range of [0, 1].
-    Ignores and removes all NaNs.
+    Normalizes values in array to range of [0, 1] (min-max scaling).
+    NaNs are ignored, and kept in place (the output has the same length as the input).
     """
-    array = np.array(array)
-    array = array[~np.isnan(array)]
-    normalized_array = (array - np.min(array)) / np.ptp(array)
-    return list(normalized_array)
+    normalized_array = normalization.normalize_matrix(
+        matrix=np.asarray(array, dtype=float).reshape(-1, 1),
+        method='min-max',
+        scale=1,
+    )
+    return list(normalized_array[:, 0])
 
 
-def normalize_numerical_columns(data: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+def normalize_numerical_columns(
+        data: pd.DataFrame,
+        columns: List[str],
+        method: Optional[str] = 'min-max',
+    ) -> pd.DataFrame:
     """
     Takes in DataFrame and list of numerical columns to normalize.
-    Normalizes the given columns between [0-100].
-    Note: Does not work with NaN values.
+    Normalizes the given columns between [0-100] (all columns at once). NaNs are ignored, and kept in place.
+    Options for `method`: ['percentile', 'min-max']
     """
-    df = data.copy(deep=True)
-    for column in columns:
-        values = df[column].tolist()
-        df[column] = normalize_array(array=values)
-        df[column] = df[column].mul(100).round(2)
+    df = normalization.normalize_columns(data=data, columns=columns, method=method)
     return df
 
 
@@ -121,6 +125,25 @@ def timestamp_to_datetime(timestamp: int) -> datetime.datetime:
     return dt_obj
 
 
+def timestamps_to_datetimes(timestamps: pd.Series) -> pd.Series:
+    """
+    Converts Series of integer timestamps (in the format YYYYMMDDHHMMSS) to Series of datetime64 values.
+    Vectorized alternative to calling `timestamp_to_datetime` on each value (splits the integers with arithmetic,
+    instead of parsing strings).
+    """
+    timestamps = timestamps.astype(np.int64)
+    df_parts = pd.DataFrame(data={
+        'year': timestamps // 10**10,
+        'month': timestamps // 10**8 % 100,
+        'day': timestamps // 10**6 % 100,
+        'hour': timestamps // 10**4 % 100,
+        'minute': timestamps // 10**2 % 100,
+        'second': timestamps % 100,
+    })
+    datetimes = pd.to_datetime(df_parts)
+    return datetimes
+
+
 def get_random_choice_except(choices: List[str], exception: str) -> str:
     if exception not in choices:
         raise ValueError("The `exception` is not available in the given `choices`")
@@ -130,6 +153,11 @@ def get_random_choice_except(choices: List[str], exception: str) -> str:
     return random.choice(choices_available)
 
 
+def get_safe_filename(name: str) -> str:
+    """Replaces characters that are not allowed in filenames (on Windows, which is the strictest) with '-'"""
+    return re.sub(pattern=r'[<>:"/\\|?*\x00-\x1f]', repl='-', string=name).rstrip('. ')
+
+
 def round_off_columns(data: pd.DataFrame,
                       columns: List[str],
                       round_by: int) -> pd.DataFrame:
@@ -183,15 +211,30 @@ def add_ranking_column(
         rank_column_name: str,
         rank_by: List[str],
         ascending: List[bool],
+        method: Optional[str] = 'ordinal',
     ) -> pd.DataFrame:
-    """Adds ranking column based on `rank_by` column/s to DataFrame"""
+    """
+    Adds ranking column based on `rank_by` column/s to DataFrame.
+    Options for `method`: ['ordinal', 'competition', 'dense']. With 'ordinal' every row gets a distinct rank (1, 2, 3, 4),
+    whereas rows that are level on all `rank_by` columns share a rank with 'competition' (1, 2, 2, 4) and 'dense' (1, 2, 2, 3).
+    For tie-breakers like head-to-head, see `standings.LeagueTable`
+    """
     if len(rank_by) != len(ascending):
         raise ValueError(
             "Expected `rank_by` and `ascending` to be of same length,"
             f" but got lengths {len(rank_by)} and {len(ascending)} respectively"
         )
+    if method not in ['ordinal', 'competition', 'dense']:
+        raise ValueError(f"Expected `method` to be in ['ordinal', 'competition', 'dense'], but got '{method}'")
     df_ranked = data.sort_values(by=rank_by, ascending=ascending, ignore_index=True)
     rankings = np.arange(start=1, stop=len(df_ranked) + 1, step=1)
+    if method != 'ordinal' and len(df_ranked) > 0:
+        values = df_ranked.loc[:, rank_by]
+        is_new_group = values.ne(values.shift()).any(axis=1).values
+        if method == 'competition':
+            rankings = np.maximum.accumulate(np.where(is_new_group, rankings, 0))
+        else:
+            rankings = np.cumsum(is_new_group)
     df_ranked[rank_column_name] = rankings
     column_order = [rank_column_name] + df_ranked.drop(labels=[rank_column_name], axis=1).columns.tolist()
     df_ranked = df_ranked.loc[:, column_order]
@@ -43,6 +43,14 @@ EXPECTED_INTEGER_COLUMNS = [
 EXPECTED_FLOAT_COLUMNS = [
     column for column, datatype in EXPECTED_COLUMNS_WITH_DATATYPE.items() if datatype == 'float'
 ]
+PANDAS_DATATYPES = {'integer': 'int64', 'float': 'float64', 'string': 'object'}
+
+
+def get_empty_match_facts() -> pd.DataFrame:
+    """Returns MatchFacts DataFrame having no rows, with the expected columns and datatypes"""
+    return pd.DataFrame(columns=EXPECTED_COLUMNS).astype({
+        column: PANDAS_DATATYPES[datatype] for column, datatype in EXPECTED_COLUMNS_WITH_DATATYPE.items()
+    })
 
 
 def __has_no_missing_values(df_match_facts: pd.DataFrame) -> None:
@@ -115,6 +123,17 @@ def __has_matchups_between_unique_players(df_match_facts: pd.DataFrame) -> None:
     return None
 
 
+def get_duplicate_matches(df_match_facts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns rows of the match facts DataFrame that repeat an earlier match (same timestamp, players, teams and score),
+    eg: from merged exports or re-uploaded screenshots. Not part of `validate_match_facts`, as stores may already have
+    duplicates (use `dedup_index.MatchDedupIndex` to keep them out when appending).
+    """
+    from dedup_index import get_match_keys
+    is_duplicate = pd.Series(data=get_match_keys(data=df_match_facts), index=df_match_facts.index).duplicated(keep='first')
+    return df_match_facts[is_duplicate]
+
+
 def validate_match_facts(df_match_facts: pd.DataFrame) -> None:
     """
     Validates match facts DataFrame, and raises an Exception if the validation fails.